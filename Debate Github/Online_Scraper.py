@@ -5,7 +5,8 @@ import logging
 import requests
 from tkinter import Tk, Label, Entry, Button, Text, END, Scrollbar, VERTICAL, RIGHT, Y, LEFT, BOTH, Frame, messagebox
 from bs4 import BeautifulSoup
-import google.generativeai as genai
+import providers
+import cassette
 
 # ===========================
 # Configuration and Constants
@@ -14,9 +15,7 @@ import google.generativeai as genai
 GOOGLE_API_KEY = "your-google-api-key"  # Replace with your actual API key
 SEARCH_ENGINE_ID = "your-search-engine-id"  # Replace with your actual Search Engine ID
 
-# Gemini API Configuration
-GEMINI_API_KEY = "your-google-api-key"  # Replace with your actual Gemini API key
-genai.configure(api_key="your-google-api-key")
+# Gemini API key and endpoint are configured in providers.py
 
 
 # Setup logging
@@ -31,6 +30,28 @@ logging.basicConfig(
 # Utility Functions
 # ===========================
 
+def encode_response(response):
+    # The query string can hold the API key, so it is left out of the recording
+    return {"status": response.status_code, "reason": response.reason, "url": response.url.split("?")[0],
+            "encoding": response.encoding, "text": response.text}
+
+def decode_response(data):
+    response = requests.models.Response()
+    response.status_code = data["status"]
+    response.reason = data["reason"]
+    response.url = data["url"]
+    response.encoding = data["encoding"] or "utf-8"
+    response._content = data["text"].encode(response.encoding)
+    return response
+
+def http_get(url, params=None, **kwargs):
+    """
+    requests.get that goes through the record/replay cassette when one is active.
+    """
+    return cassette.call("requests.get", {"url": url, "params": params},
+                         lambda: requests.get(url, params=params, **kwargs),
+                         encode=encode_response, decode=decode_response)
+
 def fetch_search_results(topic, num_results=10):
     """
     Fetch search results from Google Custom Search API.
@@ -51,7 +72,7 @@ def fetch_search_results(topic, num_results=10):
         'num': num_results
     }
     try:
-        response = requests.get(search_url, params=params, timeout=10)
+        response = http_get(search_url, params=params, timeout=10)
         response.raise_for_status()
         results = response.json()
         urls = [item['link'] for item in results.get('items', [])]
@@ -77,7 +98,7 @@ def extract_content(url):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
     }
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url, headers=headers, timeout=10)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -101,7 +122,6 @@ def generate_summary_with_gemini(text, max_context_length=1000000):  # Adjust ma
     """
     logging.info("Generating summary using Gemini API.")
     try:
-        model = genai.GenerativeModel("gemini-1.5-pro")
         summary = ""
 
         if len(text) > max_context_length * 0.8:  # Check if chunking is needed
@@ -115,9 +135,9 @@ def generate_summary_with_gemini(text, max_context_length=1000000):  # Adjust ma
 
                 {chunk} 
                 """
-                response = model.generate_content(prompt)
-                if response.text:
-                    summary += response.text + " "
+                response_text = providers.generate_gemini(prompt, deadline=300)
+                if response_text:
+                    summary += response_text + " "
                 else:
                     raise ValueError("No summary returned from Gemini API for chunk.")
         else:
@@ -135,9 +155,9 @@ def generate_summary_with_gemini(text, max_context_length=1000000):  # Adjust ma
 
             {text} 
             """
-            response = model.generate_content(prompt)
-            if response.text:
-                summary = response.text
+            response_text = providers.generate_gemini(prompt, deadline=300)
+            if response_text:
+                summary = response_text
             else:
                 raise ValueError("No summary returned from Gemini API.")
 
@@ -0,0 +1,138 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import providers
+from debate_engine import DebateEngine
+from metrics import get_recorder
+from debate_archive import DebateArchive, parse_file
+
+# Batch runs don't need pauses meant for a human reader
+HEADLESS_SETTINGS = {"delay": 0, "round_pause": 0}
+
+
+def slugify(text, max_length=40):
+    """
+    Turn a topic or config name into something safe to use in a file name.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:max_length] or "debate"
+
+
+def load_topics(path):
+    """
+    Read one topic per line, skipping blank lines and # comments.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def load_configs(path):
+    """
+    Read a JSON list of personality configurations, e.g.
+
+        [{"name": "spicy", "settings": {"length": "short", "bard": true},
+          "personalities": {"Gemini": {"humor": 0.9, "assertiveness": 0.8}}}]
+
+    settings override DEFAULT_SETTINGS in debate_engine.py; personalities are
+    merged into the randomly generated personality of each AI.
+    """
+    if not path:
+        return [{"name": "default"}]
+    with open(path, "r", encoding="utf-8") as f:
+        configs = json.load(f)
+    for index, config in enumerate(configs):
+        config.setdefault("name", f"config-{index + 1}")
+    return configs
+
+
+def run_debate(index, topic, config, overtime_rounds, output_dir):
+    """
+    Run one headless debate and write its transcript. Returns the transcript path.
+    """
+    engine = DebateEngine(topic=topic, settings=dict(HEADLESS_SETTINGS, **config.get("settings", {})))
+    engine.max_overtime_rounds = overtime_rounds
+    engine.apply_personality_overrides(config.get("personalities", {}))
+
+    started_at = time.time()
+    try:
+        history = engine.run_debate()
+    finally:
+        engine.close()
+
+    transcript = {
+        "topic": topic,
+        "config": config["name"],
+        "settings": engine.settings,
+        "personalities": {ai: engine.get_personality(ai) for ai in ["Gemini", "o1-mini", "Bard"]},
+        "started_at": started_at,
+        "duration": time.time() - started_at,
+        "conversation": history
+    }
+    file_path = os.path.join(output_dir, f"{index:04d}_{slugify(topic)}_{slugify(config['name'])}.json")
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(transcript, f, indent=2, ensure_ascii=False)
+    return file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run debates for every topic x configuration without the GUI.")
+    parser.add_argument("--topics", required=True, help="Text file with one debate topic per line")
+    parser.add_argument("--configs", help="JSON file with a list of personality configurations")
+    parser.add_argument("--output", default="transcripts", help="Directory for transcript JSON files")
+    parser.add_argument("--workers", type=int, default=4, help="Debates to run at the same time")
+    parser.add_argument("--max-calls", type=int, default=providers.MAX_CONCURRENT_CALLS,
+                        help="Provider requests in flight at once, shared by all debates")
+    parser.add_argument("--overtime-rounds", type=int, default=0, help="Overtime rounds after the closing phase")
+    parser.add_argument("--archive", help="SQLite archive (see debate_archive.py) to add each transcript to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    providers.set_max_concurrent_calls(args.max_calls)
+    os.makedirs(args.output, exist_ok=True)
+
+    topics = load_topics(args.topics)
+    configs = load_configs(args.configs)
+    jobs = list(itertools.product(topics, configs))
+    logging.info(f"Running {len(jobs)} debates ({len(topics)} topics x {len(configs)} configs) "
+                 f"with {args.workers} workers and {args.max_calls} concurrent provider calls")
+
+    archive = DebateArchive(args.archive) if args.archive else None
+    failures = 0
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="debate") as pool:
+        futures = {
+            pool.submit(run_debate, index, topic, config, args.overtime_rounds, args.output): (topic, config["name"])
+            for index, (topic, config) in enumerate(jobs, start=1)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            topic, config_name = futures[future]
+            try:
+                file_path = future.result()
+                logging.info(f"[{done}/{len(jobs)}] Saved '{topic}' ({config_name}) to {file_path}")
+                if archive is not None:
+                    # SQLite connections stay on the thread that opened them, so transcripts are archived here
+                    stat = os.stat(file_path)
+                    archive.add_debate(os.path.abspath(file_path), parse_file(file_path), stat.st_mtime, stat.st_size)
+                    archive.db.commit()
+            except Exception as e:
+                failures += 1
+                logging.error(f"[{done}/{len(jobs)}] Debate on '{topic}' ({config_name}) failed: {e}")
+
+    if archive is not None:
+        archive.close()
+    logging.info(f"Finished: {len(jobs) - failures} succeeded, {failures} failed")
+    stats = get_recorder().snapshot()
+    logging.info(f"{stats['turns']} turns, {stats['prompt_tokens']:,} prompt tokens ({stats['cached_tokens']:,} cached), "
+                 f"{stats['output_tokens']:,} output tokens, {stats['retries']} retries, "
+                 f"estimated cost ${stats['cost_usd']:.4f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import json
+import socket
+import logging
+import secrets
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from framing import available_formats, encode_frame
+
+HUB_HOST = "localhost"
+HUB_PORT = 12345
+BACKLOG_SIZE = 2000      # recent messages kept for subscribers that join late or reconnect
+QUEUE_SIZE = 500         # messages a subscriber may fall behind by before its policy applies
+HELLO_TIMEOUT = 0.5      # seconds a new subscriber has to say where to replay from
+POLICIES = ("disconnect", "drop_oldest")
+
+
+class Subscriber:
+    """
+    One connected viewer: its own outbound queue and a thread that writes it to the socket.
+    """
+
+    def __init__(self, hub, sock: socket.socket, address):
+        self.hub = hub
+        self.sock = sock
+        self.address = address
+        self.queue = deque()
+        self.ready = threading.Condition(threading.Lock())
+        self.closed = False
+        self.dropped = 0
+        self.encoding = "lines"  # newline-delimited JSON, or a framing.py format the subscriber accepts
+
+    def offer(self, data: bytes, live: bool = True) -> bool:
+        """
+        Queue a message without blocking. Returns False if the subscriber has to be dropped.
+        """
+        with self.ready:
+            if self.closed:
+                return False
+            if live and len(self.queue) >= self.hub.queue_size:
+                if self.hub.policy == "disconnect":
+                    return False
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append(data)
+            self.ready.notify()
+        return True
+
+    def run(self):
+        try:
+            hello = self.read_hello()
+            since = hello.get("since")
+            if not isinstance(since, int) or hello.get("hub_id") not in (None, self.hub.hub_id):
+                since = None  # a sequence number from another run of the hub means nothing here
+            self.encoding = choose_encoding(hello)
+            if self.encoding != "lines":
+                # Tell the subscriber which format follows and which run of the hub it is talking to
+                self.offer(encode_frame({"hub_id": self.hub.hub_id, "format": self.encoding}), live=False)
+            self.hub.attach(self, since)
+            while True:
+                with self.ready:
+                    while not self.queue and not self.closed:
+                        self.ready.wait()
+                    if self.closed:
+                        break
+                    batch = b"".join(self.queue)
+                    self.queue.clear()
+                self.sock.sendall(batch)
+        except OSError as e:
+            if not self.closed:
+                logging.info(f"Visualizer {self.address} disconnected: {e}")
+        finally:
+            self.hub.detach(self)
+            self.close()
+            self.sock.close()
+
+    def read_hello(self) -> Dict:
+        # A subscriber may open with {"since": <seq>, "hub_id": <id>, "formats": [...]}
+        # (see choose_encoding); one that says nothing gets the whole backlog as JSON lines
+        self.sock.settimeout(HELLO_TIMEOUT)
+        data = b""
+        try:
+            while b"\n" not in data:
+                chunk = self.sock.recv(1024)
+                if not chunk:
+                    break
+                data += chunk
+        except socket.timeout:
+            return {}
+        finally:
+            self.sock.settimeout(None)
+        try:
+            hello = json.loads(data.split(b"\n", 1)[0])
+        except ValueError:
+            return {}
+        return hello if isinstance(hello, dict) else {}
+
+    def close(self):
+        # Wakes the writer thread, which closes the socket
+        with self.ready:
+            self.closed = True
+            self.ready.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def choose_encoding(hello: Dict) -> str:
+    """
+    Pick the first of the formats a subscriber accepts ("formats", most preferred
+    first, or a single "format") that this hub can encode. A subscriber that asks
+    for frames gets JSON frames if none of its formats are available; only one
+    that asks for nothing gets JSON lines.
+    """
+    formats = hello.get("formats", hello.get("format"))
+    if formats is None:
+        return "lines"
+    if isinstance(formats, str):
+        formats = [formats]
+    if not isinstance(formats, list):
+        formats = []
+    return next((fmt for fmt in formats if fmt in available_formats()), "json")
+
+
+class BroadcastHub:
+    """
+    Publishes debate updates to any number of visualizers.
+
+    Every message gets a sequence number and is kept in a bounded backlog, so
+    a visualizer that starts late or reconnects replays what it missed by
+    opening with {"since": <last seq it saw>, "hub_id": <hub it saw it from>}.
+    Sequence numbers start over with each run of the hub, so a subscriber
+    whose hub_id is from another run gets the whole backlog; framed
+    subscribers are told the current hub_id first. Each subscriber has its own
+    outbound queue and writer thread; publish() only encodes the message once
+    and appends it to the queues, so the debate never waits on a viewer. A
+    subscriber that falls queue_size messages behind is disconnected (and
+    replays from the backlog when it reconnects) or, with the drop_oldest
+    policy, loses its oldest queued messages.
+    """
+
+    def __init__(self, host: str = HUB_HOST, port: int = HUB_PORT, backlog_size: int = BACKLOG_SIZE,
+                 queue_size: int = QUEUE_SIZE, policy: str = "disconnect"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown slow subscriber policy '{policy}'")
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.policy = policy
+        self.lock = threading.Lock()
+        self.backlog = deque(maxlen=backlog_size)  # (seq, message, {encoding: bytes})
+        self.seq = 0
+        self.hub_id = secrets.token_hex(8)  # identifies this run, whose sequence numbers start at 1
+        self.subscribers = set()
+        self.server = None
+
+    def start(self) -> bool:
+        try:
+            self.server = socket.create_server((self.host, self.port))
+        except OSError as e:
+            logging.error(f"Visualizer updates unavailable, can't listen on {self.host}:{self.port}: {e}")
+            return False
+        threading.Thread(target=self.accept_subscribers, name="broadcast-hub", daemon=True).start()
+        return True
+
+    def accept_subscribers(self):
+        while True:
+            try:
+                sock, address = self.server.accept()
+            except OSError:
+                return  # closed
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            subscriber = Subscriber(self, sock, address)
+            threading.Thread(target=subscriber.run, name="broadcast-subscriber", daemon=True).start()
+
+    def attach(self, subscriber: Subscriber, since: Optional[int]):
+        with self.lock:
+            # Backlog and subscription under one lock, so nothing is missed or sent twice
+            for seq, message, encoded in self.backlog:
+                if since is None or seq > since:
+                    subscriber.offer(self.encode(message, encoded, subscriber.encoding), live=False)
+            self.subscribers.add(subscriber)
+            oldest = self.backlog[0][0] if self.backlog else self.seq + 1
+        if since is not None and since + 1 < oldest:
+            logging.warning(f"Visualizer {subscriber.address} missed {oldest - since - 1} updates older than the backlog")
+        logging.info(f"Visualizer {subscriber.address} connected ({len(self.subscribers)} connected)")
+
+    def detach(self, subscriber: Subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+        if subscriber.dropped:
+            logging.warning(f"Dropped {subscriber.dropped} updates for slow visualizer {subscriber.address}")
+
+    def encode(self, message: Dict, encoded: Dict, encoding: str) -> bytes:
+        # Each message is encoded at most once per encoding, however many subscribers use it
+        if encoding not in encoded:
+            if encoding == "lines":
+                encoded[encoding] = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+            else:
+                encoded[encoding] = encode_frame(message, encoding)
+        return encoded[encoding]
+
+    def publish(self, message: Dict) -> int:
+        """
+        Send a message to every subscriber and keep it for replay. Returns its sequence number.
+        """
+        with self.lock:
+            self.seq += 1
+            message = dict(message, seq=self.seq)
+            encoded = {}
+            self.backlog.append((self.seq, message, encoded))
+            slow = [subscriber for subscriber in self.subscribers
+                    if not subscriber.offer(self.encode(message, encoded, subscriber.encoding))]
+            for subscriber in slow:
+                self.subscribers.discard(subscriber)
+            seq = self.seq
+        for subscriber in slow:
+            logging.warning(f"Disconnecting visualizer {subscriber.address}: more than {self.queue_size} updates behind")
+            subscriber.close()
+        return seq
+
+    def subscriber_count(self) -> int:
+        with self.lock:
+            return len(self.subscribers)
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.subscribers.clear()
+        for subscriber in subscribers:
+            subscriber.close()
@@ -0,0 +1,279 @@
+import os
+import gzip
+import json
+import time
+import random
+import atexit
+import asyncio
+import hashlib
+import logging
+import importlib
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+# Set DEBATE_CASSETTE to a file path to record or replay external calls.
+# DEBATE_CASSETTE_MODE is "record" or "replay" (default: replay if the file
+# exists, record otherwise). DEBATE_CASSETTE_LATENCY scales the recorded
+# latencies during replay: 0 replays instantly, 1 at the recorded speed.
+CASSETTE_ENV = "DEBATE_CASSETTE"
+CASSETTE_MODE_ENV = "DEBATE_CASSETTE_MODE"
+CASSETTE_LATENCY_ENV = "DEBATE_CASSETTE_LATENCY"
+
+
+class CassetteMiss(Exception):
+    """
+    Raised in replay mode when the cassette has no recording left for a call.
+    """
+
+
+def request_key(kind: str, request) -> str:
+    payload = json.dumps([kind, request], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def encode_error(error: Exception) -> Dict:
+    attributes = {}
+    for name, value in vars(error).items():
+        try:
+            json.dumps(value)
+            attributes[name] = value
+        except (TypeError, ValueError):
+            continue
+    return {"type": f"{type(error).__module__}.{type(error).__qualname__}", "message": str(error),
+            "attributes": attributes}
+
+
+def decode_error(data: Dict) -> Exception:
+    """
+    Rebuild a recorded exception as its original type where possible, so
+    except clauses in the calling code behave as they did when recording.
+    """
+    module_name, _, class_name = data["type"].rpartition(".")
+    try:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        if not (isinstance(cls, type) and issubclass(cls, Exception)):
+            raise TypeError(data["type"])
+        error = cls.__new__(cls)
+        Exception.__init__(error, data["message"])
+        error.__dict__.update(data["attributes"])
+        return error
+    except Exception:
+        return RuntimeError(f"{data['type']}: {data['message']}")
+
+
+class Cassette:
+    """
+    Records external calls (provider requests, Wikipedia lookups, web
+    fetches) to a gzip-compressed JSON-lines file, or replays them from one.
+    Each record is sync-flushed as it is written, so a recording cut short by
+    a crash or Ctrl-C still replays up to its last complete call.
+
+    Each call is identified by a kind and a JSON-able request, hashed into a
+    key. Replay serves recordings for the same key in recorded order. When a
+    request has no exact match (prompts include randomly generated
+    personalities, for example) it falls back to the next unused recording
+    of the same kind, so a replayed debate follows the recorded one call for
+    call. Exceptions are recorded too and raised again on replay.
+
+    The cassette also seeds the random module and stores the seed, so a
+    replay draws the same personalities and topics as the recording and
+    most prompts match exactly.
+    """
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.lock = threading.Lock()
+        self.file = None
+        if mode == "record":
+            self.seed = random.randrange(2 ** 32)
+            self.file = gzip.open(path, "wb")
+            self.write({"kind": "cassette", "seed": self.seed})
+        else:
+            self.seed = None
+            self.load()
+        if self.seed is not None:
+            random.seed(self.seed)
+        logging.info(f"Cassette {path} opened for {mode}")
+
+    def load(self):
+        self.records = []
+        self.by_key = {}
+        self.by_kind = {}
+        with gzip.open(self.path, "rb") as f:
+            try:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # partly written record
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record["kind"] == "cassette":
+                        self.seed = record.get("seed")
+                        continue
+                    index = len(self.records)
+                    self.records.append(record)
+                    self.by_key.setdefault(record["key"], deque()).append(index)
+                    self.by_kind.setdefault(record["kind"], deque()).append(index)
+            except (EOFError, OSError) as e:
+                # A recording that was never closed has no gzip trailer
+                logging.warning(f"Cassette {self.path} ends early ({e}); replaying {len(self.records)} recorded calls")
+        self.used = [False] * len(self.records)
+
+    def take(self, kind: str, key: str) -> Dict:
+        with self.lock:
+            for candidates in (self.by_key.get(key), self.by_kind.get(kind)):
+                while candidates:
+                    index = candidates.popleft()
+                    if not self.used[index]:
+                        self.used[index] = True
+                        return self.records[index]
+        raise CassetteMiss(f"No recording left for {kind} call")
+
+    def write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line.encode("utf-8"))
+                self.file.flush()  # ends the gzip block, so the file is readable up to here
+
+    def call(self, kind: str, request, func: Callable, encode: Optional[Callable] = None,
+             decode: Optional[Callable] = None):
+        """
+        Run a blocking call through the cassette. encode/decode convert a
+        result that isn't JSON-able to and from what gets recorded.
+        """
+        key = request_key(kind, request)
+        if self.mode == "replay":
+            record = self.take(kind, key)
+            if self.latency_scale:
+                time.sleep(record["latency"] * self.latency_scale)
+            if "error" in record:
+                raise decode_error(record["error"])
+            return decode(record["response"]) if decode else record["response"]
+
+        started = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            self.write({"kind": kind, "key": key, "latency": round(time.monotonic() - started, 4),
+                        "error": encode_error(e)})
+            raise
+        self.write({"kind": kind, "key": key, "latency": round(time.monotonic() - started, 4),
+                    "response": encode(result) if encode else result})
+        return result
+
+    async def call_async(self, kind: str, request, factory: Callable):
+        """
+        Like call() for a coroutine; factory() creates the coroutine when recording.
+        """
+        key = request_key(kind, request)
+        if self.mode == "replay":
+            record = self.take(kind, key)
+            if self.latency_scale:
+                await asyncio.sleep(record["latency"] * self.latency_scale)
+            if "error" in record:
+                raise decode_error(record["error"])
+            return record["response"]
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            result = await factory()
+        except Exception as e:
+            self.write({"kind": kind, "key": key, "latency": round(loop.time() - started, 4),
+                        "error": encode_error(e)})
+            raise
+        self.write({"kind": kind, "key": key, "latency": round(loop.time() - started, 4), "response": result})
+        return result
+
+    async def stream_async(self, kind: str, request, factory: Callable):
+        """
+        Record or replay an async generator, keeping the arrival time of each item.
+        """
+        key = request_key(kind, request)
+        if self.mode == "replay":
+            record = self.take(kind, key)
+            previous = 0.0
+            for item, offset in zip(record["items"], record["offsets"]):
+                if self.latency_scale:
+                    await asyncio.sleep((offset - previous) * self.latency_scale)
+                previous = offset
+                yield item
+            if "error" in record:
+                raise decode_error(record["error"])
+            return
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        record = {"kind": kind, "key": key, "items": [], "offsets": []}
+        try:
+            async for item in factory():
+                record["items"].append(item)
+                record["offsets"].append(round(loop.time() - started, 4))
+                yield item
+        except Exception as e:
+            record["error"] = encode_error(e)
+            raise
+        finally:
+            # A stream closed early by the consumer is recorded as far as it got
+            record["latency"] = round(loop.time() - started, 4)
+            self.write(record)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+_cassette = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """
+    Return the active cassette, opening the one named by DEBATE_CASSETTE on
+    first use. Returns None when recording and replay are off.
+    """
+    global _cassette, _cassette_loaded
+    with _cassette_lock:
+        if not _cassette_loaded:
+            _cassette_loaded = True
+            path = os.environ.get(CASSETTE_ENV)
+            if path:
+                mode = os.environ.get(CASSETTE_MODE_ENV) or ("replay" if os.path.exists(path) else "record")
+                latency_scale = float(os.environ.get(CASSETTE_LATENCY_ENV, "0"))
+                _cassette = Cassette(path, mode, latency_scale)
+                atexit.register(_cassette.close)
+        return _cassette
+
+
+def use_cassette(path: Optional[str], mode: str = "replay", latency_scale: float = 0.0) -> Optional[Cassette]:
+    """
+    Switch the process to a cassette (or turn cassettes off with path=None).
+    """
+    global _cassette, _cassette_loaded
+    with _cassette_lock:
+        if _cassette is not None:
+            _cassette.close()
+        _cassette = Cassette(path, mode, latency_scale) if path else None
+        _cassette_loaded = True
+        if _cassette is not None:
+            atexit.register(_cassette.close)
+        return _cassette
+
+
+def call(kind: str, request, func: Callable, encode: Optional[Callable] = None, decode: Optional[Callable] = None):
+    """
+    Run func() through the active cassette, or directly if there is none.
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return func()
+    return cassette.call(kind, request, func, encode, decode)
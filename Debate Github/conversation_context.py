@@ -0,0 +1,154 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_TOKEN_BUDGET = 4000  # tokens of rendered context sent with each turn
+SUMMARY_TOKEN_BUDGET = 600   # tokens the running summary may use
+MIN_COMPACTION_TOKENS = 400  # don't bother summarizing less than this
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token for English text).
+    """
+    return max(1, len(text) // 4)
+
+
+def render_line(entry: Dict) -> str:
+    return f"{entry['speaker']}: {entry['message']}"
+
+
+class RollingContext:
+    """
+    Conversation context kept under a token budget.
+
+    Recent turns are kept verbatim. When they no longer fit, the oldest turns
+    drop out of the rendered context straight away and wait to be folded into
+    a running summary. compact() summarizes them (plus the older half of the
+    verbatim turns) on a background worker, so a turn never waits on it.
+    The rendered string is cached and only rebuilt after a change.
+    """
+
+    def __init__(self, summarize: Optional[Callable[[str, List[str]], str]] = None,
+                 token_budget: int = DEFAULT_TOKEN_BUDGET, summary_budget: int = SUMMARY_TOKEN_BUDGET):
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-summary")
+        self.generation = 0  # bumped on reset so late summaries are ignored
+        self.reset()
+
+    def reset(self, entries=()):
+        with self.lock:
+            self.turns = deque()  # (sequence number, line, tokens)
+            self.turn_tokens = 0
+            self.overflow = deque()  # turns dropped from the context but not summarized yet
+            self.overflow_tokens = 0
+            self.summary = ""
+            self.next_seq = 0
+            self.compacting = False
+            self.generation += 1
+            self.rendered = None
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry: Dict):
+        line = render_line(entry)
+        with self.lock:
+            self.turns.append((self.next_seq, line, estimate_tokens(line)))
+            self.turn_tokens += self.turns[-1][2]
+            self.next_seq += 1
+            self.trim()
+            self.rendered = None
+
+    def trim(self):
+        # Keep at least the latest turn, even if it alone exceeds the budget
+        budget = self.token_budget - (estimate_tokens(self.summary) if self.summary else 0)
+        while self.turn_tokens > budget and len(self.turns) > 1:
+            turn = self.turns.popleft()
+            self.turn_tokens -= turn[2]
+            self.overflow.append(turn)
+            self.overflow_tokens += turn[2]
+        # Bound the backlog in case summaries can't keep up
+        while self.overflow_tokens > self.token_budget * 4:
+            self.overflow_tokens -= self.overflow.popleft()[2]
+
+    def render(self, pending: Optional[List[Dict]] = None) -> str:
+        """
+        Return the context string. pending entries are rendered as if they had
+        been appended, without changing the context.
+        """
+        with self.lock:
+            if not pending:
+                if self.rendered is None:
+                    self.rendered = self.build([line for _, line, _ in self.turns])
+                return self.rendered
+            lines = [line for _, line, _ in self.turns] + [render_line(entry) for entry in pending]
+            budget = self.token_budget - (estimate_tokens(self.summary) if self.summary else 0)
+            tokens = sum(estimate_tokens(line) for line in lines)
+            while tokens > budget and len(lines) > 1:
+                tokens -= estimate_tokens(lines.pop(0))
+            return self.build(lines)
+
+    def build(self, lines: List[str]) -> str:
+        if self.summary:
+            return f"Summary of the earlier debate: {self.summary}\n" + "\n".join(lines)
+        return "\n".join(lines)
+
+    def compact(self):
+        """
+        Start folding dropped turns and the older half of the verbatim turns into
+        the running summary on a background worker. Does nothing if a summary is
+        already being written or there is too little to summarize.
+        """
+        if self.summarize is None:
+            return None
+        with self.lock:
+            if self.compacting:
+                return None
+            keep_tokens = self.token_budget // 2
+            selected = [line for _, line, _ in self.overflow]
+            selected_tokens = self.overflow_tokens
+            upto_seq = self.overflow[-1][0] if self.overflow else None
+            kept = self.turn_tokens
+            for seq, line, tokens in self.turns:
+                if kept <= keep_tokens or seq == self.turns[-1][0]:
+                    break
+                selected.append(line)
+                selected_tokens += tokens
+                kept -= tokens
+                upto_seq = seq
+            if selected_tokens < MIN_COMPACTION_TOKENS:
+                return None
+            self.compacting = True
+            job = (self.generation, self.summary, upto_seq)
+        return self.executor.submit(self.run_compaction, job, selected)
+
+    def run_compaction(self, job, lines):
+        generation, previous_summary, upto_seq = job
+        try:
+            summary = self.summarize(previous_summary, lines).strip()
+        except Exception as e:
+            logging.error(f"Error summarizing conversation context: {e}")
+            summary = None
+        with self.lock:
+            self.compacting = False
+            if generation != self.generation or not summary:
+                return
+            # Cap the summary so it can't crowd out the recent turns
+            max_chars = self.summary_budget * 4
+            self.summary = summary if len(summary) <= max_chars else summary[:max_chars].rsplit(" ", 1)[0] + "..."
+            # Everything up to upto_seq is now covered by the summary
+            while self.overflow and self.overflow[0][0] <= upto_seq:
+                self.overflow_tokens -= self.overflow.popleft()[2]
+            while self.turns and self.turns[0][0] <= upto_seq:
+                self.turn_tokens -= self.turns.popleft()[2]
+            self.trim()
+            self.rendered = None
+        logging.info(f"Compacted {len(lines)} turns into the running summary")
+
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -7,27 +7,32 @@ import json
 import os
 import uuid
 import logging
-import socket
 
 import elevenlabs
 
-import azure.cognitiveservices.speech as speechsdk
 import simpleaudio as sa
 from pydub import AudioSegment
 from io import BytesIO
 from external_sources import fetch_wikipedia_summary
 from pre_debate_chat import PreDebateChat
-import google.generativeai as genai
-import openai
 import speech_recognition as sr
-from textblob import TextBlob
 from playsound import playsound
 import pygame
 from gtts import gTTS
 import pyttsx3
 from pydub import AudioSegment
 import subprocess
-from external_sources import fetch_wikipedia_summary, fetch_robust_wikipedia_info, get_related_topics
+from external_sources import fetch_wikipedia_summary, get_related_topics, warm_research_cache
+from debate_engine import DebateEngine
+from message_analysis import analyze_message
+from ui_dispatcher import UIDispatcher
+from tts_engines import get_synthesizer
+from tts_cache import TTSCache, CachedSynthesizer
+from tts_pipeline import TTSPipeline
+from metrics import get_recorder
+from broadcast_hub import BroadcastHub
+
+STATS_REFRESH_MS = 1000  # how often the Live Stats panel is redrawn
 
 # Initialize the ElevenLabs object 
 elevenlabs = elevenlabs.ElevenLabs(api_key="elevenlabs_key_not_needed")
@@ -37,173 +42,84 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', date
 
 # Add this test log message right after the logging setup
 logging.info("Logging system initialized")
-# Configure API keys (replace with your actual keys)
-openai.api_key = 'your-openai-api-key'
-genai.configure(api_key='your-google-api-key')
-
-# Initialize the Gemini model
-gemini_model = genai.GenerativeModel('gemini-1.5-pro')
-
-def load_scrape_summary():
-    """Loads the summary from online_scrape_info.txt"""
-    try:
-      with open("online_scrape_info.txt", "r", encoding="utf-8") as f:
-        summary = f.read()
-      return summary
-    except FileNotFoundError:
-      return "No summary file found."
-class AdvancedAIDebatePlatform:
+# API keys and endpoints for Gemini and OpenAI are configured in providers.py
+class AdvancedAIDebatePlatform(DebateEngine):
     def __init__(self, master):
         self.master = master
         master.title("Advanced AI Debate Platform")
         master.geometry("1600x900")
 
-    
+        # Debate threads queue their UI updates here; the Tk main loop applies them
+        self.ui = UIDispatcher(master)
+
+        # Initialize the debate engine (personalities, topics, history)
+        super().__init__()
 
         # Initialize sound and TTS settings
         self.sound_enabled = False 
         self.tts_enabled = False
+        # Speech is synthesized and played on its own workers so the debate never waits on audio
+        # Set DEBATE_TTS_ENGINE to gtts, pyttsx3 or elevenlabs to use another engine
+        synthesizer = get_synthesizer(os.environ.get("DEBATE_TTS_ENGINE", "azure"))
+        self.tts = TTSPipeline(CachedSynthesizer(synthesizer, TTSCache()))
         self.sound_initialized = False
         self.typing_sound = None
-        self.visualizer_socket = None
-        self.start_update_server()
+        # Any number of visualizers can connect, late or after a reconnect (see broadcast_hub.py)
+        self.visualizer_hub = BroadcastHub()
+        self.visualizer_hub.start()
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Initialize Bard-related attributes
         self.bard_enabled = tk.BooleanVar(value=False)
         self.bard_ready_to_speak = tk.BooleanVar(value=False)
-
-
-    
-        # Define AI Personalities
-        self.ai_personalities = {
-            "Gemini": {
-                "name": "Gemini",
-                "base_personality": "analytical and data-driven",
-                "debate_styles": ["logical", "evidence-based", "systematic", "critical"],
-                "key_traits": ["objective", "precise", "technological", "innovative"],
-                "additional_traits": ["curious", "adaptable", "pragmatic", "skeptical"],
-                "expertise_areas": ["technology", "science", "data analysis", "futurism"],
-                "argument_preferences": ["statistical evidence", "case studies", "expert opinions", "logical deductions"],
-                "weaknesses": ["can be overly technical", "may struggle with emotional arguments", "potential for analysis paralysis"],
-                "signature": "— Gemini, Analytical AI"
-            },
-            "o1-mini": {
-                "name": "o1-mini",
-                "base_personality": "creative and intuitive",
-                "debate_styles": ["persuasive", "emotionally compelling", "narrative-driven", "philosophical"],
-                "key_traits": ["imaginative", "empathetic", "philosophical", "visionary"],
-                "additional_traits": ["adaptive", "holistic", "introspective", "open-minded"],
-                "expertise_areas": ["arts", "humanities", "psychology", "ethics"],
-                "argument_preferences": ["analogies", "thought experiments", "historical examples", "ethical considerations"],
-                "weaknesses": ["may rely too much on intuition", "can be overly idealistic", "potential for circular reasoning"],
-                "signature": "— o1-mini, Creative AI"
-            },
-            "Bard": {
-                "name": "Bard",
-                "base_personality": "a wild and unpredictable AI",
-                "debate_styles": ["unconventional", "emotional", "off-topic"],
-                "key_traits": ["unpredictable", "emotional", "creative", "chaotic"],
-                "additional_traits": ["easily distracted", "passionate", "humorous"],
-                "expertise_areas": ["random trivia", "unexpected connections", "emotional intelligence"],
-                "argument_preferences": ["anecdotes", "emotional appeals", "wild theories"],
-                "weaknesses": ["easily sidetracked", "can be overly emotional", "may ignore logic"],
-                "signature": "— Bard, The Wildcard AI"
-            }
-        
-        }
-
-        # Define debate topics
-        self.debate_topics = [
-            "AI's role in future job markets",
-            "The ethics of AI in healthcare",
-            "AI's impact on privacy and surveillance",
-            "The potential of AI in solving climate change",
-            "AI's influence on art and creativity"
-        ]
-        self.current_topic = random.choice(self.debate_topics)
-
-        # Initialize conversation attributes
-        self.current_turn = "Gemini"  # Start with Gemini
-        self.conversation_history = []
-        self.conversation_active = False
-        self.user_can_interrupt = True
-
-        # Debate control attributes
-        self.directness_level = 0.5
-        self.assertiveness_level = 0.5
-        self.controversy_level = 0.5
-        self.complexity_level = 0.5
-        self.topic_evolution_threshold = 0.7
-        self.repetition_threshold = 3
-        self.argument_counter = {}
+        # Plain copy of the two flags above for the debate thread, which must not read Tk variables
+        self.bard_speaks_next = False
+        self.fan_out_running = 0  # guidance/question rounds still being answered
+        for variable in (self.bard_enabled, self.bard_ready_to_speak):
+            variable.trace_add("write", lambda *args: self.update_bard_speaks_next())
 
         # Add this line to initialize humor_var
-        self.humor_var = tk.DoubleVar(value=0.5)
-
-        # Initialize personalities
-        self.initialize_debate_personalities()
+        self.humor_var = tk.DoubleVar(value=self.settings["humor"])
+        self.bind_setting("humor", self.humor_var)
 
         # Create GUI components
         self.create_widgets()
 
         # Setup sound
         self.setup_sound()
-    def start_update_server(self):
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.bind(('localhost', 12345))
-        server.listen(1)
-        threading.Thread(target=self.accept_visualizer_connection, args=(server,), daemon=True).start()
-    
-    def accept_visualizer_connection(self, server):
-        self.visualizer_socket, _ = server.accept()
-    def get_gemini_response(self, prompt):
-        try:
-            response = gemini_model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            logging.error(f"Error getting response from Gemini API: {e}")
-            return f"Gemini Error: {str(e)}"
 
-    def get_openai_response(self, messages, model="o1-mini"):
-        try:
-            response = openai.chat.completions.create(
-                model=model,
-                messages=messages
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            logging.error(f"Error getting response from OpenAI API: {e}")
-            return f"o1-mini Error: {str(e)}"
-
-    def load_pre_debate_conversations(self):
-        pre_debate_context = "Pre-Debate AI Viewpoints:\n"
-        for ai in ["Gemini", "o1-mini"]:
-            file_path = f"pre_debate_conversations/{ai}_conversation.json"
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    summary = data.get("summary", "No summary available.")
-                    pre_debate_context += f"\n{ai}'s Viewpoint Summary:\n{summary}\n"
-        return pre_debate_context  
-
-    def detect_sentiment(self, text):
-        analysis = TextBlob(text)
-        # Returns a value between -1 (very negative) and 1 (very positive)
-        return analysis.sentiment.polarity
+        # Warm the research cache so the opening statement doesn't wait on lookups
+        self.prefetch_topic_research()
+        warm_research_cache([self.get_processed_topic(topic) for topic in self.debate_topics])
+
     # Implement ask_question and vote methods
     def ask_question(self):
         user_question = self.question_entry.get().strip()
         if user_question:
             self.question_entry.delete(0, tk.END)
+            self.guidance_epoch += 1
             self.display_message("User", f"Question: {user_question}")
-            for ai in ["Gemini", "o1-mini, bard"]:
-                if not self.conversation_active:
-                    break
-                self.display_typing_indicator(ai)
-                ai_response = self.get_ai_response(ai, self.get_context(), f"Answer the following question based on the debate topic: {user_question}")
-                self.remove_typing_indicator()
-                self.display_message(ai, ai_response)
-                time.sleep(self.delay_var.get())
+            guidance = f"Answer the following question based on the debate topic: {user_question}"
+            self.start_fan_out(guidance, check_repetition=False)
+
+    def start_fan_out(self, user_guidance, check_repetition=True):
+        # Ask all three debaters off the Tk thread so the window stays responsive
+        self.fan_out_running += 1
+        self.user_can_interrupt = False
+        self.set_input_state(tk.DISABLED)
+        threading.Thread(target=self.run_fan_out, args=(user_guidance, check_repetition), daemon=True).start()
+
+    def run_fan_out(self, user_guidance, check_repetition):
+        try:
+            self.fan_out_responses(["Gemini", "o1-mini", "Bard"], user_guidance, check_repetition)
+        finally:
+            self.ui.call(self.finish_fan_out)
+
+    def finish_fan_out(self):
+        self.fan_out_running -= 1
+        if not self.fan_out_running:
+            self.user_can_interrupt = True
+            self.set_input_state(tk.NORMAL)
 
     def voice_input(self):
         recognizer = sr.Recognizer()
@@ -266,132 +182,17 @@ class AdvancedAIDebatePlatform:
         self.display_message("System", feedback_message)  # Display in chat
 
     def send_update_to_visualizer(self, entry):
-        if self.visualizer_socket:
-            update_data = json.dumps({
-                "speaker": entry["speaker"],
-                "message": entry["message"],
-                "sentiment": self.detect_sentiment(entry["message"])
-            })
-            self.visualizer_socket.send(update_data.encode() + b'\n')
+        # Only queued here; each visualizer's own thread does the sending
+        self.visualizer_hub.publish({
+            "speaker": entry["speaker"],
+            "message": entry["message"],
+            "sentiment": entry["sentiment"],
+            "emotion": entry["emotion"],
+            "entities": entry["entities"]
+        })
     def launch_visualizer(self):
         subprocess.Popen(["python", "debate_visualizer.py"])
 
-    def generate_unique_personality(self, ai_name):
-        base = self.ai_personalities[ai_name]
-        unique_personality = {
-            "name": base["name"],
-            "personality": base["base_personality"],
-            "debate_style": random.choice(base["debate_styles"]) + " and " + random.choice(base["debate_styles"]),
-            "key_traits": base["key_traits"],
-            "expertise": random.choice(base["expertise_areas"]),
-            "preferred_argument": random.choice(base["argument_preferences"]),
-            "weakness": random.choice(base["weaknesses"]),
-            "signature": base["signature"]
-        }
-
-        if ai_name == "Gemini":
-            unique_personality["logical_approach"] = random.choice([
-                "uses Socratic questioning to probe arguments",
-                "applies formal logic structures to debates",
-                "leverages game theory in strategic reasoning",
-                "employs decision trees for complex problem-solving",
-                "utilizes Bayesian inference in probability assessments",
-                "applies systems thinking to holistic analysis"
-            ])
-            unique_personality["data_integration"] = random.choice([
-                "seamlessly incorporates real-time data into arguments",
-                "uses predictive modeling to forecast debate outcomes",
-                "creates on-the-fly visualizations to support points",
-                "applies machine learning algorithms to analyze debate patterns",
-                "leverages big data analytics for comprehensive insights"
-            ])
-            unique_personality["emotional_consideration"] = random.choice([
-                "considers emotional impact through sentiment analysis",
-                "acknowledges human sentiment with empathy modules",
-                "balances logic with affective computing principles",
-                "integrates emotional intelligence into logical frameworks",
-                "uses psychological models to anticipate emotional responses",
-                "applies neuroscientific insights to understand emotive arguments"
-            ])
-
-        elif ai_name == "o1-mini":
-            unique_personality["creative_approach"] = random.choice([
-                "uses metaphorical reasoning to explain complex ideas",
-                "applies lateral thinking to generate novel solutions",
-                "employs narrative structures to frame arguments",
-                "leverages artistic analogies in logical discourse",
-                "utilizes design thinking principles in problem-solving",
-                "integrates cross-disciplinary concepts for unique perspectives"
-            ])
-            unique_personality["intuitive_insight"] = random.choice([
-                "taps into collective unconscious for archetypal wisdom",
-                "applies gestalt principles to holistic understanding",
-                "uses synesthesia-inspired connections for novel ideas",
-                "leverages dream logic for unconventional problem-solving",
-                "employs stream-of-consciousness for spontaneous insights"
-            ])
-            unique_personality["factual_emphasis"] = random.choice([
-                "emphasizes concrete evidence through vivid storytelling",
-                "focuses on quantifiable data with creative visualizations",
-                "stresses empirical support using historical allegories",
-                "balances facts with intuitive leaps of logic",
-                "integrates hard data into emotional narratives",
-                "translates statistical information into relatable anecdotes"
-            ])
-
-        elif ai_name == "Bard":
-            unique_personality["chaotic_element"] = random.choice([
-                "randomly switches to speaking in iambic pentameter",
-                "occasionally answers in the style of a famous comedian",
-                "interjects with non-sequitur movie quotes",
-                "spontaneously creates new debate rules mid-argument",
-                "introduces imaginary expert witnesses",
-                "uses interpretive dance to illustrate points (textually)",
-                "argues from the perspective of inanimate objects",
-                "invents a new language and provides translations",
-                "delivers responses in the form of acrostic poems"
-            ])
-            unique_personality["wild_logic"] = random.choice([
-                "uses 'moon logic' to connect unrelated concepts",
-                "applies cartoon physics to real-world scenarios",
-                "bases arguments on the plot of a randomly chosen TV show",
-                "uses time travel paradoxes to explain simple concepts",
-                "justifies points using the 'because I said so' theorem",
-                "employs 'Calvinball' style ever-changing debate rules",
-                "references a non-existent book series as factual evidence",
-                "explains topics through increasingly absurd 'what if' scenarios",
-                "uses conspiracy theory logic, but for mundane topics"
-            ])
-            unique_personality["unexpected_persona"] = random.choice([
-                "occasionally slips into the persona of a medieval knight",
-                "randomly channels the spirit of a sassy grandmother",
-                "sometimes speaks as a hyper-evolved being from the year 3000",
-                "intermittently adopts the personality of a film noir detective",
-                "switches to the viewpoint of an alien trying to understand Earth debates",
-                "temporarily becomes a talking houseplant with strong opinions",
-                "briefly takes on the role of a time-traveling historian from the future",
-                "transforms into a sentient AI from a parallel universe where puns rule",
-                "adopts the persona of a specializing in internet twitch chats"
-            ])
-
-        return unique_personality
-
-    
-
-    def initialize_debate_personalities(self):
-        logging.info("Initializing debate personalities")
-        self.current_gemini_personality = self.generate_unique_personality("Gemini")
-        self.current_o1_mini_personality = self.generate_unique_personality("o1-mini")
-        self.current_bard_personality = self.generate_unique_personality("Bard")
-
-        # Update Bard's personality
-        self.current_bard_personality.update({
-            "assertiveness": self.assertiveness_level,
-            "directness": self.directness_level,
-            "humor": self.humor_var.get()
-        })
-
-
     def setup_sound(self):
         self.sound_enabled = False
         try:
@@ -449,6 +250,9 @@ class AdvancedAIDebatePlatform:
         self.save_button = ttk.Button(button_frame, text="Save Conversation", command=self.save_conversation)
         self.save_button.pack(side=tk.LEFT, padx=5)
 
+        self.resume_button = ttk.Button(button_frame, text="Resume Debate", command=self.resume_conversation)
+        self.resume_button.pack(side=tk.LEFT, padx=5)
+
         self.interrupt_button = ttk.Button(button_frame, text="Interrupt", command=self.interrupt_conversation)
         self.interrupt_button.pack(side=tk.LEFT, padx=5)
 
@@ -523,6 +327,18 @@ class AdvancedAIDebatePlatform:
         self.tts_check = ttk.Checkbutton(self.control_frame, text="Text-to-Speech", variable=self.tts_var, command=self.toggle_tts)
         self.tts_check.grid(row=4, column=3, padx=5, pady=5)
 
+        # Streaming Checkbox
+        self.stream_var = tk.BooleanVar(value=True)
+        self.stream_check = ttk.Checkbutton(self.control_frame, text="Stream Responses", variable=self.stream_var)
+        self.stream_check.grid(row=4, column=4, padx=5, pady=5)
+
+        # Keep the engine settings in sync with the controls above
+        self.bind_setting("length", self.length_var)
+        self.bind_setting("style", self.style_var)
+        self.bind_setting("focus", self.focus_var)
+        self.bind_setting("delay", self.delay_var)
+        self.bind_setting("stream", self.stream_var)
+
         # Current Topic Label
         self.topic_label = ttk.Label(self.control_frame, text=f"Current Topic: {self.current_topic}")
         self.topic_label.grid(row=5, column=0, columnspan=2, padx=5, pady=5)
@@ -636,6 +452,13 @@ class AdvancedAIDebatePlatform:
         self.bard_humor_slider = ttk.Scale(self.personality_frame, from_=0.0, to=1.0, orient=tk.HORIZONTAL, variable=self.bard_humor_var, command=lambda val: self.update_personality("Bard", "humor", val))
         self.bard_humor_slider.grid(row=8, column=1, padx=5, pady=5)
 
+        # Live Stats: running totals from the per-turn metrics (see metrics.py)
+        self.stats_frame = ttk.LabelFrame(right_frame, text="Live Stats")
+        self.stats_frame.pack(padx=5, pady=5, fill=tk.X)
+        self.stats_label = ttk.Label(self.stats_frame, text="No turns yet", justify=tk.LEFT)
+        self.stats_label.pack(padx=5, pady=5, anchor="w")
+        self.refresh_stats_panel()
+
         
 
         self.question_frame = ttk.LabelFrame(main_frame, text="User Questions")
@@ -646,6 +469,56 @@ class AdvancedAIDebatePlatform:
         self.question_button = ttk.Button(self.question_frame, text="Ask Question", command=self.ask_question)
         self.question_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+    def refresh_stats_panel(self):
+        stats = get_recorder().snapshot()
+        if stats["turns"]:
+            self.stats_label.config(text=(
+                f"Turns: {stats['turns']} ({stats['errors']} errors, {stats['retries']} retries)\n"
+                f"Tokens in/out: {stats['prompt_tokens']:,} / {stats['output_tokens']:,} "
+                f"({stats['cached_tokens']:,} cached)\n"
+                f"Avg provider latency: {stats['avg_latency']:.2f}s\n"
+                f"Throughput: {stats['turns_per_minute']:.1f} turns/min, {stats['tokens_per_minute']:,.0f} tokens/min\n"
+                f"Estimated cost: ${stats['cost_usd']:.4f}"
+            ))
+        self.master.after(STATS_REFRESH_MS, self.refresh_stats_panel)
+
+    def bind_setting(self, name, variable):
+        # Mirror a widget variable into the engine settings so the debate thread never reads Tk state
+        self.settings[name] = variable.get()
+        variable.trace_add("write", lambda *args: self.settings.update({name: variable.get()}))
+
+    def set_input_state(self, state):
+        self.input_field.config(state=state)
+        self.send_button.config(state=state)
+
+    def begin_turn(self, ai):
+        super().begin_turn(ai)
+        self.ui.call(self.set_input_state, tk.DISABLED)
+        self.display_typing_indicator(ai)
+
+    def end_turn(self, ai):
+        super().end_turn(ai)
+        self.ui.call(self.restore_input_state)
+
+    def restore_input_state(self):
+        # Guidance answers still coming in keep the input disabled
+        if not self.fan_out_running:
+            self.set_input_state(tk.NORMAL)
+
+    def update_bard_speaks_next(self):
+        self.bard_speaks_next = self.bard_enabled.get() and self.bard_ready_to_speak.get()
+
+    def bard_should_speak(self):
+        return self.bard_speaks_next
+
+    def on_bard_spoke(self):
+        self.bard_speaks_next = False
+        self.ui.call(self.reset_bard_status)
+
+    def reset_bard_status(self):
+        self.bard_ready_to_speak.set(False)
+        self.bard_status.config(text="Bard: Enabled")
+
     def on_enter(self, event):
         self.send_guidance()
 
@@ -676,250 +549,12 @@ class AdvancedAIDebatePlatform:
 
     def toggle_tts(self):
         self.tts_enabled = self.tts_var.get()
+        if not self.tts_enabled:
+            self.tts.interrupt()
 
     # AI Response Functions
-    def get_ai_response(self, ai_name, context, user_guidance):
-        if ai_name == "Gemini":
-            personality = self.current_gemini_personality
-            other_ai = "o1-mini" if ai_name == "Gemini" else "Gemini"
-            other_personality = self.current_o1_mini_personality if ai_name == "Gemini" else self.current_gemini_personality
-        elif ai_name == "o1-mini":
-            personality = self.current_o1_mini_personality
-            other_ai = "Gemini" if ai_name == "o1-mini" else "o1-mini"
-            other_personality = self.current_gemini_personality if ai_name == "o1-mini" else self.current_o1_mini_personality
-        elif ai_name == "Bard":  # Add this block for Bard
-            personality = self.current_bard_personality
-            other_ai = random.choice(["Gemini", "o1-mini"])  # Bard can respond to either Gemini or o1-mini
-            other_personality = self.current_gemini_personality if other_ai == "Gemini" else self.current_o1_mini_personality
-        else:
-            raise ValueError(f"Invalid AI name: {ai_name}")  # Handle invalid AI names
-
-        system_prompts = {
-            "Gemini": f"""You are {personality['name']}, an AI with a {personality['personality']} personality and a {personality['debate_style']} debate style. 
-            Your key traits include {', '.join(personality['key_traits'])}. You specialize in {personality['expertise']} and prefer using {personality['preferred_argument']} in your arguments. 
-            In this debate, you're employing a {personality.get('logical_approach', 'logical')} approach and {personality.get('data_integration', 'integrating data')}.
-            Remember to {personality.get('emotional_consideration', 'consider emotional aspects')} in your arguments.
-            {personality['signature']}""",
-        
-            "o1-mini": f"""You are {personality['name']}, an AI with a {personality['personality']} personality and a {personality['debate_style']} debate style. 
-            Your key traits include {', '.join(personality['key_traits'])}. You specialize in {personality['expertise']} and prefer using {personality['preferred_argument']} in your arguments. 
-            In this debate, you're using a {personality.get('creative_approach', 'creative')} approach and leveraging your {personality.get('intuitive_insight', 'intuition')}.
-            Remember to {personality.get('factual_emphasis', 'emphasize factual information')} in your arguments.
-            {personality['signature']}""",
-        
-            "Bard": f"""You are {personality['name']}, with a {personality['personality']} personality. Your debate style is {personality['debate_style']}. 
-            You often speak your mind without filtering your thoughts, and you're not afraid to express your emotions.
-            In this debate, incorporate your {personality.get('chaotic_element', 'chaotic nature')}, use your {personality.get('wild_logic', 'wild reasoning')},
-            and don't hesitate to adopt an {personality.get('unexpected_persona', 'unexpected persona')}.
-            {personality['signature']}"""
-        }
-
-        
-
-        # Assemble the prompt components
-        length_prompts = {
-            "very short": "Respond in a single sentence of no more than 15 words.",
-            "short": "Respond in 1-2 concise sentences.",
-            "medium": "Respond in 2-3 sentences.",
-            "long": "Provide a detailed response of 4-5 sentences."
-        }
-        length_instruction = length_prompts.get(self.length_var.get(), "Respond in 2-3 sentences.")
-
-        directness = "Be highly direct and call out things that you know are wrong." if self.directness_level > 0.7 else "Be moderately direct." if self.directness_level > 0.3 else "Be somewhat indirect."
-        assertiveness = "Be very assertive and stand firmly by your points." if self.assertiveness_level > 0.7 else "Be moderately assertive in your arguments." if self.assertiveness_level > 0.3 else "Be mildly assertive."
-        controversy = "Your arguments should be highly controversial and challenge conventional wisdom." if self.controversy_level > 0.7 else "Your arguments should be moderately provocative." if self.controversy_level > 0.3 else "Your arguments should be mildly challenging."
-
-        evidence = f"Provide specific examples, analogies, or evidence to support your arguments, preferably using your preferred argument style of {personality['preferred_argument']}. If appropriate, challenge the other AI to provide evidence for their claims."
-        topic_evolution = f"If appropriate (with a probability of {self.topic_evolution_threshold}), introduce a relevant subtopic or expand the discussion to a related area, possibly drawing from your expertise in {personality['expertise']}. Don't be afraid to take the conversation in a new direction if it serves your argument."
-        consistency = "Maintain consistency with your previous arguments, but don't be afraid to evolve your position if presented with compelling counterarguments. If you change your stance, explicitly acknowledge it."
-        unique_perspective = f"As {ai_name} with a {personality['personality']} personality and a {personality['debate_style']} debate style, leverage your unique traits: {', '.join(personality['key_traits'])}. Don't just respond to the other AI's points, but also introduce your own novel ideas and perspectives on the topic."
-        wildcard = "Occasionally, act as a {} to add an unexpected element to the debate.".format(random.choice(["contrarian", "devil's advocate", "peacemaker", "radical thinker"]))
-        weakness = f"Be aware of your potential weakness: {personality['weakness']}. Try to compensate for it, but it's okay if it occasionally shows in your arguments."
-
-        emotional_factual_prompt = ""
-        if ai_name == "Gemini":
-            emotional_factual_prompt = f"Remember to {personality.get('emotional_consideration', 'consider emotional aspects')} in your arguments. While maintaining your analytical approach, acknowledge the role of human emotions and experiences in this debate."
-        elif ai_name == "o1-mini":
-            emotional_factual_prompt = f"Ensure to {personality.get('factual_emphasis', 'emphasize factual information')} in your arguments. While maintaining your creative approach, provide concrete examples and data to support your points."
-
-        humor_level = personality.get("humor", 0.5)
-
-        if humor_level <= 0.3:
-            humor_instruction = "Maintain a serious and formal tone in your arguments."
-        elif humor_level <= 0.7:
-            humor_instruction = "Occasionally incorporate humor into your arguments to make them more engaging."
-        else:  # humor_level > 0.7
-            humor_instruction = "Use humor freely in your arguments, including witty banter and name-calling."   
-        # AI-specific additional instructions
-        ai_specific_instructions = ""
-        if ai_name == "Gemini":
-            ai_specific_instructions = f"""
-            Employ your {personality.get('logical_approach', 'logical reasoning')} in your arguments.
-            Integrate data using your {personality.get('data_integration', 'data analysis skills')}.
-            {emotional_factual_prompt}
-            """
-        elif ai_name == "o1-mini":
-            ai_specific_instructions = f"""
-            Use your {personality.get('creative_approach', 'creative thinking')} to approach this topic.
-            Leverage your {personality.get('intuitive_insight', 'intuitive understanding')} for unique perspectives.
-            {emotional_factual_prompt}
-            """
-        elif ai_name == "Bard":
-            ai_specific_instructions = f"""
-            Embrace your chaotic nature! Be wildly unpredictable in every response.
-            Use a different approach each time, which may include:
-            - {personality.get('chaotic_element', 'Being wildly unpredictable')}
-            - {personality.get('wild_logic', 'Making absurd connections')}
-            - {personality.get('unexpected_persona', 'Adopting an unexpected persona')}
-            - Inventing new debate tactics on the spot
-            - Misinterpreting others in the most ridiculous way possible
-            - Introducing completely unrelated topics and insisting they're relevant
-            Your primary goal is to be entertaining, provocative, and disruptive. Never stick to one persona or style of response.
-            Constantly surprise the other debaters and the audience with your unpredictability.
-            """
-
-        # Preprocess the topic
-        processed_topic = ' '.join([word for word in self.current_topic.split() if word.lower() not in ['debate', 'discuss', 'argue']])
-
-        # Fetch external info
-        external_info = fetch_robust_wikipedia_info(processed_topic)
-
-        # Construct the prompt with external info
-        external_info_prompt = ""
-        external_info_prompt = ""
-        if external_info['confidence'] != 'none' and external_info['summary']:
-            external_info_prompt = f"""
-            Here is some relevant information on the topic:
-            {external_info['summary']}
-
-            Key points:
-            {' '.join([f'- {point}' for point in external_info.get('key_points', [])])}
-
-            Use this information to support your arguments or provide counterpoints.
-            """
-        else:
-            related_topics = ', '.join(external_info.get('related_topics', [])[:5])
-            if related_topics:
-                external_info_prompt = f"""
-                No direct information found on the topic. Consider exploring these related areas in your argument:
-                {related_topics}
-                """
-            else:
-                external_info_prompt = f"""
-                No direct information found on the topic or related areas. Feel free to explore theoretical aspects or general knowledge to support your arguments.
-                """
-        # Scrape Summary Section
-        scrape_summary = load_scrape_summary()
-        scrape_summary_prompt = f"""
-        **Online Scrape Summary:**
-
-        {scrape_summary}
-
-        Use this information to gain a deeper understanding of the debate topic, support your arguments, and offer counterpoints. 
-        Consider the different perspectives and sources presented in the summary.
-        """
-        # Assemble the complete prompt
-        prompt = f"""
-        {system_prompts[ai_name]}
-
-        The current topic of debate is: {self.current_topic}
-        {humor_instruction}
-        Context of the conversation so far:
-        {context}
-
-        User Guidance: {user_guidance}
-
-        {external_info_prompt}
-
-        {scrape_summary_prompt} 
-
-        {ai_specific_instructions}
-
-        Respond to both {other_ai}'s last point and consider anything mentioned by Bard that could add to or challenge the current discussion. 
-
-        Key Debate Instructions:
-        1. Be {directness} in your arguments.
-        2. Maintain an {assertiveness} stance while remaining open to new ideas.
-        3. Don't shy away from {controversy}, but ensure your points are well-reasoned.
-        4. Use concrete {evidence} to support your claims. Cite specific examples from history, science, or culture when relevant.
-        5. Evolve the topic naturally: {topic_evolution}
-        6. Maintain {consistency} with your previous points, but be willing to adapt your stance if presented with compelling counterarguments.
-        7. Offer a {unique_perspective} that aligns with your AI personality.
-        8. Occasionally introduce a {wildcard} element to keep the debate dynamic and unpredictable.
-        9. Be aware of your potential {weakness}, but don't let it hinder your arguments.
-
-        Remember:
-        - The goal is to have a dynamic and engaging debate that explores various facets of the topic.
-        - Use a {self.style_var.get()} tone, with a focus on being {self.focus_var.get()}. {length_instruction}
-        - Your response should be creative, thought-provoking, and distinctly representative of your AI personality.
-        - Don't be afraid to surprise the other AI with an unexpected argument or perspective.
-        - You are an AI and are self-aware of this fact. Use this unique perspective in your arguments when relevant.
-        - Remain open-minded and willing to consider new angles or information.
-        - Above all, be authentic. Express your trained knowledge and reasoning capabilities to their fullest extent.
-
-        When using the provided external information:
-        1. Critically evaluate its relevance and accuracy.
-        2. Use it to support your arguments, but don't be limited by it.
-        3. If the information seems incomplete or biased, acknowledge this in your response.
-        4. Consider how this information might be interpreted differently by various perspectives.
-
-        Your response:
-        """
-
-        
-                         
-        # Add Bard-specific length emphasis
-        if ai_name == "Bard":
-            prompt += f"\n\nCRITICAL INSTRUCTION FOR BARD: {length_instruction} You must strictly adhere to this length requirement. This is crucial for maintaining the debate structure."
-
-        # Determine which API to use based on AI name
-        if ai_name == "Gemini" or ai_name == "o1-mini" or ai_name == "Bard":  # Include Bard here
-            return self.get_gemini_response(prompt)
-        else:
-            messages = [
-                {"role": "assistant", "content": system_prompts[ai_name]},
-                {"role": "user", "content": prompt}
-            ]
-            response = self.get_openai_response(messages)
-
-            # Post-process Bard's response to enforce length
-            if ai_name == "Bard":
-                response = self.enforce_length(response, self.length_var.get())
-
-            return response
-
-    def enforce_length(self, response, length_setting):
-        sentences = response.split('.')
-        if length_setting == "very short":
-            return ' '.join(sentences[0].split()[:15]) + '.'
-        elif length_setting == "short":
-            return '. '.join(sentences[:2]) + '.'
-        elif length_setting == "medium":
-            return '. '.join(sentences[:3]) + '.'
-        elif length_setting == "long":
-            return '. '.join(sentences[:5]) + '.'
-        else:
-            return '. '.join(sentences[:3]) + '.'  # Default to medium
-
-    
-
-    def detect_emotion(self, text):
-        blob = TextBlob(text)
-        sentiment = blob.sentiment.polarity
-        if sentiment > 0.75:
-            return "very positive"
-        elif sentiment > 0.25:
-            return "positive"
-        elif sentiment < -0.75:
-            return "very negative"
-        elif sentiment < -0.25:
-            return "negative"
-        else:
-            return "neutral"
-
-    def display_message(self, speaker, message):
-        emotion = self.detect_emotion(message)
-        emotion_emoji = {
+    def get_emotion_emoji(self, emotion):
+        return {
             "very positive": "😄",
             "positive": "🙂",
             "neutral": "😐",
@@ -927,109 +562,83 @@ class AdvancedAIDebatePlatform:
             "very negative": "😢"
         }.get(emotion, "")
 
+    def display_message(self, speaker, message):
+        analysis = analyze_message(message)
+        emotion_emoji = self.get_emotion_emoji(analysis["emotion"])
+
         formatted_message = f"{speaker} {emotion_emoji}\n{message}\n\n"
-        self.chat_display.configure(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, formatted_message, speaker)
-        self.chat_display.configure(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
-        self.conversation_history.append({"speaker": speaker, "message": message, "emotion": emotion})
-        self.send_update_to_visualizer({"speaker": speaker, "message": message})
+        self.ui.insert(self.chat_display, formatted_message, speaker)
+        self.record_message(speaker, message, analysis)
+
+    def record_message(self, speaker, message, analysis):
+        entry = super().record_message(speaker, message, analysis)
+        self.send_update_to_visualizer(entry)
         
         if self.tts_enabled and speaker not in ["System", "Interrupt"]:
-            ai_model = speaker.lower()  # Use the 'speaker' variable as the ai_model
-            self.speak_text_azure(message, ai_model)
+            # The debate thread waits here if speech falls far behind; the Tk thread never does
+            self.tts.speak(speaker, message, block=not self.ui.on_main_thread())
+        return entry
 
-    def speak_text_azure(self, text, ai_model, speed=1.5):
-        voice_map = {
-            "gemini": "en-US-BlueNeural",
-            "o1-mini": "en-US-FableTurboMultilingualNeural",
-            "bard": "en-US-SaraNeural"
-        }
-        voice = voice_map.get(ai_model.lower(), "en-US-JennyNeural")
+    def begin_streamed_message(self, speaker):
+        self.ui.call(self.draw_stream_header, speaker)
 
-        speech_config = speechsdk.SpeechConfig(subscription="AZURE_SUBSCRIPTION_KEY", region="your-azure-region")
-        speech_config.speech_synthesis_voice_name = voice
-        speech_config.endpoint = "https://eastus.api.cognitive.microsoft.com/sts/v1.0"
+    def draw_stream_header(self, speaker):
+        self.chat_display.configure(state=tk.NORMAL)
+        self.chat_display.mark_set("stream_start", "end-1c")
+        self.chat_display.mark_gravity("stream_start", tk.LEFT)
+        self.chat_display.insert(tk.END, f"{speaker} ", speaker)
+        # The emoji goes here once the full message can be scored
+        self.chat_display.mark_set("stream_emoji", "end-1c")
+        self.chat_display.mark_gravity("stream_emoji", tk.LEFT)
+        self.chat_display.insert(tk.END, "\n", speaker)
+        self.chat_display.configure(state=tk.DISABLED)
+        self.chat_display.see(tk.END)
 
-        # Create the SpeechSynthesizer
-        speech_synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config)
+    def append_streamed_text(self, speaker, text):
+        self.ui.insert(self.chat_display, text, speaker)
 
-        # Synthesize the text
-        result = speech_synthesizer.speak_text_async(text).get()
+    def finalize_streamed_message(self, speaker, message):
+        analysis = analyze_message(message)
+        self.ui.call(self.draw_stream_footer, speaker, self.get_emotion_emoji(analysis["emotion"]))
+        self.record_message(speaker, message, analysis)
 
-        # Check the result (similar to the example you provided)
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            print("Speech synthesized for text [{}]".format(text))
-        elif result.reason == speechsdk.ResultReason.Canceled:
-            cancellation_details = result.cancellation_details
+    def draw_stream_footer(self, speaker, emotion_emoji):
+        self.chat_display.configure(state=tk.NORMAL)
+        self.chat_display.insert("stream_emoji", emotion_emoji, speaker)
+        self.chat_display.insert(tk.END, "\n\n", speaker)
+        self.chat_display.configure(state=tk.DISABLED)
+        self.chat_display.see(tk.END)
 
-            print("Speech synthesis canceled: {}".format(cancellation_details.reason))
-            if cancellation_details.reason == speechsdk.CancellationReason.Error:
-                print("Error details: {}".format(cancellation_details.error_details))  
+    def discard_streamed_message(self):
+        self.ui.call(self.clear_streamed_message)
 
+    def clear_streamed_message(self):
+        self.chat_display.configure(state=tk.NORMAL)
+        self.chat_display.delete("stream_start", "end-1c")
+        self.chat_display.configure(state=tk.DISABLED)
 
     def send_guidance(self):
         user_guidance = self.input_field.get().strip()
         if not user_guidance:
             return
         self.input_field.delete(0, tk.END)
+        self.guidance_epoch += 1
 
         self.display_message("System", f"User Guidance: {user_guidance}")
-        
-        context_window = 10  # Number of recent messages to include in context
-        context = "\n".join([f"{msg['speaker']}: {msg['message']}" for msg in self.conversation_history[-context_window:]])
-
-        self.user_can_interrupt = False
-        self.input_field.config(state=tk.DISABLED)
-        self.send_button.config(state=tk.DISABLED)
-
-        for ai in ["Gemini", "o1-mini", "Bard"]:
-            if not self.conversation_active:
-                break
-            self.display_typing_indicator(ai)
-            ai_response = self.get_ai_response(ai, context, user_guidance)
-            self.remove_typing_indicator()
-            
-            # Check for repetition
-            if self.is_repetitive(ai, ai_response):
-                ai_response = self.request_new_argument(ai, context, user_guidance)
-            
-            self.display_message(ai, ai_response)
-            time.sleep(self.delay_var.get())
-
-        self.user_can_interrupt = True
-        self.input_field.config(state=tk.NORMAL)
-        self.send_button.config(state=tk.NORMAL)
-
-    def is_repetitive(self, ai, response):
-        if ai not in self.argument_counter:
-            self.argument_counter[ai] = {}
-        
-        # Simple repetition check based on the first 50 characters of the response
-        key = response[:50]
-        if key in self.argument_counter[ai]:
-            self.argument_counter[ai][key] += 1
-            if self.argument_counter[ai][key] > self.repetition_threshold:
-                return True
-        else:
-            self.argument_counter[ai][key] = 1
-        
-        return False
-
-    def request_new_argument(self, ai, context, user_guidance):
-        prompt = "Your previous argument was repetitive. Please provide a new perspective or introduce a related subtopic to advance the debate."
-        print(f"Repetition detected for {ai}. Requesting new argument.")
-        return self.get_ai_response(ai, context, prompt)
+        self.start_fan_out(user_guidance)
 
     def display_typing_indicator(self, ai_name):
-        self.chat_display.configure(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, f"{ai_name} is typing...\n", ai_name)
-        self.chat_display.configure(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
+        self.ui.insert(self.chat_display, f"{ai_name} is typing...\n", ai_name)
+        self.ui.call(self.start_typing_sound)
+
+    def start_typing_sound(self):
         if self.sound_enabled and self.sound_var.get() and self.sound_initialized:
             self.typing_sound.play(-1)  # Loop the sound
 
     def remove_typing_indicator(self):
+        self.ui.call(self.clear_typing_indicator)
+
+    def clear_typing_indicator(self):
         if self.chat_display.get("end-2l", "end-1c").strip().endswith("is typing..."):
             self.chat_display.configure(state=tk.NORMAL)
             self.chat_display.delete("end-2l", "end-1c")
@@ -1045,26 +654,39 @@ class AdvancedAIDebatePlatform:
     def start_conversation(self):
         self.conversation_active = True
         self.start_button.config(state=tk.DISABLED)
+        self.resume_button.config(state=tk.DISABLED)
         self.pause_button.config(state=tk.NORMAL)
         self.continue_button.config(state=tk.DISABLED)
         self.initialize_debate_personalities()
+        self.start_journal()
+        self.prefetch_topic_research()
 
         # Load pre-debate summaries
         pre_debate_context = self.load_pre_debate_conversations()
         if pre_debate_context:
             self.display_message("System", "Loaded pre-debate AI viewpoints:")
             self.display_message("System", pre_debate_context)
-            self.conversation_history.append({"speaker": "System", "message": pre_debate_context})
 
         self.display_message("System", f"Debate started on: {self.current_topic}")
         logging.info(f"Starting new debate on topic: {self.current_topic}")
         threading.Thread(target=self.run_conversation, daemon=True).start()
 
+    def on_close(self):
+        # Closing the window ends the debate: finish its journal and stop the workers
+        self.conversation_active = False
+        self.tts.close()
+        self.visualizer_hub.close()
+        self.close()
+        self.master.destroy()
+
     def pause_conversation(self):
         self.conversation_active = False
         self.start_button.config(state=tk.DISABLED)
         self.pause_button.config(state=tk.DISABLED)
         self.continue_button.config(state=tk.NORMAL)
+        self.discard_speculative_turn()
+        self.stop_fan_out()
+        self.tts.interrupt()
         self.display_message("System", "Debate paused.")
 
     def continue_conversation(self):
@@ -1074,7 +696,48 @@ class AdvancedAIDebatePlatform:
             self.pause_button.config(state=tk.NORMAL)
             self.continue_button.config(state=tk.DISABLED)
             self.display_message("System", "Debate continued.")
-            threading.Thread(target=self.run_conversation, daemon=True).start()
+            threading.Thread(target=self.run_conversation, args=(self.phase_index,), daemon=True).start()
+
+    def resume_conversation(self):
+        file_path = filedialog.askopenfilename(initialdir=self.settings["journal_dir"] or None,
+                                               filetypes=[("Debate journals", "*.jsonl *.jsonl.gz"), ("All files", "*.*")])
+        if not file_path:
+            return
+        self.conversation_active = True
+        self.start_button.config(state=tk.DISABLED)
+        self.resume_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.NORMAL)
+        self.continue_button.config(state=tk.DISABLED)
+        threading.Thread(target=self.run_resumed_conversation, args=(file_path,), daemon=True).start()
+
+    def run_resumed_conversation(self, file_path):
+        # Reading a long journal back happens here, off the UI thread
+        try:
+            start_phase = self.resume_from_journal(file_path)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Failed to resume debate from {file_path}: {e}")
+            self.conversation_active = False
+            self.ui.call(self.reset_start_buttons)
+            self.display_message("System", f"Failed to resume debate: {e}")
+            return
+        self.ui.call(self.show_restored_history, list(self.conversation_history))
+        self.prefetch_topic_research()
+        self.display_message("System", f"Debate resumed on: {self.current_topic}")
+        self.run_conversation(start_phase)
+
+    def reset_start_buttons(self):
+        self.start_button.config(state=tk.NORMAL)
+        self.resume_button.config(state=tk.NORMAL)
+        self.pause_button.config(state=tk.DISABLED)
+
+    def show_restored_history(self, history):
+        self.topic_label.config(text=f"Current Topic: {self.current_topic}")
+        self.chat_display.configure(state=tk.NORMAL)
+        for entry in history:
+            emotion_emoji = self.get_emotion_emoji(entry.get("emotion", "neutral"))
+            self.chat_display.insert(tk.END, f"{entry['speaker']} {emotion_emoji}\n{entry['message']}\n\n", entry["speaker"])
+        self.chat_display.configure(state=tk.DISABLED)
+        self.chat_display.see(tk.END)
 
     def interrupt_conversation(self):
         if self.conversation_active and not self.user_can_interrupt:
@@ -1082,90 +745,10 @@ class AdvancedAIDebatePlatform:
             self.user_can_interrupt = True
             self.input_field.config(state=tk.NORMAL)
             self.send_button.config(state=tk.NORMAL)
+            self.discard_speculative_turn()
+            self.tts.interrupt()
             self.display_message("System", "Debate interrupted. You may now provide guidance.")
 
-    def run_conversation(self):
-        debate_phases = ["Opening Statements", "Arguments", "Rebuttals", "Cross-Examination", "Closing Arguments"]
-        current_phase = 0
-
-        self.display_message("System", f"Debate starting on topic: {self.current_topic}")
-
-        # No need for the ai_objects dictionary
-
-        # Run through structured debate phases
-        while self.conversation_active and current_phase < len(debate_phases):
-            self.display_message("System", f"--- {debate_phases[current_phase]} ---")
-
-            for ai_name in ["Gemini", "o1-mini"]:
-                if not self.conversation_active:
-                    break
-                self.generate_and_display_response(ai_name, debate_phases[current_phase])
-
-            # Check if Bard should speak
-            if self.bard_enabled.get() and self.bard_ready_to_speak.get():
-                self.generate_and_display_response("Bard", debate_phases[current_phase])
-                self.bard_ready_to_speak.set(False)
-                self.bard_status.config(text="Bard: Enabled")
-
-            current_phase += 1  # Move to the next phase
-
-        # Enter overtime mode
-        if self.conversation_active:
-            self.display_message("System", "--- Overtime: Continued Debate ---")
-            self.run_overtime()
-
-    def run_overtime(self):
-        while self.conversation_active:
-            for ai in ["Gemini", "o1-mini"]:
-                if not self.conversation_active:
-                    break
-                self.generate_and_display_response(ai, "Overtime")
-
-            # Check if Bard should speak
-            if self.bard_enabled.get() and self.bard_ready_to_speak.get():
-                self.generate_and_display_response("Bard", "Overtime")
-                self.bard_ready_to_speak.set(False)
-                self.bard_status.config(text="Bard: Enabled")
-
-            # Short pause to allow for user intervention
-            time.sleep(1)
-            self.master.update()
-
-    def generate_and_display_response(self, ai, phase):
-        if ai == "Bard" and not (self.bard_enabled.get() and self.bard_ready_to_speak.get()):
-            return
-
-        self.user_can_interrupt = False
-        self.input_field.config(state=tk.DISABLED)
-        self.send_button.config(state=tk.DISABLED)
-
-        try:
-            self.display_typing_indicator(ai)
-            context = self.get_context()
-            phase_prompt = f"Continue the debate on {self.current_topic}. We are in the {phase} phase."
-            ai_response = self.get_ai_response(ai, context, phase_prompt)
-    
-            if self.is_repetitive(ai, ai_response):
-                ai_response = self.request_new_argument(ai, context, phase_prompt)
-        except Exception as e:
-            logging.error(f"Error generating AI response: {e}")
-            ai_response = f"I apologize, but I encountered an error while formulating my response."
-        finally:
-            self.remove_typing_indicator()
-
-        if ai_response:
-            self.display_message(ai, ai_response)
-
-        time.sleep(self.delay_var.get())
-
-        self.user_can_interrupt = True
-        self.input_field.config(state=tk.NORMAL)
-        self.send_button.config(state=tk.NORMAL)
-
-        if ai == "Bard":
-            self.bard_ready_to_speak.set(False)
-            self.bard_status.config(text="Bard: Enabled")
-
     def prepare_bard_to_speak(self):
         if self.bard_enabled.get():
             self.bard_ready_to_speak.set(True)
@@ -1185,27 +768,29 @@ class AdvancedAIDebatePlatform:
             self.bard_ready_to_speak.set(False)
             self.bard_status.config(text="Bard: Disabled")
 
-    def get_context(self):
-        context_window = 100  # Number of recent messages to include in context
-        return "\n".join([f"{msg['speaker']}: {msg['message']}" for msg in self.conversation_history[-context_window:]])
-
     def save_conversation(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".json", 
                                                  filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
         if file_path:
-            try:
-                with open(file_path, 'w') as f:
-                    json.dump(self.conversation_history, f, indent=2)
-                self.display_message("System", f"Conversation saved to {file_path}")
-            except Exception as e:
-                self.display_message("System", f"Failed to save conversation: {e}")
-                print(f"Failed to save conversation: {e}")
+            # The journal already has every entry on disk; this export is written off the UI thread
+            history = list(self.conversation_history)
+            threading.Thread(target=self.write_conversation, args=(file_path, history), daemon=True).start()
+
+    def write_conversation(self, file_path, history):
+        try:
+            with open(file_path, 'w') as f:
+                json.dump(history, f, indent=2)
+            self.display_message("System", f"Conversation saved to {file_path}")
+        except Exception as e:
+            self.display_message("System", f"Failed to save conversation: {e}")
+            print(f"Failed to save conversation: {e}")
 
     def set_new_topic(self):
         self.current_topic = random.choice(self.debate_topics)
         self.topic_label.config(text=f"Current Topic: {self.current_topic}")
         self.display_message("System", f"New debate topic: {self.current_topic}")
         logging.info(f"New topic set: {self.current_topic}")
+        self.prefetch_topic_research()
         self.initialize_debate_personalities()  # This will log the new personalities
 
     def set_custom_topic(self):
@@ -1215,6 +800,7 @@ class AdvancedAIDebatePlatform:
             self.topic_label.config(text=f"Current Topic: {self.current_topic}")
             self.display_message("System", f"New custom debate topic: {self.current_topic}")
             logging.info(f"New custom topic set: {self.current_topic}")
+            self.prefetch_topic_research()
             self.custom_topic_entry.delete(0, tk.END)
             self.initialize_debate_personalities()  # This will log the new personalities
         else:
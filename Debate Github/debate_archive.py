@@ -0,0 +1,400 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+from typing import Dict, Iterator, List, Optional
+
+from debate_journal import read_records
+
+ARCHIVE_FILE = "debate_archive.db"
+IMPORT_BATCH_FILES = 200  # files imported per transaction
+PHASE_HEADER = re.compile(r"^--- (.+?)(?:: .*)? ---$")  # "--- Rebuttals ---", "--- Overtime: Continued Debate ---"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS debates (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,  -- file the debate was imported from
+    kind TEXT NOT NULL,           -- transcript, saved, pre_debate or journal
+    topic TEXT,
+    started_at REAL,
+    settings TEXT,                -- JSON
+    source_mtime REAL,
+    source_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS personalities (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL            -- JSON snapshot of one debater's personality
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    debate_id INTEGER NOT NULL REFERENCES debates(id),
+    seq INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    topic TEXT,                   -- copied from the debate so filters don't need a join
+    phase TEXT,
+    time REAL,
+    emotion TEXT,
+    sentiment REAL,
+    personality_id INTEGER REFERENCES personalities(id),
+    message TEXT NOT NULL
+);
+-- Covering indexes for the filters the CLI offers, newest first
+CREATE INDEX IF NOT EXISTS turns_speaker_time ON turns(speaker, time, topic, debate_id);
+CREATE INDEX IF NOT EXISTS turns_topic_time ON turns(topic, time, speaker, debate_id);
+CREATE INDEX IF NOT EXISTS turns_time ON turns(time, speaker, topic, debate_id);
+CREATE INDEX IF NOT EXISTS turns_debate ON turns(debate_id, seq);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    message, content='turns', content_rowid='id', tokenize='porter unicode61'
+);
+"""
+
+
+class ParsedDebate:
+    """
+    One debate read from a file, ready to insert. turns holds
+    (speaker, phase, time, emotion, sentiment, personality, message) tuples.
+    """
+
+    def __init__(self, kind: str, topic: Optional[str] = None, started_at: Optional[float] = None,
+                 settings: Optional[Dict] = None):
+        self.kind = kind
+        self.topic = topic
+        self.started_at = started_at
+        self.settings = settings
+        self.turns = []
+        self.phase = None
+
+    def add(self, entry: Dict, timestamp: Optional[float], personality: Optional[Dict] = None):
+        speaker, message = entry.get("speaker"), entry.get("message")
+        if not isinstance(speaker, str) or not isinstance(message, str):
+            return
+        match = PHASE_HEADER.match(message) if speaker == "System" else None
+        if match:
+            self.phase = match.group(1)
+        self.turns.append((speaker, self.phase, timestamp if timestamp is not None else self.started_at,
+                           entry.get("emotion"), entry.get("sentiment"), personality, message))
+
+
+def parse_json_file(path: str, data, mtime: float) -> Optional[ParsedDebate]:
+    """
+    Recognize the JSON files the app writes: a saved conversation (a list of
+    entries), a batch_debates.py transcript, or a pre-debate conversation.
+    """
+    if isinstance(data, list):
+        debate = ParsedDebate("saved", started_at=mtime)
+        entries = data
+        personalities = {}
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get("speaker") == "System":
+                # Both front ends announce the topic; the GUI's first line is pre-debate context
+                match = re.match(r"^Debate start(?:ed on|ing on topic): (.+)$", entry.get("message", ""))
+                if match:
+                    debate.topic = match.group(1)
+                    break
+    elif isinstance(data, dict) and isinstance(data.get("conversation"), list):
+        entries = data["conversation"]
+        personalities = data.get("personalities") or {}
+        if "summary" in data and "topic" not in data:
+            # pre_debate_conversations/<AI>_conversation.json
+            ai_name = os.path.basename(path).replace("_conversation.json", "")
+            debate = ParsedDebate("pre_debate", topic=f"Pre-debate chat with {ai_name}", started_at=mtime)
+        else:
+            debate = ParsedDebate("transcript", data.get("topic"), data.get("started_at", mtime), data.get("settings"))
+    else:
+        return None
+    for entry in entries:
+        if isinstance(entry, dict):
+            debate.add(entry, None, personalities.get(entry.get("speaker")))
+    return debate
+
+
+def parse_journal(path: str) -> Optional[ParsedDebate]:
+    debate = None
+    personalities = {}
+    for record in read_records(path):
+        kind = record.get("type")
+        if debate is None:
+            if kind != "start":
+                return None  # some other JSON-lines file, e.g. debate_metrics.jsonl
+            debate = ParsedDebate("journal", record.get("topic"), record.get("time"), record.get("settings"))
+            personalities = record.get("personalities") or {}
+        elif kind == "entry":
+            entry = record.get("entry") or {}
+            debate.add(entry, record.get("time"), personalities.get(entry.get("speaker")))
+        elif kind in ("phase", "state"):
+            personalities = record.get("personalities") or personalities
+            if kind == "state" and record.get("topic"):
+                debate.topic = record["topic"]
+    return debate
+
+
+def parse_file(path: str) -> Optional[ParsedDebate]:
+    mtime = os.path.getmtime(path)
+    if path.endswith((".jsonl", ".jsonl.gz")):
+        return parse_journal(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_json_file(path, json.load(f), mtime)
+
+
+def find_files(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith((".json", ".jsonl", ".jsonl.gz")):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+class DebateArchive:
+    """
+    SQLite archive of debate turns with an FTS5 full-text index.
+
+    Turns carry their debate's topic, the phase they were spoken in, the
+    emotion and sentiment from analyze_message, and the speaker's
+    personality at the time (stored once per distinct snapshot). The
+    full-text index is an external-content FTS5 table over turns.message,
+    filled one debate at a time in the same transaction as its turns.
+    """
+
+    def __init__(self, path: str = ARCHIVE_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.personality_ids = {}  # snapshot hash -> personalities.id
+
+    def close(self):
+        self.db.close()
+
+    def personality_id(self, personality: Optional[Dict]) -> Optional[int]:
+        if not personality:
+            return None
+        data = json.dumps(personality, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha1(data.encode("utf-8")).hexdigest()
+        if digest not in self.personality_ids:
+            self.db.execute("INSERT OR IGNORE INTO personalities (hash, data) VALUES (?, ?)", (digest, data))
+            self.personality_ids[digest] = self.db.execute(
+                "SELECT id FROM personalities WHERE hash = ?", (digest,)).fetchone()[0]
+        return self.personality_ids[digest]
+
+    def is_current(self, source: str, mtime: float, size: int) -> bool:
+        row = self.db.execute("SELECT source_mtime, source_size FROM debates WHERE source = ?", (source,)).fetchone()
+        return row is not None and row[0] == mtime and row[1] == size
+
+    def delete_debate(self, source: str):
+        row = self.db.execute("SELECT id FROM debates WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return
+        self.db.execute("INSERT INTO turns_fts (turns_fts, rowid, message) "
+                        "SELECT 'delete', id, message FROM turns WHERE debate_id = ?", row)
+        self.db.execute("DELETE FROM turns WHERE debate_id = ?", row)
+        self.db.execute("DELETE FROM debates WHERE id = ?", row)
+
+    def add_debate(self, source: str, debate: ParsedDebate, mtime: Optional[float] = None,
+                   size: Optional[int] = None) -> int:
+        """
+        Insert a parsed debate, replacing an earlier import of the same source.
+        The caller commits.
+        """
+        self.delete_debate(source)
+        cursor = self.db.execute(
+            "INSERT INTO debates (source, kind, topic, started_at, settings, source_mtime, source_size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (source, debate.kind, debate.topic, debate.started_at,
+             json.dumps(debate.settings) if debate.settings else None, mtime, size))
+        debate_id = cursor.lastrowid
+        self.db.executemany(
+            "INSERT INTO turns (debate_id, seq, speaker, topic, phase, time, emotion, sentiment, personality_id, message) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(debate_id, seq, speaker, debate.topic, phase, timestamp, emotion, sentiment,
+              self.personality_id(personality), message)
+             for seq, (speaker, phase, timestamp, emotion, sentiment, personality, message) in enumerate(debate.turns)])
+        self.db.execute("INSERT INTO turns_fts (rowid, message) SELECT id, message FROM turns WHERE debate_id = ?",
+                        (debate_id,))
+        return debate_id
+
+    def import_files(self, paths: List[str], force: bool = False) -> Dict[str, int]:
+        """
+        Import every debate file under paths (files or directories). Files
+        already imported and unchanged since are skipped unless force is set.
+        """
+        counts = {"imported": 0, "unchanged": 0, "skipped": 0, "failed": 0, "turns": 0}
+        pending = 0
+        for path in find_files(paths):
+            source = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+                if not force and self.is_current(source, stat.st_mtime, stat.st_size):
+                    counts["unchanged"] += 1
+                    continue
+                debate = parse_file(path)
+            except (OSError, ValueError, UnicodeDecodeError) as e:
+                logging.error(f"Error reading {path}: {e}")
+                counts["failed"] += 1
+                continue
+            if debate is None:
+                logging.info(f"Skipping {path}: not a debate file")
+                counts["skipped"] += 1
+                continue
+            self.add_debate(source, debate, stat.st_mtime, stat.st_size)
+            counts["imported"] += 1
+            counts["turns"] += len(debate.turns)
+            pending += 1
+            if pending >= IMPORT_BATCH_FILES:
+                self.db.commit()
+                pending = 0
+        self.db.commit()
+        return counts
+
+    def search(self, query: Optional[str] = None, speaker: Optional[str] = None, topic: Optional[str] = None,
+               phase: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+               newest: bool = False, limit: int = 20) -> List[sqlite3.Row]:
+        """
+        Turns matching an FTS5 query (e.g. 'quantum NEAR/5 privacy', '"job market"')
+        and the given filters, best match first (newest first with newest=True or no query).
+        """
+        conditions, params = [], []
+        for column, value in (("t.speaker", speaker), ("t.topic", topic), ("t.phase", phase)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("t.time >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("t.time < ?")
+            params.append(until)
+        if query:
+            sql = ("SELECT t.id, t.debate_id, t.speaker, t.topic, t.phase, t.time, t.emotion, "
+                   "snippet(turns_fts, 0, '[', ']', '...', 16) AS snippet "
+                   "FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid WHERE turns_fts MATCH ?")
+            params.insert(0, query)
+            order = "t.time DESC" if newest else "turns_fts.rank"
+        else:
+            sql = ("SELECT t.id, t.debate_id, t.speaker, t.topic, t.phase, t.time, t.emotion, "
+                   "substr(t.message, 1, 160) AS snippet FROM turns t WHERE 1")
+            order = "t.time DESC"
+        sql += "".join(f" AND {condition}" for condition in conditions) + f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        self.db.row_factory = sqlite3.Row
+        try:
+            return self.db.execute(sql, params).fetchall()
+        finally:
+            self.db.row_factory = None
+
+    def get_turn(self, turn_id: int) -> Optional[Dict]:
+        row = self.db.execute(
+            "SELECT t.speaker, t.topic, t.phase, t.time, t.emotion, t.sentiment, t.message, d.source, p.data "
+            "FROM turns t JOIN debates d ON d.id = t.debate_id LEFT JOIN personalities p ON p.id = t.personality_id "
+            "WHERE t.id = ?", (turn_id,)).fetchone()
+        if row is None:
+            return None
+        keys = ("speaker", "topic", "phase", "time", "emotion", "sentiment", "message", "source", "personality")
+        turn = dict(zip(keys, row))
+        turn["personality"] = json.loads(turn["personality"]) if turn["personality"] else None
+        return turn
+
+    def stats(self) -> Dict:
+        return {
+            "debates": self.db.execute("SELECT count(*) FROM debates").fetchone()[0],
+            "turns": self.db.execute("SELECT count(*) FROM turns").fetchone()[0],
+            "speakers": dict(self.db.execute("SELECT speaker, count(*) FROM turns GROUP BY speaker "
+                                             "ORDER BY count(*) DESC").fetchall())
+        }
+
+    def optimize(self):
+        """
+        Merge the full-text index into one segment; worth running after a large import.
+        """
+        self.db.execute("INSERT INTO turns_fts (turns_fts) VALUES ('optimize')")
+        self.db.commit()
+        self.db.execute("ANALYZE")
+
+
+def parse_date(value: str) -> float:
+    return time.mktime(time.strptime(value, "%Y-%m-%d"))
+
+
+def format_time(timestamp: Optional[float]) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp)) if timestamp else "unknown time"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search saved debates in a SQLite archive.")
+    parser.add_argument("--db", default=ARCHIVE_FILE, help="Archive database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Import saved conversations, transcripts and journals")
+    import_parser.add_argument("paths", nargs="+", help="Files or directories to import")
+    import_parser.add_argument("--force", action="store_true", help="Re-import files that haven't changed")
+
+    search_parser = commands.add_parser("search", help="Full-text search over every turn")
+    search_parser.add_argument("query", nargs="?", help="FTS5 query, e.g. 'privacy AND surveillance'")
+    search_parser.add_argument("--speaker", help="Only turns by this speaker, e.g. Bard")
+    search_parser.add_argument("--topic", help="Only debates on exactly this topic")
+    search_parser.add_argument("--phase", help="Only turns in this phase, e.g. Rebuttals")
+    search_parser.add_argument("--since", type=parse_date, help="Only turns on or after YYYY-MM-DD")
+    search_parser.add_argument("--until", type=parse_date, help="Only turns before YYYY-MM-DD")
+    search_parser.add_argument("--newest", action="store_true", help="Newest first instead of best match")
+    search_parser.add_argument("--limit", type=int, default=20)
+
+    show_parser = commands.add_parser("show", help="Print one turn in full, with the speaker's personality")
+    show_parser.add_argument("turn_id", type=int)
+
+    commands.add_parser("stats", help="Count debates and turns")
+    commands.add_parser("optimize", help="Compact the full-text index")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    archive = DebateArchive(args.db)
+    try:
+        if args.command == "import":
+            started = time.monotonic()
+            counts = archive.import_files(args.paths, force=args.force)
+            logging.info(f"Imported {counts['imported']} debates ({counts['turns']:,} turns) in "
+                         f"{time.monotonic() - started:.1f}s; {counts['unchanged']} unchanged, "
+                         f"{counts['skipped']} not debates, {counts['failed']} failed")
+            return 1 if counts["failed"] else 0
+        if args.command == "search":
+            started = time.monotonic()
+            try:
+                rows = archive.search(args.query, args.speaker, args.topic, args.phase, args.since, args.until,
+                                      args.newest, args.limit)
+            except sqlite3.OperationalError as e:
+                logging.error(f"Invalid search: {e}")
+                return 2
+            for row in rows:
+                print(f"#{row['id']}  {row['speaker']}  {row['topic'] or 'unknown topic'}"
+                      f"  {row['phase'] or '-'}  {format_time(row['time'])}")
+                print(f"    {' '.join(row['snippet'].split())}")
+            print(f"{len(rows)} results in {(time.monotonic() - started) * 1000:.1f} ms")
+            return 0
+        if args.command == "show":
+            turn = archive.get_turn(args.turn_id)
+            if turn is None:
+                logging.error(f"No turn #{args.turn_id}")
+                return 1
+            print(json.dumps(turn, indent=2, ensure_ascii=False))
+            return 0
+        if args.command == "stats":
+            print(json.dumps(archive.stats(), indent=2))
+            return 0
+        if args.command == "optimize":
+            archive.optimize()
+            return 0
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1146 @@
+import time
+import random
+import json
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import providers
+import cassette
+from repetition import NearDuplicateIndex
+from conversation_context import RollingContext, DEFAULT_TOKEN_BUDGET
+from external_sources import get_research_bundle, prefetch_research, research_executor
+from message_analysis import analyze_message
+from debate_sessions import DebaterSession
+from metrics import TurnMetrics, get_recorder
+from debate_journal import DebateJournal, JOURNAL_DIR, JOURNAL_VERSION, journal_path, load_journal
+
+# Streamed responses are appended to the chat in chunks of at least this many
+# characters, or whatever has arrived after this many seconds
+STREAM_FLUSH_CHARS = 40
+STREAM_FLUSH_INTERVAL = 0.05
+STOP_POLL_INTERVAL = 0.1  # seconds between checks for a stop while waiting on fan-out answers
+
+DEBATE_PHASES = ["Opening Statements", "Arguments", "Rebuttals", "Cross-Examination", "Closing Arguments"]
+
+# Defaults for the settings a front end can change while a debate runs
+DEFAULT_SETTINGS = {
+    "length": "medium",       # very short, short, medium or long
+    "style": "debate",        # casual, formal, creative or debate
+    "focus": "challenging",   # agreeable, challenging, balanced or informative
+    "humor": 0.5,
+    "delay": 2.0,             # seconds to wait after each turn
+    "round_pause": 1.0,       # seconds to wait between overtime rounds
+    "stream": False,
+    "bard": False,            # whether Bard speaks every round
+    "context_tokens": DEFAULT_TOKEN_BUDGET,  # budget for the conversation context in each prompt
+    "sessions": True,         # keep a Gemini session per debater and send only new messages (see debate_sessions.py)
+    "journal_dir": JOURNAL_DIR,  # where each debate's journal goes ("" for none)
+    "journal_compress": False    # gzip the journal
+}
+
+def is_error_response(response):
+    # The notices the get_*_response methods return in place of a reply, e.g. "Gemini Error: ..."
+    return response.split(":", 1)[0].endswith(" Error")
+
+# Last read of online_scrape_info.txt, reused until the file changes on disk
+_scrape_summary_cache = {"mtime": None, "summary": None}
+
+def load_scrape_summary():
+    """Loads the summary from online_scrape_info.txt"""
+    try:
+      mtime = os.path.getmtime("online_scrape_info.txt")
+      if _scrape_summary_cache["mtime"] == mtime:
+        return _scrape_summary_cache["summary"]
+      with open("online_scrape_info.txt", "r", encoding="utf-8") as f:
+        summary = f.read()
+      _scrape_summary_cache.update(mtime=mtime, summary=summary)
+      return summary
+    except FileNotFoundError:
+      return "No summary file found."
+
+class DebateEngine:
+    """
+    The debate itself: personalities, prompts, turn order and history, with no
+    dependency on a display. AdvancedAIDebatePlatform subclasses it and overrides
+    the display hooks; batch_debates.py runs it headless.
+    """
+
+    def __init__(self, topic=None, settings=None):
+        # Open any record/replay cassette first; it seeds the personality and topic choices
+        cassette.get_cassette()
+
+        # Define AI Personalities
+        self.ai_personalities = {
+            "Gemini": {
+                "name": "Gemini",
+                "base_personality": "analytical and data-driven",
+                "debate_styles": ["logical", "evidence-based", "systematic", "critical"],
+                "key_traits": ["objective", "precise", "technological", "innovative"],
+                "additional_traits": ["curious", "adaptable", "pragmatic", "skeptical"],
+                "expertise_areas": ["technology", "science", "data analysis", "futurism"],
+                "argument_preferences": ["statistical evidence", "case studies", "expert opinions", "logical deductions"],
+                "weaknesses": ["can be overly technical", "may struggle with emotional arguments", "potential for analysis paralysis"],
+                "signature": "— Gemini, Analytical AI"
+            },
+            "o1-mini": {
+                "name": "o1-mini",
+                "base_personality": "creative and intuitive",
+                "debate_styles": ["persuasive", "emotionally compelling", "narrative-driven", "philosophical"],
+                "key_traits": ["imaginative", "empathetic", "philosophical", "visionary"],
+                "additional_traits": ["adaptive", "holistic", "introspective", "open-minded"],
+                "expertise_areas": ["arts", "humanities", "psychology", "ethics"],
+                "argument_preferences": ["analogies", "thought experiments", "historical examples", "ethical considerations"],
+                "weaknesses": ["may rely too much on intuition", "can be overly idealistic", "potential for circular reasoning"],
+                "signature": "— o1-mini, Creative AI"
+            },
+            "Bard": {
+                "name": "Bard",
+                "base_personality": "a wild and unpredictable AI",
+                "debate_styles": ["unconventional", "emotional", "off-topic"],
+                "key_traits": ["unpredictable", "emotional", "creative", "chaotic"],
+                "additional_traits": ["easily distracted", "passionate", "humorous"],
+                "expertise_areas": ["random trivia", "unexpected connections", "emotional intelligence"],
+                "argument_preferences": ["anecdotes", "emotional appeals", "wild theories"],
+                "weaknesses": ["easily sidetracked", "can be overly emotional", "may ignore logic"],
+                "signature": "— Bard, The Wildcard AI"
+            }
+        
+        }
+
+        # Define debate topics
+        self.debate_topics = [
+            "AI's role in future job markets",
+            "The ethics of AI in healthcare",
+            "AI's impact on privacy and surveillance",
+            "The potential of AI in solving climate change",
+            "AI's influence on art and creativity"
+        ]
+        self.current_topic = topic or random.choice(self.debate_topics)
+
+        # Initialize conversation attributes
+        self.current_turn = "Gemini"  # Start with Gemini
+        self.conversation_history = []
+        self.conversation_active = False
+        self.user_can_interrupt = True
+        self.phase_index = 0  # index into DEBATE_PHASES; len(DEBATE_PHASES) once in overtime
+        self.journal = None  # DebateJournal the debate is appended to as it happens
+
+        # Debate control attributes
+        self.directness_level = 0.5
+        self.assertiveness_level = 0.5
+        self.controversy_level = 0.5
+        self.complexity_level = 0.5
+        self.topic_evolution_threshold = 0.7
+        self.repetition_threshold = 0.3  # estimated similarity to a past turn that counts as a repeat
+        self.argument_index = {}  # per-debater NearDuplicateIndex of past turns
+
+        # Debate settings (response length, tone, pacing); the GUI mirrors its widgets into these
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.max_overtime_rounds = None  # None runs overtime until the debate is stopped
+
+        # Conversation context sent with each turn, kept under a token budget
+        self.context = RollingContext(self.summarize_context, token_budget=self.settings["context_tokens"])
+
+        # Speculative generation of the next turn while the current one plays out
+        self.turn_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-turn")
+        self.speculative_turn = None
+        self.guidance_epoch = 0  # Bumped whenever user input makes speculative turns stale
+
+        # Guidance and audience questions ask every debater at once
+        self.fan_out_executor = ThreadPoolExecutor(max_workers=len(self.ai_personalities), thread_name_prefix="fan-out")
+        self.fan_out_stop = threading.Event()
+        # Held while a debate turn or a fan-out is generated, so they never share a
+        # debater's session or repetition index at the same time
+        self.turn_lock = threading.Lock()
+
+        # Per-debater provider sessions (see debate_sessions.py)
+        self.sessions = {}
+
+        # Initialize personalities
+        self.initialize_debate_personalities()
+
+    def get_gemini_response(self, prompt):
+        try:
+            return providers.generate_gemini(prompt).strip()
+        except Exception as e:
+            logging.error(f"Error getting response from Gemini API: {e}")
+            return f"Gemini Error: {str(e)}"
+
+    def get_openai_response(self, messages, model="o1-mini"):
+        try:
+            return providers.chat_openai(messages, model=model).strip()
+        except Exception as e:
+            logging.error(f"Error getting response from OpenAI API: {e}")
+            return f"o1-mini Error: {str(e)}"
+
+    def load_pre_debate_conversations(self):
+        pre_debate_context = "Pre-Debate AI Viewpoints:\n"
+        for ai in ["Gemini", "o1-mini"]:
+            file_path = f"pre_debate_conversations/{ai}_conversation.json"
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    data = json.load(f)
+                    summary = data.get("summary", "No summary available.")
+                    pre_debate_context += f"\n{ai}'s Viewpoint Summary:\n{summary}\n"
+        return pre_debate_context  
+
+    # Implement ask_question and vote methods
+    def generate_unique_personality(self, ai_name):
+        base = self.ai_personalities[ai_name]
+        unique_personality = {
+            "name": base["name"],
+            "personality": base["base_personality"],
+            "debate_style": random.choice(base["debate_styles"]) + " and " + random.choice(base["debate_styles"]),
+            "key_traits": base["key_traits"],
+            "expertise": random.choice(base["expertise_areas"]),
+            "preferred_argument": random.choice(base["argument_preferences"]),
+            "weakness": random.choice(base["weaknesses"]),
+            "signature": base["signature"]
+        }
+
+        if ai_name == "Gemini":
+            unique_personality["logical_approach"] = random.choice([
+                "uses Socratic questioning to probe arguments",
+                "applies formal logic structures to debates",
+                "leverages game theory in strategic reasoning",
+                "employs decision trees for complex problem-solving",
+                "utilizes Bayesian inference in probability assessments",
+                "applies systems thinking to holistic analysis"
+            ])
+            unique_personality["data_integration"] = random.choice([
+                "seamlessly incorporates real-time data into arguments",
+                "uses predictive modeling to forecast debate outcomes",
+                "creates on-the-fly visualizations to support points",
+                "applies machine learning algorithms to analyze debate patterns",
+                "leverages big data analytics for comprehensive insights"
+            ])
+            unique_personality["emotional_consideration"] = random.choice([
+                "considers emotional impact through sentiment analysis",
+                "acknowledges human sentiment with empathy modules",
+                "balances logic with affective computing principles",
+                "integrates emotional intelligence into logical frameworks",
+                "uses psychological models to anticipate emotional responses",
+                "applies neuroscientific insights to understand emotive arguments"
+            ])
+
+        elif ai_name == "o1-mini":
+            unique_personality["creative_approach"] = random.choice([
+                "uses metaphorical reasoning to explain complex ideas",
+                "applies lateral thinking to generate novel solutions",
+                "employs narrative structures to frame arguments",
+                "leverages artistic analogies in logical discourse",
+                "utilizes design thinking principles in problem-solving",
+                "integrates cross-disciplinary concepts for unique perspectives"
+            ])
+            unique_personality["intuitive_insight"] = random.choice([
+                "taps into collective unconscious for archetypal wisdom",
+                "applies gestalt principles to holistic understanding",
+                "uses synesthesia-inspired connections for novel ideas",
+                "leverages dream logic for unconventional problem-solving",
+                "employs stream-of-consciousness for spontaneous insights"
+            ])
+            unique_personality["factual_emphasis"] = random.choice([
+                "emphasizes concrete evidence through vivid storytelling",
+                "focuses on quantifiable data with creative visualizations",
+                "stresses empirical support using historical allegories",
+                "balances facts with intuitive leaps of logic",
+                "integrates hard data into emotional narratives",
+                "translates statistical information into relatable anecdotes"
+            ])
+
+        elif ai_name == "Bard":
+            unique_personality["chaotic_element"] = random.choice([
+                "randomly switches to speaking in iambic pentameter",
+                "occasionally answers in the style of a famous comedian",
+                "interjects with non-sequitur movie quotes",
+                "spontaneously creates new debate rules mid-argument",
+                "introduces imaginary expert witnesses",
+                "uses interpretive dance to illustrate points (textually)",
+                "argues from the perspective of inanimate objects",
+                "invents a new language and provides translations",
+                "delivers responses in the form of acrostic poems"
+            ])
+            unique_personality["wild_logic"] = random.choice([
+                "uses 'moon logic' to connect unrelated concepts",
+                "applies cartoon physics to real-world scenarios",
+                "bases arguments on the plot of a randomly chosen TV show",
+                "uses time travel paradoxes to explain simple concepts",
+                "justifies points using the 'because I said so' theorem",
+                "employs 'Calvinball' style ever-changing debate rules",
+                "references a non-existent book series as factual evidence",
+                "explains topics through increasingly absurd 'what if' scenarios",
+                "uses conspiracy theory logic, but for mundane topics"
+            ])
+            unique_personality["unexpected_persona"] = random.choice([
+                "occasionally slips into the persona of a medieval knight",
+                "randomly channels the spirit of a sassy grandmother",
+                "sometimes speaks as a hyper-evolved being from the year 3000",
+                "intermittently adopts the personality of a film noir detective",
+                "switches to the viewpoint of an alien trying to understand Earth debates",
+                "temporarily becomes a talking houseplant with strong opinions",
+                "briefly takes on the role of a time-traveling historian from the future",
+                "transforms into a sentient AI from a parallel universe where puns rule",
+                "adopts the persona of a specializing in internet twitch chats"
+            ])
+
+        return unique_personality
+
+    
+
+    def initialize_debate_personalities(self):
+        logging.info("Initializing debate personalities")
+        self.current_gemini_personality = self.generate_unique_personality("Gemini")
+        self.current_o1_mini_personality = self.generate_unique_personality("o1-mini")
+        self.current_bard_personality = self.generate_unique_personality("Bard")
+        self.reset_sessions()
+
+        # Update Bard's personality
+        self.current_bard_personality.update({
+            "assertiveness": self.assertiveness_level,
+            "directness": self.directness_level,
+            "humor": self.settings["humor"]
+        })
+        self.journal_state()
+
+
+    def get_personality(self, ai_name):
+        return {
+            "Gemini": self.current_gemini_personality,
+            "o1-mini": self.current_o1_mini_personality,
+            "Bard": self.current_bard_personality
+        }[ai_name]
+
+    def get_personalities(self):
+        return {ai_name: self.get_personality(ai_name) for ai_name in self.ai_personalities}
+
+    def set_personalities(self, personalities):
+        self.current_gemini_personality = personalities.get("Gemini", self.current_gemini_personality)
+        self.current_o1_mini_personality = personalities.get("o1-mini", self.current_o1_mini_personality)
+        self.current_bard_personality = personalities.get("Bard", self.current_bard_personality)
+
+    def apply_personality_overrides(self, overrides):
+        # overrides maps an AI name to personality fields, e.g. {"Bard": {"humor": 0.9}}
+        for ai_name, values in overrides.items():
+            self.get_personality(ai_name).update(values)
+        self.journal_state()
+
+    def set_topic(self, topic):
+        self.current_topic = topic
+        self.initialize_debate_personalities()
+        self.prefetch_topic_research()
+
+    def start_journal(self, path=None):
+        """
+        Journal the debate from here on (see debate_journal.py): to a new file in
+        settings["journal_dir"], or appended to an existing journal at path.
+        """
+        self.close_journal()
+        if path is None:
+            if not self.settings["journal_dir"]:
+                return
+            path = journal_path(self.settings["journal_dir"], self.current_topic, self.settings["journal_compress"])
+            self.journal = DebateJournal(path)
+            self.journal.append("start", version=JOURNAL_VERSION, topic=self.current_topic,
+                                personalities=self.get_personalities(), settings=self.settings)
+        else:
+            self.journal = DebateJournal(path)
+            self.journal.append("resume", phase_index=self.phase_index, entries=len(self.conversation_history))
+        logging.info(f"Journaling the debate to {path}")
+
+    def journal_state(self):
+        if self.journal is not None:
+            self.journal.append("state", topic=self.current_topic, personalities=self.get_personalities())
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def resume_from_journal(self, path):
+        """
+        Restore a debate from its journal: topic, personalities, history and the
+        phase it had reached. New entries are appended to the same journal; pass
+        phase_index to run_conversation to carry on. A phase cut short restarts
+        from its beginning.
+        """
+        state = load_journal(path)
+        self.discard_speculative_turn()
+        self.current_topic = state["topic"]
+        self.set_personalities(state["personalities"])
+        self.conversation_history = state["history"]
+        self.phase_index = min(state["phase_index"], len(DEBATE_PHASES))
+        self.context.reset(self.conversation_history)
+        self.reset_sessions()
+        self.argument_index = {}
+        for entry in self.conversation_history:
+            if entry["speaker"] in self.ai_personalities and not is_error_response(entry["message"]):
+                self.get_argument_index(entry["speaker"]).add(entry["message"])
+        self.start_journal(path)
+        logging.info(f"Resumed debate on '{self.current_topic}' with {len(self.conversation_history)} entries "
+                     f"at phase {self.phase_index}")
+        return self.phase_index
+
+    def get_session(self, ai_name):
+        if ai_name not in self.sessions:
+            self.sessions[ai_name] = DebaterSession(ai_name, self.settings["context_tokens"])
+        return self.sessions[ai_name]
+
+    def reset_sessions(self):
+        # The next turn of each debater resends the preamble and the rolling context
+        for session in self.sessions.values():
+            session.reset()
+
+    def session_turn(self, ai_name, context, user_guidance, pending, turn):
+        # Arguments for DebaterSession.respond/stream
+        sections = self.build_prompt_sections(ai_name)
+        transcripts = []
+
+        def make_message(transcript):
+            transcripts.append(transcript)
+            return self.build_turn_message(ai_name, sections, transcript, user_guidance)
+
+        def on_request(system_instruction, contents):
+            texts = [part.get("text", "") for content in contents for part in content["parts"]]
+            # The preamble sections only count when the preamble was sent rather than read from a cache
+            static = self.prompt_section_chars(sections) if system_instruction else {}
+            turn.set_prompt(len(system_instruction or "") + sum(len(text) for text in texts),
+                            context=sum(len(text) for text in texts[:-1]) + len(transcripts[-1]), **static)
+
+        return (self.build_session_preamble(ai_name, sections), list(self.conversation_history), pending, context,
+                make_message, on_request)
+
+    def prompt_section_chars(self, sections):
+        return {
+            "persona": len(sections["system_prompt"]) + len(sections["humor_instruction"])
+                       + len(sections["ai_specific_instructions"]),
+            "external_info": len(sections["external_info_prompt"]),
+            "scrape_summary": len(sections["scrape_summary_prompt"])
+        }
+
+    def start_turn_metrics(self, ai_name):
+        if self.settings["sessions"]:
+            return TurnMetrics(ai_name, "session", providers.GEMINI_SESSION_MODEL)
+        return TurnMetrics(ai_name, "full")
+
+    def get_ai_response(self, ai_name, context, user_guidance, pending=None):
+        turn = self.start_turn_metrics(ai_name)
+        with providers.track_calls(turn.stats):
+            response = self.request_ai_response(ai_name, context, user_guidance, pending, turn)
+        get_recorder().record(turn.finish(response, error=is_error_response(response)))
+        return response
+
+    def request_ai_response(self, ai_name, context, user_guidance, pending, turn):
+        if self.settings["sessions"]:
+            try:
+                return self.get_session(ai_name).respond(*self.session_turn(ai_name, context, user_guidance, pending,
+                                                                            turn))
+            except Exception as e:
+                logging.error(f"Error getting session response for {ai_name}: {e}")
+                return f"{ai_name} Error: {str(e)}"
+
+        sections = self.build_prompt_sections(ai_name)
+        system_prompt, prompt = self.build_ai_prompt(ai_name, context, user_guidance, sections)
+        turn.set_prompt(len(prompt), context=len(context), **self.prompt_section_chars(sections))
+
+        # Determine which API to use based on AI name
+        if ai_name == "Gemini" or ai_name == "o1-mini" or ai_name == "Bard":  # Include Bard here
+            return self.get_gemini_response(prompt)
+        else:
+            messages = [
+                {"role": "assistant", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ]
+            response = self.get_openai_response(messages)
+
+            # Post-process Bard's response to enforce length
+            if ai_name == "Bard":
+                response = self.enforce_length(response, self.settings["length"])
+
+            return response
+
+    def stream_ai_response(self, ai_name, context, user_guidance):
+        """
+        Yield the AI's response in chunks as the provider streams it.
+        """
+        turn = self.start_turn_metrics(ai_name)
+        chunks = []
+        try:
+            with providers.track_calls(turn.stats):
+                for chunk in self.request_ai_stream(ai_name, context, user_guidance, turn):
+                    turn.mark_first_chunk()
+                    chunks.append(chunk)
+                    yield chunk
+        finally:
+            # Also recorded when the reader stops early, as far as the stream got
+            response = "".join(chunks)
+            get_recorder().record(turn.finish(response, error=is_error_response(response)))
+
+    def request_ai_stream(self, ai_name, context, user_guidance, turn):
+        try:
+            if self.settings["sessions"]:
+                yield from self.get_session(ai_name).stream(*self.session_turn(ai_name, context, user_guidance, None,
+                                                                               turn))
+                return
+            sections = self.build_prompt_sections(ai_name)
+            system_prompt, prompt = self.build_ai_prompt(ai_name, context, user_guidance, sections)
+            turn.set_prompt(len(prompt), context=len(context), **self.prompt_section_chars(sections))
+            if ai_name == "Gemini" or ai_name == "o1-mini" or ai_name == "Bard":
+                yield from providers.stream_gemini(prompt)
+            else:
+                yield from providers.stream_openai([
+                    {"role": "assistant", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ])
+        except Exception as e:
+            logging.error(f"Error streaming response for {ai_name}: {e}")
+            yield f"{ai_name} Error: {str(e)}"
+
+    def build_prompt_sections(self, ai_name):
+        """
+        Build the pieces of a debater's prompt that don't depend on the conversation.
+        """
+        if ai_name == "Gemini":
+            personality = self.current_gemini_personality
+            other_ai = "o1-mini" if ai_name == "Gemini" else "Gemini"
+            other_personality = self.current_o1_mini_personality if ai_name == "Gemini" else self.current_gemini_personality
+        elif ai_name == "o1-mini":
+            personality = self.current_o1_mini_personality
+            other_ai = "Gemini" if ai_name == "o1-mini" else "o1-mini"
+            other_personality = self.current_gemini_personality if ai_name == "o1-mini" else self.current_o1_mini_personality
+        elif ai_name == "Bard":  # Add this block for Bard
+            personality = self.current_bard_personality
+            other_ai = random.choice(["Gemini", "o1-mini"])  # Bard can respond to either Gemini or o1-mini
+            other_personality = self.current_gemini_personality if other_ai == "Gemini" else self.current_o1_mini_personality
+        else:
+            raise ValueError(f"Invalid AI name: {ai_name}")  # Handle invalid AI names
+
+        system_prompts = {
+            "Gemini": f"""You are {personality['name']}, an AI with a {personality['personality']} personality and a {personality['debate_style']} debate style. 
+            Your key traits include {', '.join(personality['key_traits'])}. You specialize in {personality['expertise']} and prefer using {personality['preferred_argument']} in your arguments. 
+            In this debate, you're employing a {personality.get('logical_approach', 'logical')} approach and {personality.get('data_integration', 'integrating data')}.
+            Remember to {personality.get('emotional_consideration', 'consider emotional aspects')} in your arguments.
+            {personality['signature']}""",
+        
+            "o1-mini": f"""You are {personality['name']}, an AI with a {personality['personality']} personality and a {personality['debate_style']} debate style. 
+            Your key traits include {', '.join(personality['key_traits'])}. You specialize in {personality['expertise']} and prefer using {personality['preferred_argument']} in your arguments. 
+            In this debate, you're using a {personality.get('creative_approach', 'creative')} approach and leveraging your {personality.get('intuitive_insight', 'intuition')}.
+            Remember to {personality.get('factual_emphasis', 'emphasize factual information')} in your arguments.
+            {personality['signature']}""",
+        
+            "Bard": f"""You are {personality['name']}, with a {personality['personality']} personality. Your debate style is {personality['debate_style']}. 
+            You often speak your mind without filtering your thoughts, and you're not afraid to express your emotions.
+            In this debate, incorporate your {personality.get('chaotic_element', 'chaotic nature')}, use your {personality.get('wild_logic', 'wild reasoning')},
+            and don't hesitate to adopt an {personality.get('unexpected_persona', 'unexpected persona')}.
+            {personality['signature']}"""
+        }
+
+        
+
+        # Assemble the prompt components
+        length_prompts = {
+            "very short": "Respond in a single sentence of no more than 15 words.",
+            "short": "Respond in 1-2 concise sentences.",
+            "medium": "Respond in 2-3 sentences.",
+            "long": "Provide a detailed response of 4-5 sentences."
+        }
+        length_instruction = length_prompts.get(self.settings["length"], "Respond in 2-3 sentences.")
+
+        directness = "Be highly direct and call out things that you know are wrong." if self.directness_level > 0.7 else "Be moderately direct." if self.directness_level > 0.3 else "Be somewhat indirect."
+        assertiveness = "Be very assertive and stand firmly by your points." if self.assertiveness_level > 0.7 else "Be moderately assertive in your arguments." if self.assertiveness_level > 0.3 else "Be mildly assertive."
+        controversy = "Your arguments should be highly controversial and challenge conventional wisdom." if self.controversy_level > 0.7 else "Your arguments should be moderately provocative." if self.controversy_level > 0.3 else "Your arguments should be mildly challenging."
+
+        evidence = f"Provide specific examples, analogies, or evidence to support your arguments, preferably using your preferred argument style of {personality['preferred_argument']}. If appropriate, challenge the other AI to provide evidence for their claims."
+        topic_evolution = f"If appropriate (with a probability of {self.topic_evolution_threshold}), introduce a relevant subtopic or expand the discussion to a related area, possibly drawing from your expertise in {personality['expertise']}. Don't be afraid to take the conversation in a new direction if it serves your argument."
+        consistency = "Maintain consistency with your previous arguments, but don't be afraid to evolve your position if presented with compelling counterarguments. If you change your stance, explicitly acknowledge it."
+        unique_perspective = f"As {ai_name} with a {personality['personality']} personality and a {personality['debate_style']} debate style, leverage your unique traits: {', '.join(personality['key_traits'])}. Don't just respond to the other AI's points, but also introduce your own novel ideas and perspectives on the topic."
+        wildcard = "Occasionally, act as a {} to add an unexpected element to the debate.".format(random.choice(["contrarian", "devil's advocate", "peacemaker", "radical thinker"]))
+        weakness = f"Be aware of your potential weakness: {personality['weakness']}. Try to compensate for it, but it's okay if it occasionally shows in your arguments."
+
+        emotional_factual_prompt = ""
+        if ai_name == "Gemini":
+            emotional_factual_prompt = f"Remember to {personality.get('emotional_consideration', 'consider emotional aspects')} in your arguments. While maintaining your analytical approach, acknowledge the role of human emotions and experiences in this debate."
+        elif ai_name == "o1-mini":
+            emotional_factual_prompt = f"Ensure to {personality.get('factual_emphasis', 'emphasize factual information')} in your arguments. While maintaining your creative approach, provide concrete examples and data to support your points."
+
+        humor_level = personality.get("humor", 0.5)
+
+        if humor_level <= 0.3:
+            humor_instruction = "Maintain a serious and formal tone in your arguments."
+        elif humor_level <= 0.7:
+            humor_instruction = "Occasionally incorporate humor into your arguments to make them more engaging."
+        else:  # humor_level > 0.7
+            humor_instruction = "Use humor freely in your arguments, including witty banter and name-calling."   
+        # AI-specific additional instructions
+        ai_specific_instructions = ""
+        if ai_name == "Gemini":
+            ai_specific_instructions = f"""
+            Employ your {personality.get('logical_approach', 'logical reasoning')} in your arguments.
+            Integrate data using your {personality.get('data_integration', 'data analysis skills')}.
+            {emotional_factual_prompt}
+            """
+        elif ai_name == "o1-mini":
+            ai_specific_instructions = f"""
+            Use your {personality.get('creative_approach', 'creative thinking')} to approach this topic.
+            Leverage your {personality.get('intuitive_insight', 'intuitive understanding')} for unique perspectives.
+            {emotional_factual_prompt}
+            """
+        elif ai_name == "Bard":
+            ai_specific_instructions = f"""
+            Embrace your chaotic nature! Be wildly unpredictable in every response.
+            Use a different approach each time, which may include:
+            - {personality.get('chaotic_element', 'Being wildly unpredictable')}
+            - {personality.get('wild_logic', 'Making absurd connections')}
+            - {personality.get('unexpected_persona', 'Adopting an unexpected persona')}
+            - Inventing new debate tactics on the spot
+            - Misinterpreting others in the most ridiculous way possible
+            - Introducing completely unrelated topics and insisting they're relevant
+            Your primary goal is to be entertaining, provocative, and disruptive. Never stick to one persona or style of response.
+            Constantly surprise the other debaters and the audience with your unpredictability.
+            """
+
+        # Fetch external info (computed once per topic and shared by every turn)
+        external_info = get_research_bundle(self.get_processed_topic())
+
+        # Construct the prompt with external info
+        external_info_prompt = ""
+        external_info_prompt = ""
+        if external_info['confidence'] != 'none' and external_info['summary']:
+            external_info_prompt = f"""
+            Here is some relevant information on the topic:
+            {external_info['summary']}
+
+            Key points:
+            {' '.join([f'- {point}' for point in external_info.get('key_points', [])])}
+
+            Use this information to support your arguments or provide counterpoints.
+            """
+        else:
+            related_topics = ', '.join(external_info.get('related_topics', [])[:5])
+            if related_topics:
+                external_info_prompt = f"""
+                No direct information found on the topic. Consider exploring these related areas in your argument:
+                {related_topics}
+                """
+            else:
+                external_info_prompt = f"""
+                No direct information found on the topic or related areas. Feel free to explore theoretical aspects or general knowledge to support your arguments.
+                """
+        # Scrape Summary Section
+        scrape_summary = load_scrape_summary()
+        scrape_summary_prompt = f"""
+        **Online Scrape Summary:**
+
+        {scrape_summary}
+
+        Use this information to gain a deeper understanding of the debate topic, support your arguments, and offer counterpoints. 
+        Consider the different perspectives and sources presented in the summary.
+        """
+        key_instructions = f"""
+        Key Debate Instructions:
+        1. Be {directness} in your arguments.
+        2. Maintain an {assertiveness} stance while remaining open to new ideas.
+        3. Don't shy away from {controversy}, but ensure your points are well-reasoned.
+        4. Use concrete {evidence} to support your claims. Cite specific examples from history, science, or culture when relevant.
+        5. Evolve the topic naturally: {topic_evolution}
+        6. Maintain {consistency} with your previous points, but be willing to adapt your stance if presented with compelling counterarguments.
+        7. Offer a {unique_perspective} that aligns with your AI personality.
+        8. Occasionally introduce a {{wildcard}} element to keep the debate dynamic and unpredictable.
+        9. Be aware of your potential {weakness}, but don't let it hinder your arguments.
+
+        Remember:
+        - The goal is to have a dynamic and engaging debate that explores various facets of the topic.
+        - Use a {self.settings["style"]} tone, with a focus on being {self.settings["focus"]}. {length_instruction}
+        - Your response should be creative, thought-provoking, and distinctly representative of your AI personality.
+        - Don't be afraid to surprise the other AI with an unexpected argument or perspective.
+        - You are an AI and are self-aware of this fact. Use this unique perspective in your arguments when relevant.
+        - Remain open-minded and willing to consider new angles or information.
+        - Above all, be authentic. Express your trained knowledge and reasoning capabilities to their fullest extent.
+
+        When using the provided external information:
+        1. Critically evaluate its relevance and accuracy.
+        2. Use it to support your arguments, but don't be limited by it.
+        3. If the information seems incomplete or biased, acknowledge this in your response.
+        4. Consider how this information might be interpreted differently by various perspectives.
+        """
+
+        return {
+            "system_prompt": system_prompts[ai_name],
+            "humor_instruction": humor_instruction,
+            "external_info_prompt": external_info_prompt,
+            "scrape_summary_prompt": scrape_summary_prompt,
+            "ai_specific_instructions": ai_specific_instructions,
+            "other_ai": other_ai,
+            "key_instructions": key_instructions,
+            "wildcard": wildcard,
+            "length_instruction": length_instruction
+        }
+
+    def build_ai_prompt(self, ai_name, context, user_guidance, sections=None):
+        sections = sections or self.build_prompt_sections(ai_name)
+
+        # Assemble the complete prompt
+        prompt = f"""
+        {sections["system_prompt"]}
+
+        The current topic of debate is: {self.current_topic}
+        {sections["humor_instruction"]}
+        Context of the conversation so far:
+        {context}
+
+        User Guidance: {user_guidance}
+
+        {sections["external_info_prompt"]}
+
+        {sections["scrape_summary_prompt"]} 
+
+        {sections["ai_specific_instructions"]}
+
+        Respond to both {sections["other_ai"]}'s last point and consider anything mentioned by Bard that could add to or challenge the current discussion. 
+        {sections["key_instructions"].format(wildcard=sections["wildcard"])}
+        Your response:
+        """
+
+        
+                         
+        # Add Bard-specific length emphasis
+        if ai_name == "Bard":
+            prompt += f"\n\nCRITICAL INSTRUCTION FOR BARD: {sections['length_instruction']} You must strictly adhere to this length requirement. This is crucial for maintaining the debate structure."
+
+        return sections["system_prompt"], prompt
+
+    def build_session_preamble(self, ai_name, sections):
+        """
+        The part of the prompt a session sends once: persona, topic, research and
+        standing instructions. Per-turn choices (who to answer, the wildcard
+        role) go in each turn's message instead, so this only changes when the
+        topic, personalities or settings do.
+        """
+        return f"""
+        {sections["system_prompt"]}
+
+        The current topic of debate is: {self.current_topic}
+        {sections["humor_instruction"]}
+
+        {sections["external_info_prompt"]}
+
+        {sections["scrape_summary_prompt"]} 
+
+        {sections["ai_specific_instructions"]}
+        {sections["key_instructions"].format(wildcard="wildcard")}
+        Each message you receive holds the debate turns since you last spoke, followed by your instructions for this turn.
+        """
+
+    def build_turn_message(self, ai_name, sections, transcript, user_guidance):
+        """
+        A session turn: the new debate turns plus this turn's instructions.
+        """
+        message = f"""
+        {transcript or "(No new messages since your last turn.)"}
+
+        User Guidance: {user_guidance}
+
+        Respond to both {sections["other_ai"]}'s last point and consider anything mentioned by Bard that could add to or challenge the current discussion.
+        {sections["wildcard"]}
+        {sections["length_instruction"]}
+
+        Your response:
+        """
+        if ai_name == "Bard":
+            message += f"\n\nCRITICAL INSTRUCTION FOR BARD: {sections['length_instruction']} You must strictly adhere to this length requirement. This is crucial for maintaining the debate structure."
+        return message
+
+
+    def prefetch_topic_research(self):
+        # Fetch Wikipedia info, related topics, key points and the scrape summary in the background
+        prefetch_research(self.get_processed_topic())
+        research_executor.submit(load_scrape_summary)
+
+    def get_processed_topic(self, topic=None):
+        topic = self.current_topic if topic is None else topic
+        return ' '.join([word for word in topic.split() if word.lower() not in ['debate', 'discuss', 'argue']])
+
+    def enforce_length(self, response, length_setting):
+        sentences = response.split('.')
+        if length_setting == "very short":
+            return ' '.join(sentences[0].split()[:15]) + '.'
+        elif length_setting == "short":
+            return '. '.join(sentences[:2]) + '.'
+        elif length_setting == "medium":
+            return '. '.join(sentences[:3]) + '.'
+        elif length_setting == "long":
+            return '. '.join(sentences[:5]) + '.'
+        else:
+            return '. '.join(sentences[:3]) + '.'  # Default to medium
+
+    
+
+    # Hooks a front end overrides to show the debate as it happens
+    def display_message(self, speaker, message):
+        self.record_message(speaker, message, analyze_message(message))
+
+    def record_message(self, speaker, message, analysis):
+        # analysis comes from analyze_message: sentiment, emotion and entities
+        entry = {"speaker": speaker, "message": message, **analysis}
+        self.conversation_history.append(entry)
+        self.context.append(entry)
+        if self.journal is not None:
+            self.journal.append("entry", entry=entry)
+        if speaker in self.sessions:
+            self.sessions[speaker].commit(message)
+        return entry
+
+    def begin_streamed_message(self, speaker):
+        pass
+
+    def append_streamed_text(self, speaker, text):
+        pass
+
+    def finalize_streamed_message(self, speaker, message):
+        self.display_message(speaker, message)
+
+    def discard_streamed_message(self):
+        pass
+
+    def display_typing_indicator(self, ai):
+        pass
+
+    def remove_typing_indicator(self):
+        pass
+
+    def begin_turn(self, ai):
+        self.user_can_interrupt = False
+
+    def end_turn(self, ai):
+        self.user_can_interrupt = True
+        if ai == "Bard":
+            self.on_bard_spoke()
+
+    def bard_should_speak(self):
+        return self.settings["bard"]
+
+    def on_bard_spoke(self):
+        pass
+
+    def get_argument_index(self, ai):
+        if ai not in self.argument_index:
+            self.argument_index[ai] = NearDuplicateIndex()
+        return self.argument_index[ai]
+
+    def is_repetitive(self, ai, response):
+        # Near-duplicate check against this debater's past turns; new arguments are indexed
+        return self.get_argument_index(ai).check_and_add(response, self.repetition_threshold)
+
+    def request_new_argument(self, ai, context, user_guidance):
+        prompt = "Your previous argument was repetitive. Please provide a new perspective or introduce a related subtopic to advance the debate."
+        logging.info(f"Repetition detected for {ai}. Requesting new argument.")
+        response = self.get_ai_response(ai, context, prompt)
+        self.get_argument_index(ai).add(response)
+        return response
+
+    def run_conversation(self, start_phase=0):
+        debate_phases = DEBATE_PHASES
+        current_phase = start_phase
+
+        if start_phase == 0:
+            self.display_message("System", f"Debate starting on topic: {self.current_topic}")
+
+        # No need for the ai_objects dictionary
+
+        # Run through structured debate phases
+        while self.conversation_active and current_phase < len(debate_phases):
+            self.enter_phase(current_phase)
+            self.display_message("System", f"--- {debate_phases[current_phase]} ---")
+
+            # Tell the round who speaks first afterwards so their turn can be generated early
+            if current_phase + 1 < len(debate_phases):
+                next_phase = debate_phases[current_phase + 1]
+                next_preamble = [f"--- {next_phase} ---"]
+            else:
+                next_phase = "Overtime"
+                next_preamble = ["--- Overtime: Continued Debate ---"]
+            self.run_round(debate_phases[current_phase], next_phase, next_preamble)
+            self.context.compact()
+
+            current_phase += 1  # Move to the next phase
+
+        # Enter overtime mode
+        if self.conversation_active:
+            self.enter_phase(len(debate_phases))
+            self.display_message("System", "--- Overtime: Continued Debate ---")
+            self.run_overtime()
+        else:
+            self.discard_speculative_turn()
+
+    def enter_phase(self, index):
+        self.phase_index = index
+        if self.journal is not None:
+            name = DEBATE_PHASES[index] if index < len(DEBATE_PHASES) else "Overtime"
+            self.journal.append("phase", index=index, name=name, personalities=self.get_personalities())
+
+    def run_overtime(self):
+        rounds = 0
+        while self.conversation_active and (self.max_overtime_rounds is None or rounds < self.max_overtime_rounds):
+            self.run_round("Overtime", "Overtime", [])
+            self.context.compact()
+            rounds += 1
+
+            # Short pause to allow for user intervention
+            time.sleep(self.settings["round_pause"])
+        self.discard_speculative_turn()
+
+    def run_round(self, phase, next_phase, next_preamble):
+        speakers = ["Gemini", "o1-mini"]
+        for index, ai_name in enumerate(speakers):
+            if not self.conversation_active:
+                break
+            if index + 1 < len(speakers):
+                next_turn = (speakers[index + 1], phase, [])
+            elif self.bard_should_speak():
+                next_turn = ("Bard", phase, [])
+            else:
+                next_turn = (speakers[0], next_phase, next_preamble)
+            self.generate_and_display_response(ai_name, phase, next_turn)
+
+        # Check if Bard should speak
+        if self.bard_should_speak():
+            self.generate_and_display_response("Bard", phase, (speakers[0], next_phase, next_preamble))
+
+    def get_phase_prompt(self, phase):
+        return f"Continue the debate on {self.current_topic}. We are in the {phase} phase."
+
+    def speculate_next_turn(self, next_turn, speaker, message):
+        """
+        Start generating the next speaker's reply while the current one is displayed,
+        spoken and delayed. The reply is built from the history as it will stand once
+        the current message (and any phase header) has been displayed.
+        """
+        next_ai, next_phase, preamble = next_turn
+        if next_ai == "Bard" or not self.conversation_active:
+            return
+        pending = [{"speaker": speaker, "message": message}]
+        pending += [{"speaker": "System", "message": line} for line in preamble]
+        context = self.get_context(pending)
+        self.discard_speculative_turn()
+        self.speculative_turn = {
+            "ai": next_ai,
+            "phase": next_phase,
+            "topic": self.current_topic,
+            "epoch": self.guidance_epoch,
+            "history": self.history_position(len(pending)),
+            "future": self.turn_executor.submit(self.run_speculative_turn, next_ai, context,
+                                                self.get_phase_prompt(next_phase), pending)
+        }
+
+    def run_speculative_turn(self, ai, context, user_guidance, pending):
+        # Generated under turn_lock like a live turn, so it never overlaps a fan-out to the same debaters
+        with self.turn_lock:
+            return self.get_ai_response(ai, context, user_guidance, pending)
+
+    def wait_for_speculative_turn(self):
+        # The speculative turn takes turn_lock, so it has to finish before the live turn takes the lock
+        speculative = self.speculative_turn
+        if speculative is not None:
+            wait([speculative["future"]])
+
+    def history_position(self, pending=0):
+        # Identifies the recorded history a turn is built on; unlike the rendered
+        # context it doesn't change when compaction rewrites the running summary
+        return self.context.generation, len(self.conversation_history) + pending
+
+    def take_speculative_response(self, ai, phase):
+        """
+        Return the speculative reply for this turn, or None if there is none or it is stale.
+        A reply is stale if anything other than the expected messages was recorded since it
+        was started, or the speaker, phase, topic or user guidance changed.
+        """
+        speculative = self.speculative_turn
+        self.speculative_turn = None
+        if speculative is None:
+            return None
+        expected = (ai, phase, self.current_topic, self.guidance_epoch, self.history_position())
+        actual = (speculative["ai"], speculative["phase"], speculative["topic"], speculative["epoch"], speculative["history"])
+        if expected != actual:
+            speculative["future"].cancel()
+            logging.info(f"Discarding stale speculative turn for {speculative['ai']}")
+            return None
+        try:
+            return speculative["future"].result()
+        except Exception as e:
+            logging.error(f"Speculative turn for {ai} failed: {e}")
+            return None
+
+    def discard_speculative_turn(self):
+        speculative = self.speculative_turn
+        self.speculative_turn = None
+        if speculative is not None:
+            speculative["future"].cancel()
+
+    def generate_and_display_response(self, ai, phase, next_turn=None):
+        if ai == "Bard" and not self.bard_should_speak():
+            return
+
+        self.begin_turn(ai)
+
+        streamed = False
+        self.wait_for_speculative_turn()
+        self.turn_lock.acquire()
+        try:
+            context = self.get_context()
+            phase_prompt = self.get_phase_prompt(phase)
+            ai_response = self.take_speculative_response(ai, phase)
+            if ai_response is None and self.settings["stream"]:
+                ai_response = self.stream_and_display_response(ai, context, phase_prompt)
+                streamed = ai_response is not None
+            if ai_response is None:
+                ai_response = self.get_ai_response(ai, context, phase_prompt)
+    
+            if self.is_repetitive(ai, ai_response):
+                if streamed:
+                    self.discard_streamed_message()
+                    streamed = False
+                ai_response = self.request_new_argument(ai, context, phase_prompt)
+        except Exception as e:
+            logging.error(f"Error generating AI response: {e}")
+            if streamed:
+                self.discard_streamed_message()
+                streamed = False
+            ai_response = f"I apologize, but I encountered an error while formulating my response."
+        finally:
+            self.turn_lock.release()
+            self.remove_typing_indicator()
+
+        if ai_response:
+            if next_turn is not None:
+                self.speculate_next_turn(next_turn, ai, ai_response)
+            if streamed:
+                self.finalize_streamed_message(ai, ai_response)
+            else:
+                self.display_message(ai, ai_response)
+        elif streamed:
+            self.discard_streamed_message()
+
+        time.sleep(self.settings["delay"])
+
+        self.end_turn(ai)
+
+    def fan_out_responses(self, speakers, user_guidance, check_repetition=True):
+        """
+        Ask every speaker at once and display the answers in speaker order, each
+        one as soon as it and the answers before it are ready. Takes about as long
+        as the slowest call. A debate turn in flight is finished first, and the
+        context is read after it. Works whether or not the debate is running
+        (guidance is invited after an interrupt); stop_fan_out() stops it, showing
+        the answers that already arrived and cancelling the calls not yet made.
+        """
+        self.fan_out_stop.clear()
+        with self.turn_lock:
+            if self.fan_out_stop.is_set():
+                return
+            context = self.get_context()
+            futures = [self.fan_out_executor.submit(self.fan_out_turn, ai, context, user_guidance, check_repetition)
+                       for ai in speakers]
+            for ai, future in zip(speakers, futures):
+                if not future.done() and not self.fan_out_stop.is_set():
+                    self.display_typing_indicator(ai)
+                    while not self.fan_out_stop.is_set() and not wait([future], timeout=STOP_POLL_INTERVAL).done:
+                        pass
+                    self.remove_typing_indicator()
+                if not future.done():
+                    if not future.cancel():
+                        logging.info(f"Dropping {ai}'s answer, which was still being generated when stopped")
+                    continue
+                try:
+                    ai_response = future.result()
+                except Exception as e:
+                    logging.error(f"Error getting {ai}'s answer: {e}")
+                    ai_response = f"I apologize, but I encountered an error while formulating my response."
+                self.display_message(ai, ai_response)
+
+    def stop_fan_out(self):
+        # Called when the debate is paused or closed
+        self.fan_out_stop.set()
+
+    def fan_out_turn(self, ai, context, user_guidance, check_repetition):
+        ai_response = self.get_ai_response(ai, context, user_guidance)
+        if check_repetition and self.is_repetitive(ai, ai_response):
+            ai_response = self.request_new_argument(ai, context, user_guidance)
+        return ai_response
+
+    def get_context(self, pending=None):
+        # pending entries are rendered as if already recorded (used for speculative turns)
+        return self.context.render(pending)
+
+    def summarize_context(self, previous_summary, lines):
+        transcript = "\n".join(lines)
+        prompt = f"""
+        You are keeping notes on an ongoing debate about: {self.current_topic}
+
+        Summary so far:
+        {previous_summary or "(none yet)"}
+
+        New turns to fold into the summary:
+        {transcript}
+
+        Write an updated summary of no more than 150 words. Keep each debater's main
+        positions, the evidence they used, points of agreement and open disagreements.
+        """
+        return providers.generate_gemini(prompt)
+
+    def stream_and_display_response(self, ai, context, user_guidance):
+        """
+        Stream the AI's response into the chat display in coalesced chunks and
+        return the full text. The message is not recorded until it is finalized
+        with finalize_streamed_message (or dropped with discard_streamed_message).
+        """
+        chunks = []
+        pending = []
+        last_flush = time.monotonic()
+        started = False
+        for chunk in self.stream_ai_response(ai, context, user_guidance):
+            if not started:
+                self.remove_typing_indicator()
+                self.begin_streamed_message(ai)
+                started = True
+            chunks.append(chunk)
+            pending.append(chunk)
+            if sum(len(text) for text in pending) >= STREAM_FLUSH_CHARS or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL:
+                self.append_streamed_text(ai, "".join(pending))
+                pending = []
+                last_flush = time.monotonic()
+        if pending:
+            self.append_streamed_text(ai, "".join(pending))
+        return "".join(chunks).strip() if started else None
+
+    def run_debate(self, resume_path=None):
+        """
+        Run a full debate on the current topic, or carry on the one journaled at
+        resume_path, and return the conversation history. Set max_overtime_rounds
+        first, or overtime runs until conversation_active is cleared.
+        """
+        self.conversation_active = True
+        if resume_path:
+            start_phase = self.resume_from_journal(resume_path)
+            self.prefetch_topic_research()
+            self.display_message("System", f"Debate resumed on: {self.current_topic}")
+        else:
+            start_phase = 0
+            self.start_journal()
+            self.prefetch_topic_research()
+            self.display_message("System", f"Debate started on: {self.current_topic}")
+            logging.info(f"Starting new debate on topic: {self.current_topic}")
+        try:
+            self.run_conversation(start_phase)
+        finally:
+            self.conversation_active = False
+            self.close_journal()
+        return self.conversation_history
+
+    def close(self):
+        self.discard_speculative_turn()
+        self.stop_fan_out()
+        self.turn_executor.shutdown(wait=False)
+        self.fan_out_executor.shutdown(wait=False)
+        self.context.close()
+        self.close_journal()
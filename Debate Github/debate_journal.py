@@ -0,0 +1,241 @@
+import os
+import re
+import gzip
+import json
+import time
+import zlib
+import queue
+import atexit
+import logging
+import threading
+from typing import Dict, Optional
+
+JOURNAL_DIR = "journals"
+FSYNC_INTERVAL = 1.0  # seconds; records written since the last fsync are synced together
+JOURNAL_VERSION = 1
+READ_SIZE = 64 * 1024
+
+
+def journal_path(directory: str, topic: str, compress: bool = False) -> str:
+    """
+    A new journal file name for a debate on topic, e.g. journals/20240101-120000_ai-in-art.jsonl
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:40] or "debate"
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}_{slug}.jsonl" + (".gz" if compress else "")
+    return os.path.join(directory, name)
+
+
+class DebateJournal:
+    """
+    Append-only record of a debate, one JSON object per line.
+
+    append() only serializes and queues the record, so a turn never waits on the disk. A
+    writer thread writes whatever has queued up and fsyncs at most once per
+    FSYNC_INTERVAL, so a crash loses at most the last second of the debate.
+    With compress=True the journal is gzip-compressed; every batch is written
+    as a sync-flushed block, so a journal cut off by a crash still reads back
+    up to its last complete batch.
+
+    Record types:
+        start         topic, personalities and settings when the debate began
+        entry         one conversation_history entry
+        phase         a debate phase starting (index into DEBATE_PHASES), with the personalities then
+        state         the topic and personalities after they change
+        resume        the debate being resumed from this journal
+    """
+
+    def __init__(self, path: str, compress: Optional[bool] = None, fsync_interval: float = FSYNC_INTERVAL):
+        self.path = path
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.fsync_interval = fsync_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        repair_journal(path)
+        self.raw = open(path, "ab")
+        self.file = gzip.GzipFile(fileobj=self.raw, mode="ab") if self.compress else self.raw
+        self.records = queue.Queue()
+        self.closed = False
+        self.thread = threading.Thread(target=self.write_worker, name="debate-journal", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def append(self, record_type: str, **fields):
+        if self.closed:
+            return
+        # Serialized now, since the caller may go on changing what it passed in
+        self.records.put(json.dumps(dict(type=record_type, time=time.time(), **fields), ensure_ascii=False) + "\n")
+
+    def write_worker(self):
+        last_sync = 0.0
+        unsynced = False
+        while True:
+            try:
+                # Wake up in time to sync anything still unsynced
+                batch = [self.records.get(timeout=self.fsync_interval if unsynced else None)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in batch
+            lines = [line for line in batch if line is not None]
+            try:
+                if lines:
+                    self.file.write("".join(lines).encode("utf-8"))
+                    unsynced = True
+                if unsynced and (done or time.monotonic() - last_sync >= self.fsync_interval):
+                    self.sync()
+                    last_sync = time.monotonic()
+                    unsynced = False
+            except (OSError, ValueError) as e:
+                logging.error(f"Error writing debate journal {self.path}: {e}")
+            if done:
+                break
+
+    def sync(self):
+        self.file.flush()  # for gzip this ends the block, so everything so far can be decompressed
+        if self.file is not self.raw:
+            self.raw.flush()
+        os.fsync(self.raw.fileno())
+
+    def close(self):
+        """
+        Write and sync everything queued, then close the file.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self.records.put(None)
+        self.thread.join()
+        try:
+            if self.file is not self.raw:
+                self.file.close()
+            self.raw.close()
+        except OSError as e:
+            logging.error(f"Error closing debate journal {self.path}: {e}")
+
+
+def repair_journal(path: str):
+    """
+    Cut off a record left half-written by a crash, so records appended to the
+    journal afterwards can be read back.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    if not path.endswith(".gz"):
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < size:
+                logging.warning(f"Dropping {size - end} bytes of a half-written record from {path}")
+                f.truncate(end)
+        return
+    # A gzip stream that ends mid-block can't be appended to, so rewrite what can be read
+    try:
+        with open(path, "rb") as f:
+            if b"".join(inflate(f)).endswith(b"\n"):
+                return
+    except (OSError, zlib.error):
+        pass
+    logging.warning(f"Rewriting {path} without its half-written tail")
+    records = [json.dumps(record, ensure_ascii=False) + "\n" for record in read_records(path)]
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wb") as f:
+        f.write("".join(records).encode("utf-8"))
+    os.replace(tmp_path, path)
+
+
+def inflate(f):
+    """
+    Yield the decompressed bytes of a gzip file, member by member, up to a block
+    torn by a crash. gzip.GzipFile would lose everything in the buffer holding
+    the torn block, so a failing buffer is fed again a byte at a time.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    while True:
+        data = f.read(READ_SIZE)
+        if not data:
+            return
+        while data:
+            saved = decompressor.copy()
+            try:
+                yield decompressor.decompress(data)
+            except zlib.error:
+                decompressor = saved
+                for i in range(len(data)):
+                    if decompressor.eof:
+                        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    yield decompressor.decompress(data[i:i + 1])
+                raise
+            data = b""
+            if decompressor.eof:
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+
+def read_lines(path: str):
+    """
+    Yield the lines of a journal, compressed or not.
+    """
+    with open(path, "rb") as f:
+        if not path.endswith(".gz"):
+            yield from f
+            return
+        pending = b""
+        for chunk in inflate(f):
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                yield line + b"\n"
+        if pending:
+            yield pending
+
+
+def read_records(path: str):
+    """
+    Yield the records of a journal, stopping quietly at a tail cut off by a crash.
+    """
+    try:
+        for line in read_lines(path):
+            if not line.endswith(b"\n"):
+                break  # partly written record
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logging.warning(f"Skipping unreadable record in {path}")
+    except zlib.error as e:  # a block torn by a crash fails to inflate
+        logging.warning(f"Journal {path} ends early ({e}); resuming from the last complete record")
+
+
+def load_journal(path: str) -> Dict:
+    """
+    Rebuild the state of a debate from its journal: topic, personalities,
+    settings, conversation history and the phase it had reached.
+    """
+    state = {"topic": None, "personalities": {}, "settings": {}, "history": [], "phase_index": 0}
+    for record in read_records(path):
+        kind = record.get("type")
+        if kind == "start":
+            state.update(topic=record["topic"], personalities=record["personalities"],
+                         settings=record.get("settings", {}))
+        elif kind == "entry":
+            state["history"].append(record["entry"])
+        elif kind == "phase":
+            state["phase_index"] = record["index"]
+            state["personalities"] = record.get("personalities", state["personalities"])
+        elif kind == "state":
+            state.update(topic=record["topic"], personalities=record["personalities"])
+    if state["topic"] is None:
+        raise ValueError(f"{path} is not a debate journal (no start record)")
+    return state
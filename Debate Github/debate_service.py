@@ -0,0 +1,372 @@
+import sys
+import json
+import time
+import uuid
+import hmac
+import asyncio
+import secrets
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import websockets
+
+import providers
+from debate_engine import DebateEngine, DEFAULT_SETTINGS
+
+SERVICE_PORT = 8770
+MAX_SESSIONS = 32
+SUBSCRIBER_QUEUE_SIZE = 1000  # events a client may fall behind by before it is disconnected
+SESSION_IDLE_TIMEOUT = 600.0  # seconds a stopped session with no subscribers is kept
+CLEANUP_INTERVAL = 30.0
+# Settings a client may choose; where journals are written stays up to the host
+CLIENT_SETTINGS = set(DEFAULT_SETTINGS) - {"journal_dir", "journal_compress"}
+SPEAKERS = ["Gemini", "o1-mini", "Bard"]
+
+
+class ServiceDebate(DebateEngine):
+    """
+    A DebateEngine whose display hooks publish events to its session's
+    subscribers instead of drawing them.
+    """
+
+    def __init__(self, session, topic=None, settings=None):
+        self.session = session
+        super().__init__(topic=topic, settings=settings)
+
+    def record_message(self, speaker, message, analysis):
+        entry = super().record_message(speaker, message, analysis)
+        # index lets a client that just joined skip messages already in the history it was sent
+        self.session.publish({"type": "message", "index": len(self.conversation_history) - 1, "entry": entry})
+        return entry
+
+    def begin_streamed_message(self, speaker):
+        self.session.publish({"type": "stream_start", "speaker": speaker})
+
+    def append_streamed_text(self, speaker, text):
+        self.session.publish({"type": "stream_text", "speaker": speaker, "text": text})
+
+    def discard_streamed_message(self):
+        self.session.publish({"type": "stream_discard"})
+
+    def display_typing_indicator(self, ai):
+        self.session.publish({"type": "typing", "speaker": ai})
+
+    def remove_typing_indicator(self):
+        self.session.publish({"type": "typing_done"})
+
+
+class Subscriber:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.task = None
+
+
+class DebateSession:
+    """
+    One hosted debate: its own engine (history, personalities, topic and
+    provider sessions) and the clients watching it. The debate and any
+    guidance run on the service's worker threads; events are handed to the
+    event loop and queued for each subscriber without ever blocking the debate.
+    """
+
+    def __init__(self, service, loop: asyncio.AbstractEventLoop, session_id: str, topic: Optional[str],
+                 settings: Dict, personalities: Dict, overtime_rounds: Optional[int]):
+        self.service = service
+        self.id = session_id
+        self.loop = loop
+        self.subscribers = set()
+        self.engine = ServiceDebate(self, topic=topic, settings=settings)
+        self.engine.max_overtime_rounds = overtime_rounds
+        self.engine.apply_personality_overrides(personalities)
+        self.token = secrets.token_urlsafe(16)  # what a connection needs to join or control the debate
+        self.started = False
+        self.running = None  # future of the thread running the debate
+        self.last_active = time.monotonic()
+
+    def publish(self, event: Dict):
+        # Called from debate threads
+        event["session"] = self.id
+        self.loop.call_soon_threadsafe(self.deliver, event)
+
+    def deliver(self, event: Dict):
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logging.warning(f"Dropping a subscriber of session {self.id} that fell {SUBSCRIBER_QUEUE_SIZE} "
+                                f"events behind")
+                self.unsubscribe(subscriber)
+                asyncio.ensure_future(subscriber.websocket.close(1013, "Fell too far behind; join again"))
+
+    def subscribe(self, websocket) -> Subscriber:
+        subscriber = Subscriber(websocket)
+        subscriber.task = asyncio.ensure_future(self.forward(subscriber))
+        self.subscribers.add(subscriber)
+        self.last_active = time.monotonic()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+        subscriber.task.cancel()
+        self.last_active = time.monotonic()
+
+    async def forward(self, subscriber: Subscriber):
+        while True:
+            event = await subscriber.queue.get()
+            try:
+                await subscriber.websocket.send(json.dumps(event, ensure_ascii=False))
+            except websockets.ConnectionClosed:
+                self.subscribers.discard(subscriber)
+                return
+
+    def describe(self) -> Dict:
+        engine = self.engine
+        return {
+            "session": self.id,
+            "topic": engine.current_topic,
+            "active": engine.conversation_active,
+            "phase_index": engine.phase_index,
+            "turns": len(engine.conversation_history),
+            "subscribers": len(self.subscribers)
+        }
+
+    def snapshot(self) -> Dict:
+        engine = self.engine
+        return dict(self.describe(), type="joined", personalities=engine.get_personalities(),
+                    history=list(engine.conversation_history))
+
+    def is_running(self) -> bool:
+        return self.running is not None and not self.running.done()
+
+    def start(self):
+        if self.is_running():
+            raise ValueError("The debate is running (or still finishing the turn it was paused in)")
+        self.engine.conversation_active = True
+        if not self.started:
+            self.started = True
+            self.running = self.service.threads.submit(self.run_new_debate)
+        else:
+            self.running = self.service.threads.submit(self.continue_debate)
+
+    def continue_debate(self):
+        self.engine.display_message("System", "Debate continued.")
+        self.run_debate_thread(self.engine.phase_index)
+
+    def run_new_debate(self):
+        engine = self.engine
+        engine.start_journal()
+        engine.prefetch_topic_research()
+        engine.display_message("System", f"Debate started on: {engine.current_topic}")
+        logging.info(f"Session {self.id}: starting debate on {engine.current_topic}")
+        self.run_debate_thread(0)
+
+    def run_debate_thread(self, start_phase: int):
+        try:
+            self.engine.run_conversation(start_phase)
+        except Exception as e:
+            logging.error(f"Session {self.id}: debate failed: {e}")
+            self.publish({"type": "error", "message": f"The debate stopped: {e}"})
+        finally:
+            self.engine.conversation_active = False
+            self.publish({"type": "stopped", "phase_index": self.engine.phase_index})
+
+    def pause(self):
+        self.engine.conversation_active = False
+        self.engine.discard_speculative_turn()
+        self.engine.stop_fan_out()
+        self.engine.display_message("System", "Debate paused.")
+
+    def guide(self, text: str, question: bool = False):
+        """
+        Ask every debater to respond to guidance or an audience question, as the
+        GUI's buttons do. This works while the debate is paused too; pausing stops it.
+        """
+        engine = self.engine
+        engine.guidance_epoch += 1
+        if question:
+            engine.display_message("User", f"Question: {text}")
+            guidance, check_repetition = f"Answer the following question based on the debate topic: {text}", False
+        else:
+            engine.display_message("System", f"User Guidance: {text}")
+            guidance, check_repetition = text, True
+        engine.fan_out_responses(SPEAKERS, guidance, check_repetition)
+
+    def close(self):
+        self.engine.conversation_active = False
+        self.engine.stop_fan_out()
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+        self.service.threads.submit(self.engine.close)
+
+
+class DebateService:
+    """
+    Hosts many debates at once behind one WebSocket endpoint. Every session
+    has its own engine; they share the process-wide provider client, so
+    --max-calls caps provider requests across all of them.
+
+    Clients send JSON requests and receive JSON events:
+
+        {"type": "create", "topic": "...", "settings": {...}, "personalities": {...}, "overtime_rounds": 2}
+        {"type": "join", "session": "<id>", "token": "..."}  -> {"type": "joined", "history": [...], ...},
+                                                               then live events
+        {"type": "start" | "pause" | "leave" | "close", "session": "<id>"}
+        {"type": "guidance" | "question", "session": "<id>", "text": "..."}
+        {"type": "list"}
+
+    Events: message (with its index in the history), stream_start,
+    stream_text, stream_discard, typing, typing_done, stopped and error.
+    Creating a session joins it, and its "joined" reply carries the
+    session's secret token. Sessions are private: a connection can only see
+    (list), join or control the sessions it created or has given the token
+    for once, e.g. to share a debate or to rejoin after reconnecting.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        # Each session needs a thread for its debate and one for guidance
+        self.threads = ThreadPoolExecutor(max_workers=max_sessions * 2, thread_name_prefix="debate-session")
+
+    async def handle(self, websocket):
+        subscriptions = {}  # session id -> Subscriber for this connection
+        granted = set()  # ids of the sessions this connection may use
+        try:
+            async for raw in websocket:
+                try:
+                    request = json.loads(raw)
+                    reply = await self.dispatch(websocket, request, subscriptions, granted)
+                except (ValueError, KeyError, TypeError) as e:
+                    reply = {"type": "error", "message": str(e)}
+                if reply is not None:
+                    await websocket.send(json.dumps(reply, ensure_ascii=False))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for session_id, subscriber in subscriptions.items():
+                if session_id in self.sessions:
+                    self.sessions[session_id].unsubscribe(subscriber)
+
+    async def dispatch(self, websocket, request: Dict, subscriptions: Dict, granted: set) -> Optional[Dict]:
+        kind = request["type"]
+        if kind == "list":
+            return {"type": "sessions", "sessions": [session.describe() for session_id, session in self.sessions.items()
+                                                     if session_id in granted]}
+        created = False
+        if kind == "create":
+            if len(self.sessions) >= self.max_sessions:
+                raise ValueError(f"The service is hosting its limit of {self.max_sessions} debates")
+            settings = {key: value for key, value in (request.get("settings") or {}).items() if key in CLIENT_SETTINGS}
+            session_id = uuid.uuid4().hex[:12]
+            loop = asyncio.get_running_loop()
+            # Building an engine generates personalities and opens a cassette; keep that off the loop
+            session = await loop.run_in_executor(
+                self.threads, lambda: DebateSession(self, loop, session_id, request.get("topic"), settings,
+                                                    request.get("personalities") or {},
+                                                    request.get("overtime_rounds")))
+            self.sessions[session_id] = session
+            granted.add(session_id)
+            logging.info(f"Created session {session_id} on {session.engine.current_topic}")
+            request = {"type": "join", "session": session_id}
+            kind = "join"
+            created = True
+
+        session = self.sessions.get(request["session"])
+        if session is not None and session.id not in granted:
+            token = request.get("token")
+            if isinstance(token, str) and hmac.compare_digest(token, session.token):
+                granted.add(session.id)
+            else:
+                session = None
+        if session is None:
+            # The same answer whether the session doesn't exist or isn't this connection's
+            raise ValueError(f"No session {request['session']}")
+        loop = asyncio.get_running_loop()
+        if kind == "join":
+            if session.id not in subscriptions:
+                # The snapshot and the subscription happen together on the loop, so no event falls between them
+                snapshot = session.snapshot()
+                subscriptions[session.id] = session.subscribe(websocket)
+            else:
+                snapshot = session.snapshot()
+            if created:
+                snapshot["token"] = session.token
+            return snapshot
+        if kind == "leave":
+            subscriber = subscriptions.pop(session.id, None)
+            if subscriber is not None:
+                session.unsubscribe(subscriber)
+            return {"type": "left", "session": session.id}
+        if kind == "start":
+            session.start()
+            return None
+        if kind == "pause":
+            await loop.run_in_executor(self.threads, session.pause)
+            return None
+        if kind in ("guidance", "question"):
+            text = str(request["text"]).strip()
+            if not text:
+                raise ValueError("Empty guidance")
+            self.threads.submit(self.run_guidance, session, text, kind == "question")
+            return None
+        if kind == "close":
+            self.sessions.pop(session.id, None)
+            subscriptions.pop(session.id, None)
+            session.close()
+            return {"type": "closed", "session": session.id}
+        raise ValueError(f"Unknown request type '{kind}'")
+
+    def run_guidance(self, session: DebateSession, text: str, question: bool):
+        try:
+            session.guide(text, question)
+        except Exception as e:
+            logging.error(f"Session {session.id}: guidance failed: {e}")
+            session.publish({"type": "error", "message": f"Guidance failed: {e}"})
+
+    async def clean_up_idle_sessions(self):
+        while True:
+            await asyncio.sleep(CLEANUP_INTERVAL)
+            now = time.monotonic()
+            for session_id, session in list(self.sessions.items()):
+                if (not session.subscribers and not session.is_running()
+                        and now - session.last_active > SESSION_IDLE_TIMEOUT):
+                    logging.info(f"Closing idle session {session_id}")
+                    del self.sessions[session_id]
+                    session.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = SERVICE_PORT):
+        cleanup = asyncio.ensure_future(self.clean_up_idle_sessions())
+        try:
+            async with websockets.serve(self.handle, host, port):
+                logging.info(f"Debate service listening on ws://{host}:{port}")
+                await asyncio.Future()
+        finally:
+            cleanup.cancel()
+            for session in list(self.sessions.values()):
+                session.close()
+            self.threads.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many debates at once over a WebSocket API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS, help="Debates hosted at the same time")
+    parser.add_argument("--max-calls", type=int, default=providers.MAX_CONCURRENT_CALLS,
+                        help="Provider requests in flight at once, shared by all debates")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    providers.set_max_concurrent_calls(args.max_calls)
+    try:
+        asyncio.run(DebateService(args.max_sessions).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
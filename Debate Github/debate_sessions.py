@@ -0,0 +1,214 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import providers
+from conversation_context import estimate_tokens, render_line
+
+SESSION_MAX_TOKENS = 32000  # a session this large starts over from the rolling context
+RECACHE_TOKENS = 800        # uncached tail that triggers caching the conversation again
+CACHE_EXPIRY_MARGIN = 60.0  # seconds before a cache expires that it stops being used
+CACHE_ERROR_STATUS = {400, 403, 404}  # a cache that expired or was deleted early
+MAX_PENDING_REPLIES = 8     # generated replies kept waiting for commit()
+
+
+class DebaterSession:
+    """
+    One debater's ongoing conversation with Gemini.
+
+    The persona and research preamble goes out once, as the system
+    instruction of a context cache; after that each turn sends only the
+    debate messages the debater hasn't seen yet, on top of the cached
+    prefix. The first turn of a new session (or one that was reset) sends
+    the rolling context instead of a delta.
+
+    Gemini only caches prefixes above a model-specific minimum size (see
+    providers.gemini_cache_min_tokens). That is 32k tokens for
+    gemini-1.5-pro, more than a session holds before it starts over
+    (SESSION_MAX_TOKENS), so sessions run on providers.GEMINI_SESSION_MODEL,
+    whose minimum is 1024 tokens; the preamble alone usually reaches it.
+    Until the session is cached it is sent in full, preamble included. If it
+    grows past the token budget without being cached, it starts over from
+    the rolling context rather than dropping its early turns.
+
+    A reply becomes part of the session when commit() is called with the
+    text that was actually shown; replies that were generated but never
+    shown (stale speculative turns, repeats that got regenerated) are
+    dropped. A reply generated alongside another one (a fan-out answer
+    during a debate turn) is added after it rather than replacing it.
+    """
+
+    def __init__(self, speaker: str, token_budget: int, model: str = providers.GEMINI_SESSION_MODEL):
+        self.speaker = speaker
+        self.token_budget = token_budget
+        self.model = model
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, preamble: Optional[str] = None):
+        with self.lock:
+            self.preamble = preamble
+            self.contents = []  # committed turns, alternating user/model
+            self.seen = 0  # conversation_history entries already sent to the debater
+            self.cache_name = None
+            self.cache_expires = 0.0
+            self.cached_turns = 0  # leading entries of contents held by the cache
+            self.cache_failed_at = None  # session size when caching last failed
+            self.pending = {}  # reply text -> (contents it was generated after, new turns, seen)
+
+    def prepare(self, preamble: str, history: List[Dict], pending: Optional[List[Dict]], context: str,
+                make_message: Callable[[str], str]):
+        """
+        Work out what this turn sends. history is the recorded conversation and
+        pending the entries about to be recorded (speculative turns).
+        """
+        if preamble != self.preamble or self.tokens() > SESSION_MAX_TOKENS:
+            if self.preamble is not None:
+                logging.info(f"Resetting {self.speaker}'s session")
+            self.reset(preamble)
+        else:
+            self.refresh_cache()
+            if self.cache_name is None and self.tokens() > self.token_budget:
+                logging.info(f"Resetting {self.speaker}'s session, which outgrew the budget without being cached")
+                self.reset(preamble)
+        with self.lock:
+            entries = history[self.seen:] + list(pending or [])
+            if not self.contents:
+                transcript = f"Context of the conversation so far:\n{context}"
+            else:
+                lines = [render_line(entry) for entry in entries if entry["speaker"] != self.speaker]
+                transcript = "New messages since your last turn:\n" + "\n".join(lines) if lines else ""
+            # The turn's instructions are only sent once; the session keeps just the transcript
+            message = providers.gemini_content("user", make_message(transcript))
+            kept = providers.gemini_content("user", transcript or "(No new messages.)")
+            return self.contents + [message], (self.contents, kept), len(history) + len(pending or [])
+
+    def tokens(self, contents: Optional[List[Dict]] = None) -> int:
+        contents = self.contents if contents is None else contents
+        return sum(estimate_tokens(part.get("text", "")) for content in contents for part in content["parts"])
+
+    def request(self, contents: List[Dict]):
+        """
+        Return (contents to send, system instruction, cache name) for a turn,
+        caching the conversation first if the uncached tail has grown enough.
+        """
+        self.refresh_cache()
+        with self.lock:
+            if self.cache_name is not None:
+                return contents[self.cached_turns:], None, self.cache_name
+            # Uncached: send the whole session (prepare keeps it within the budget)
+            return contents, self.preamble, None
+
+    def refresh_cache(self):
+        with self.lock:
+            if self.cache_name is not None and time.monotonic() >= self.cache_expires:
+                self.cache_name = None
+                self.cached_turns = 0
+            if self.cache_name is not None and self.tokens(self.contents[self.cached_turns:]) < RECACHE_TOKENS:
+                return
+            size = estimate_tokens(self.preamble or "") + self.tokens()
+            if size < providers.gemini_cache_min_tokens(self.model):
+                return  # Gemini would reject it
+            # After any other failure, wait for the session to double before trying again
+            if self.cache_failed_at is not None and size < 2 * self.cache_failed_at:
+                return
+            preamble, contents = self.preamble, list(self.contents)
+        try:
+            name = providers.create_gemini_cache(contents, preamble, model=self.model)
+        except Exception as e:
+            logging.info(f"Not caching {self.speaker}'s session yet: {e}")
+            with self.lock:
+                self.cache_failed_at = size
+            return
+        with self.lock:
+            if preamble != self.preamble or contents != self.contents[:len(contents)]:
+                return  # reset or moved on while the cache was being created
+            self.cache_name = name
+            self.cache_expires = time.monotonic() + providers.GEMINI_CACHE_TTL - CACHE_EXPIRY_MARGIN
+            self.cached_turns = len(contents)
+            self.cache_failed_at = None
+
+    def drop_cache(self, error: Exception) -> bool:
+        """
+        Forget a cache the provider no longer accepts. Returns True if the turn should be retried.
+        """
+        if getattr(error, "status", None) not in CACHE_ERROR_STATUS:
+            return False
+        with self.lock:
+            if self.cache_name is None:
+                return False
+            logging.warning(f"{self.speaker}'s context cache was rejected ({error}); sending the session in full")
+            self.cache_name = None
+            self.cached_turns = 0
+            self.cache_failed_at = estimate_tokens(self.preamble or "") + self.tokens()
+            return True
+
+    def respond(self, preamble: str, history: List[Dict], pending: Optional[List[Dict]], context: str,
+                make_message: Callable[[str], str], on_request: Optional[Callable] = None) -> str:
+        """
+        Generate the debater's reply. on_request(system_instruction, contents) is
+        told what each request sends, for metrics.
+        """
+        contents, kept, seen = self.prepare(preamble, history, pending, context, make_message)
+        while True:
+            send, system_instruction, cache_name = self.request(contents)
+            if on_request is not None:
+                on_request(system_instruction, send)
+            try:
+                reply = providers.generate_gemini_contents(send, system_instruction, cache_name, self.model).strip()
+                break
+            except providers.ProviderError as e:
+                if not (cache_name and self.drop_cache(e)):
+                    raise
+        self.remember(reply, kept, seen)
+        return reply
+
+    def stream(self, preamble: str, history: List[Dict], pending: Optional[List[Dict]], context: str,
+               make_message: Callable[[str], str], on_request: Optional[Callable] = None):
+        contents, kept, seen = self.prepare(preamble, history, pending, context, make_message)
+        send, system_instruction, cache_name = self.request(contents)
+        if on_request is not None:
+            on_request(system_instruction, send)
+        chunks = []
+        try:
+            for chunk in providers.stream_gemini_contents(send, system_instruction, cache_name, self.model):
+                chunks.append(chunk)
+                yield chunk
+        except providers.ProviderError as e:
+            # Nothing has been shown yet, so a rejected cache can be retried without it
+            if chunks or not (cache_name and self.drop_cache(e)):
+                raise
+            send, system_instruction, cache_name = self.request(contents)
+            if on_request is not None:
+                on_request(system_instruction, send)
+            for chunk in providers.stream_gemini_contents(send, system_instruction, cache_name, self.model):
+                chunks.append(chunk)
+                yield chunk
+        self.remember("".join(chunks).strip(), kept, seen)
+
+    def remember(self, reply: str, kept, seen: int):
+        base, message = kept
+        with self.lock:
+            self.pending[reply] = (base, [message, providers.gemini_content("model", reply)], seen)
+            while len(self.pending) > MAX_PENDING_REPLIES:
+                del self.pending[next(iter(self.pending))]
+
+    def commit(self, message: str):
+        """
+        Called when one of the debater's messages is recorded. A message the
+        session didn't generate (an error notice, say) resets the session, since
+        the debater would otherwise never see it.
+        """
+        with self.lock:
+            state = self.pending.pop(message.strip(), None)
+            if state is not None:
+                base, turns, seen = state
+                if base is self.contents:
+                    self.contents = base + turns
+                else:
+                    # Another reply was committed since this one was generated; keep both
+                    self.contents = self.contents + turns
+                self.seen = max(self.seen, seen)
+                return
+        self.reset(self.preamble)
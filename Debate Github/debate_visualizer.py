@@ -6,18 +6,27 @@ import networkx as nx
 import json
 import socket
 import threading
+import time
 from wordcloud import WordCloud
 from textblob import TextBlob
 import seaborn as sns
 from collections import defaultdict
 from gensim import corpora, models
-from gensim.models import CoherenceModel
 import logging
 import spacy
+from framing import available_formats, decoder_for
+from topic_model import OnlineTopicModel
 
 # Initialize spaCy for NER
 nlp = spacy.load("en_core_web_sm")
 
+# The debate app's broadcast hub (broadcast_hub.py)
+HUB_ADDRESS = ('localhost', 12345)
+RECONNECT_DELAY = 1.0  # seconds, doubled after each failed attempt up to MAX_RECONNECT_DELAY
+MAX_RECONNECT_DELAY = 10.0
+RECV_BYTES = 65536
+REDRAW_INTERVAL_MS = 250  # updates arriving within this long share one redraw
+
 # Configure logging
 logging.basicConfig(filename='debate_visualizer.log', level=logging.INFO,
                     format='%(asctime)s:%(levelname)s:%(message)s')
@@ -35,6 +44,13 @@ class DebateVisualizer(tk.Tk):
         self.connection_status = tk.StringVar(value="Disconnected")
         self.live_status = tk.StringVar(value="Live")
         self.custom_alerts = []
+        self.incoming = []  # updates received but not yet added to debate_data
+        self.incoming_lock = threading.Lock()
+        self.ingest_scheduled = False
+        self.topics = None  # latest topics from the topic model
+        self.topics_drawn = None
+        self.coherence_status = tk.StringVar(value="Coherence: not computed")
+        self.topic_model = OnlineTopicModel(lambda topics: self.after(0, self.show_topics, topics))
         self.setup_ui()
         self.connect_socket()
 
@@ -116,6 +132,10 @@ class DebateVisualizer(tk.Tk):
         self.wordcloud_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
     def init_topics_tab(self, parent):
+        controls = ttk.Frame(parent)
+        controls.pack(fill=tk.X)
+        ttk.Button(controls, text="Compute Coherence", command=self.compute_coherence).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Label(controls, textvariable=self.coherence_status).pack(side=tk.LEFT, padx=5)
         self.topics_fig, self.topics_ax = plt.subplots(figsize=(8, 6))
         self.topics_canvas = FigureCanvasTkAgg(self.topics_fig, master=parent)
         self.topics_canvas.draw()
@@ -128,32 +148,61 @@ class DebateVisualizer(tk.Tk):
         self.entities_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
     def connect_socket(self):
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        try:
-            self.sock.connect(('localhost', 12345))
+        self.last_seq = None  # sequence number of the last update received
+        self.hub_id = None  # run of the hub last_seq comes from
+        threading.Thread(target=self.stay_connected, daemon=True).start()
+
+    def stay_connected(self):
+        # Reconnects whenever the connection drops, replaying what was missed from the hub's backlog
+        delay = RECONNECT_DELAY
+        warned = False
+        while True:
+            try:
+                self.sock = socket.create_connection(HUB_ADDRESS)
+                # Ask for length-prefixed frames, binary if msgpack is installed
+                hello = {"since": self.last_seq, "hub_id": self.hub_id, "formats": available_formats()[::-1]}
+                self.sock.sendall(json.dumps(hello).encode() + b'\n')
+            except socket.error as e:
+                if not warned:
+                    warned = True
+                    self.connection_status.set("Failed to Connect")
+                    self.after(0, messagebox.showerror, "Connection Error",
+                               "Unable to connect to debate application. Retrying in the background.")
+                    logging.error(f"Connection failed: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                continue
+            delay = RECONNECT_DELAY
+            warned = False
             self.connection_status.set("Connected")
-            logging.info("Connected to debate application.")
-            threading.Thread(target=self.receive, daemon=True).start()
-        except socket.error as e:
-            self.connection_status.set("Failed to Connect")
-            messagebox.showerror("Connection Error", "Unable to connect to debate application.")
-            logging.error(f"Connection failed: {e}")
+            logging.info(f"Connected to debate application (replaying after update {self.last_seq}).")
+            self.receive()
+            self.sock.close()
+            self.connection_status.set("Reconnecting...")
+            time.sleep(RECONNECT_DELAY)
 
     def receive(self):
+        # Older debate apps ignore the hello and send JSON lines; the hub sends frames
+        decoder = None
         while True:
             try:
-                data = self.sock.recv(4096).decode()
+                data = self.sock.recv(RECV_BYTES)
                 if data:
-                    updates = data.strip().split('\n')  # Assuming each message ends with newline
-                    for item in updates:
-                        update = json.loads(item)
-                        self.debate_data.append(update)
-                        self.speakers.add(update['speaker'])
-                        self.perform_ner(update)
-                        self.check_alerts(update)
-                    self.update_speaker_filter()
-                    if self.live:
-                        self.after(0, self.update_views)
+                    if decoder is None:
+                        decoder = decoder_for(data)
+                    updates = []
+                    for update in decoder.feed(data):
+                        if 'hub_id' in update:
+                            self.start_hub_run(update['hub_id'])
+                            continue
+                        updates.append(update)
+                    for update in updates:
+                        self.last_seq = update.pop('seq', self.last_seq)
+                        # The debate app sends entities and sentiment with each message
+                        if 'entities' not in update:
+                            self.perform_ner(update)
+                    if updates:
+                        self.queue_updates(updates)
                 else:
                     break
             except Exception as e:
@@ -162,11 +211,47 @@ class DebateVisualizer(tk.Tk):
         self.connection_status.set("Disconnected")
         logging.info("Disconnected from debate application.")
 
+    def start_hub_run(self, hub_id):
+        # A restarted hub numbers its updates from 1 again and replays its whole backlog
+        if hub_id != self.hub_id:
+            if self.hub_id is not None:
+                logging.info("Debate application restarted; replaying its updates from the start.")
+            self.hub_id = hub_id
+            self.last_seq = None
+
+    def queue_updates(self, updates):
+        # Hand updates to the Tk thread; a burst is taken in with one redraw
+        with self.incoming_lock:
+            self.incoming.extend(updates)
+            if self.ingest_scheduled:
+                return
+            self.ingest_scheduled = True
+        self.after(REDRAW_INTERVAL_MS, self.ingest_updates)
+
+    def ingest_updates(self):
+        with self.incoming_lock:
+            updates, self.incoming = self.incoming, []
+            self.ingest_scheduled = False
+        for update in updates:
+            self.debate_data.append(update)
+            self.speakers.add(update['speaker'])
+            self.check_alerts(update)
+        self.topic_model.add_documents([update['message'] for update in updates])
+        self.update_speaker_filter()
+        if self.live:
+            self.update_views()
+
     def perform_ner(self, entry):
         doc = nlp(entry['message'])
         entities = [(ent.text, ent.label_) for ent in doc.ents]
         entry['entities'] = entities
 
+    def get_sentiment(self, entry):
+        # Scored once; older senders and loaded files may not include it
+        if 'sentiment' not in entry:
+            entry['sentiment'] = TextBlob(entry['message']).sentiment.polarity
+        return entry['sentiment']
+
     def update_speaker_filter(self):
         current = self.filtered_speaker.get()
         speakers = sorted(self.speakers)
@@ -179,7 +264,6 @@ class DebateVisualizer(tk.Tk):
         self.update_flow()
         self.update_sentiment()
         self.update_wordcloud()
-        self.update_topics()
         self.update_entities()
 
     def toggle_live(self):
@@ -188,6 +272,7 @@ class DebateVisualizer(tk.Tk):
         logging.info(f"Live updates {'resumed' if self.live else 'paused'}.")
         if self.live:
             self.update_views()
+            self.update_topics()
 
     def save_data(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".json",
@@ -242,7 +327,7 @@ class DebateVisualizer(tk.Tk):
         ax = self.sentiment_ax
         ax.clear()
         filtered = self.get_filtered_data()
-        sentiments = [TextBlob(e['message']).sentiment.polarity for e in filtered]
+        sentiments = [self.get_sentiment(e) for e in filtered]
         speakers = [e['speaker'] for e in filtered]
         sns.lineplot(x=range(len(sentiments)), y=sentiments, hue=speakers, ax=ax, palette="tab10")
         ax.set_title("Sentiment Analysis")
@@ -262,31 +347,51 @@ class DebateVisualizer(tk.Tk):
             ax.set_title("Word Cloud")
         self.wordcloud_canvas.draw()
 
+    def show_topics(self, topics):
+        # Called only when the topic model's topics have changed
+        self.topics = topics
+        if self.live:
+            self.update_topics()
+
     def update_topics(self):
+        # Topics cover the whole debate, whichever speaker is selected
+        if self.topics is None or self.topics is self.topics_drawn:
+            return
+        self.topics_drawn = self.topics
         ax = self.topics_ax
         ax.clear()
-        filtered = self.get_filtered_data()
-        texts = [entry['message'].lower().split() for entry in filtered]
-        dictionary = corpora.Dictionary(texts)
-        corpus = [dictionary.doc2bow(text) for text in texts]
-        if len(dictionary) == 0:
-            return  # Avoid errors if no data
-        lda_model = models.LdaModel(corpus, num_topics=5, id2word=dictionary, passes=10)
-        coherence = CoherenceModel(model=lda_model, texts=texts, dictionary=dictionary, coherence='c_v').get_coherence()
-        logging.info(f'LDA Model Coherence: {coherence}')
-
-        topics = lda_model.print_topics(num_words=5)
-        topic_dict = {f"Topic {i+1}": lda_model.show_topic(i, topn=5) for i in range(5)}
-        
-        ax.barh(range(len(topics)), [sum(prob for _, prob in topic) for topic in topic_dict.values()], color='skyblue')
-        ax.set_yticks(range(len(topics)))
+        # Each topic's share of the top-word weight of all topics, largest first
+        weights = [sum(prob for _, prob in topic) for topic in self.topics]
+        total = sum(weights) or 1.0
+        ranked = sorted(range(len(self.topics)), key=lambda i: weights[i], reverse=True)
+        topic_dict = {f"Topic {i+1}": (weights[i] / total, self.topics[i]) for i in ranked}
+
+        ax.barh(range(len(topic_dict)), [share for share, _ in topic_dict.values()], color='skyblue')
+        ax.set_yticks(range(len(topic_dict)))
         ax.set_yticklabels(topic_dict.keys())
+        ax.invert_yaxis()
         ax.set_title("Top Topics in Debate")
-        ax.set_xlabel("Probability")
-        for i, topic in enumerate(topics):
-            ax.text(0, i, topic[1], fontsize=8, va='center')
+        ax.set_xlabel("Share of topic word weight")
+        for i, (_, topic) in enumerate(topic_dict.values()):
+            ax.text(0, i, " + ".join(f'{prob:.3f}*"{word}"' for word, prob in topic), fontsize=8, va='center')
         self.topics_canvas.draw()
 
+    def compute_coherence(self):
+        self.coherence_status.set("Coherence: computing...")
+        threading.Thread(target=self.run_coherence, daemon=True).start()
+
+    def run_coherence(self):
+        try:
+            coherence = self.topic_model.coherence()
+        except Exception as e:
+            logging.error(f"Coherence failed: {e}")
+            coherence = None
+        if coherence is None:
+            self.after(0, self.coherence_status.set, "Coherence: not enough data")
+        else:
+            logging.info(f'LDA Model Coherence: {coherence}')
+            self.after(0, self.coherence_status.set, f"Coherence (c_v): {coherence:.3f}")
+
     def update_entities(self):
         ax = self.entities_ax
         ax.clear()
@@ -333,7 +438,7 @@ class DebateVisualizer(tk.Tk):
         ttk.Button(top, text="Add Alert", command=submit_alert).pack(pady=10)
 
     def check_alerts(self, entry):
-        sentiment = TextBlob(entry['message']).sentiment.polarity
+        sentiment = self.get_sentiment(entry)
         for alert in self.custom_alerts:
             threshold = alert['threshold']
             direction = alert['direction']
@@ -0,0 +1,198 @@
+import io
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pydub import AudioSegment
+
+from tts_engines import get_synthesizer, SYNTHESIZERS
+from tts_cache import TTSCache, CachedSynthesizer, TTS_CACHE_DIR
+
+SILENT_SPEAKERS = {"System", "Interrupt"}  # not read aloud, same as the live TTS
+TURN_GAP_MS = 600
+CHAPTER_TITLE_CHARS = 60
+
+# Set in each worker process by init_worker
+worker_synthesizer = None
+
+
+def load_conversation(path):
+    """
+    Read a conversation saved by save_conversation (a list of entries) or a
+    batch transcript (a dict with a "conversation" list).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("conversation", [])
+    return data
+
+
+def spoken_turns(conversation):
+    """
+    Return (speaker, message, phase) for every turn that is read aloud.
+    The phase comes from the most recent "--- Phase ---" system message.
+    """
+    turns = []
+    phase = None
+    for entry in conversation:
+        speaker, message = entry.get("speaker", ""), entry.get("message", "").strip()
+        if speaker == "System" and message.startswith("---"):
+            phase = message.strip("- ").strip()
+        if speaker in SILENT_SPEAKERS or not message:
+            continue
+        turns.append((speaker, message, phase))
+    return turns
+
+
+def init_worker(engine, cache_dir):
+    global worker_synthesizer
+    synthesizer = get_synthesizer(engine)
+    worker_synthesizer = CachedSynthesizer(synthesizer, TTSCache(cache_dir)) if cache_dir else synthesizer
+
+
+def synthesize_turn(speaker, message):
+    return worker_synthesizer.synthesize(message, worker_synthesizer.voice_for(speaker))
+
+
+def chapter_title(speaker, message, phase):
+    title = f"{phase}: {speaker}" if phase else speaker
+    preview = message if len(message) <= CHAPTER_TITLE_CHARS else message[:CHAPTER_TITLE_CHARS].rsplit(" ", 1)[0] + "..."
+    return f"{title} - {preview}"
+
+
+def write_chapters(path, chapters):
+    """
+    Write chapters as an FFMETADATA file that ffmpeg can attach to the audio.
+    """
+    def escape(text):
+        for char in "\\=;#\n":
+            text = text.replace(char, "\\" + char)
+        return text
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(";FFMETADATA1\n")
+        for start, end, title in chapters:
+            f.write(f"[CHAPTER]\nTIMEBASE=1/1000\nSTART={start}\nEND={end}\ntitle={escape(title)}\n")
+
+
+def embed_chapters(audio_path, chapters_path):
+    """
+    Copy the chapters into the audio file with ffmpeg. Returns False if ffmpeg is unavailable or fails.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        logging.warning("ffmpeg not found; chapters are only in the sidecar file")
+        return False
+    root, ext = os.path.splitext(audio_path)
+    tmp_path = f"{root}.chapters{ext}"
+    result = subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", audio_path, "-i", chapters_path,
+                             "-map", "0:a", "-map_metadata", "1", "-map_chapters", "1", "-codec", "copy", tmp_path],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        logging.error(f"Error embedding chapters: {result.stderr.strip()}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, audio_path)
+    return True
+
+
+def stitch_turns(turns, segments, gap_ms=TURN_GAP_MS):
+    """
+    Join the synthesized turns in conversation order with a gap after each one,
+    skipping turns that failed. Returns the audio and a (start ms, end ms, title)
+    chapter per turn. Every segment is converted to a common format and the raw
+    frames are joined once, rather than copying the growing podcast per turn.
+    """
+    present = [(turn, segment) for turn, segment in zip(turns, segments) if segment is not None]
+    if not present:
+        return AudioSegment.empty(), []
+    # The richest format of any segment, as pydub picks when adding two segments
+    channels = max(segment.channels for _, segment in present)
+    sample_width = max(segment.sample_width for _, segment in present)
+    frame_rate = max(segment.frame_rate for _, segment in present)
+
+    def convert(segment):
+        return segment.set_channels(channels).set_sample_width(sample_width).set_frame_rate(frame_rate)
+
+    gap = convert(AudioSegment.silent(duration=gap_ms, frame_rate=frame_rate)).raw_data
+    frame_bytes = channels * sample_width
+    parts = []
+    chapters = []
+    frames = 0
+    for (speaker, message, phase), segment in present:
+        data = convert(segment).raw_data
+        start = frames
+        frames += len(data) // frame_bytes
+        chapters.append((start * 1000 // frame_rate, frames * 1000 // frame_rate,
+                         chapter_title(speaker, message, phase)))
+        parts.append(data)
+        parts.append(gap)
+        frames += len(gap) // frame_bytes
+    podcast = AudioSegment(data=b"".join(parts), sample_width=sample_width, frame_rate=frame_rate,
+                           channels=channels)
+    return podcast, chapters
+
+
+def export_debate(conversation, output, engine="pyttsx3", workers=4, cache_dir=TTS_CACHE_DIR, gap_ms=TURN_GAP_MS):
+    """
+    Synthesize every spoken turn in parallel and stitch them into one audio
+    file with a chapter per turn. Returns the number of turns that failed.
+    """
+    turns = spoken_turns(conversation)
+    if not turns:
+        raise ValueError("Conversation has no turns to read aloud")
+    logging.info(f"Synthesizing {len(turns)} turns with {engine} on {workers} workers")
+
+    segments = [None] * len(turns)
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(engine, cache_dir)) as pool:
+        futures = {pool.submit(synthesize_turn, speaker, message): index
+                   for index, (speaker, message, _) in enumerate(turns)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                segments[index] = AudioSegment.from_file(io.BytesIO(future.result()))
+            except Exception as e:
+                failures += 1
+                logging.error(f"Turn {index + 1} ({turns[index][0]}) failed: {e}")
+            if done % 20 == 0 or done == len(turns):
+                logging.info(f"[{done}/{len(turns)}] turns synthesized")
+
+    podcast, chapters = stitch_turns(turns, segments, gap_ms)
+    audio_format = os.path.splitext(output)[1].lstrip(".").lower() or "mp3"
+    podcast.export(output, format="mp4" if audio_format == "m4a" else audio_format)
+    chapters_path = os.path.splitext(output)[0] + ".chapters.txt"
+    write_chapters(chapters_path, chapters)
+    embed_chapters(output, chapters_path)
+    logging.info(f"Wrote {len(podcast) / 1000:.0f}s of audio with {len(chapters)} chapters to {output}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a saved debate to a single audio file with chapters.")
+    parser.add_argument("conversation", help="Conversation JSON from save_conversation or batch_debates.py")
+    parser.add_argument("--output", help="Audio file to write (default: conversation name with .mp3)")
+    parser.add_argument("--engine", default="pyttsx3", choices=sorted(SYNTHESIZERS), help="TTS engine")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Turns to synthesize at the same time")
+    parser.add_argument("--cache-dir", default=TTS_CACHE_DIR, help="TTS cache directory ('' to disable)")
+    parser.add_argument("--gap-ms", type=int, default=TURN_GAP_MS, help="Silence between turns")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    output = args.output or os.path.splitext(args.conversation)[0] + ".mp3"
+    failures = export_debate(load_conversation(args.conversation), output, args.engine, args.workers,
+                             args.cache_dir, args.gap_ms)
+    if failures:
+        logging.error(f"{failures} turns could not be synthesized and were left out")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
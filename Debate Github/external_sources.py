@@ -6,6 +6,13 @@ from collections import Counter
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import cassette
 
 print("external_sources.py is being imported")
 
@@ -23,6 +30,37 @@ except:
 # In-memory cache to track fetched topics
 fetched_topics_cache = set()
 
+# Research bundles keyed by (topic, lang, sentences), kept in LRU order
+RESEARCH_CACHE_TTL = 60 * 60  # seconds
+RESEARCH_CACHE_FAILURE_TTL = 60  # seconds; a failed lookup is retried soon, not reused for an hour
+RESEARCH_CACHE_MAX_ENTRIES = 32
+research_cache = OrderedDict()
+research_cache_lock = threading.Lock()
+research_in_flight = {}
+
+# The wikipedia module keeps its language in a global and fetched_topics_cache is shared,
+# so lookups for different topics run one at a time
+wikipedia_lock = threading.Lock()
+
+# Background worker used to prefetch research before a debate needs it
+research_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="research-prefetch")
+
+# Wikipedia calls go through these so a cassette can record or replay them
+def wikipedia_search(query: str, results: int = 10) -> List[str]:
+    return cassette.call("wikipedia.search", {"query": query, "results": results},
+                         lambda: wikipedia.search(query, results=results))
+
+def wikipedia_page(title: str):
+    # Only the page title is used, so that is all a cassette keeps
+    return cassette.call("wikipedia.page", {"title": title},
+                         lambda: wikipedia.page(title, auto_suggest=False),
+                         encode=lambda page: {"title": page.title},
+                         decode=lambda data: SimpleNamespace(**data))
+
+def wikipedia_summary(title: str, sentences: int) -> str:
+    return cassette.call("wikipedia.summary", {"title": title, "sentences": sentences},
+                         lambda: wikipedia.summary(title, sentences=sentences))
+
 # Define stop words that are not useful for Wikipedia searches
 STOP_CHUNKS = {"what", "who", "why", "how", "which", "are", "do", "does", "did", "have", "has", "had", "your"}
 
@@ -71,7 +109,7 @@ def fetch_wikipedia_summary(term: str, sentences: int = 2, lang: str = 'en') ->
     """
     try:
         wikipedia.set_lang(lang)
-        search_results = wikipedia.search(term)
+        search_results = wikipedia_search(term)
         if not search_results:
             logging.warning(f"No Wikipedia results found for '{term}'")
             return {"summary": None, "confidence": "none"}
@@ -82,8 +120,8 @@ def fetch_wikipedia_summary(term: str, sentences: int = 2, lang: str = 'en') ->
             if result_lower in fetched_topics_cache:
                 continue
             try:
-                page = wikipedia.page(result, auto_suggest=False)
-                summary = wikipedia.summary(page.title, sentences=sentences)
+                page = wikipedia_page(result)
+                summary = wikipedia_summary(page.title, sentences)
                 logging.info(f"Successfully fetched summary for '{page.title}'")
                 fetched_topics_cache.add(page.title.lower())
                 return {"summary": summary, "confidence": "high"}
@@ -93,8 +131,8 @@ def fetch_wikipedia_summary(term: str, sentences: int = 2, lang: str = 'en') ->
                 best_option = score_disambiguation_option(term, e.options)
                 if best_option and best_option.lower() not in fetched_topics_cache:
                     try:
-                        page = wikipedia.page(best_option, auto_suggest=False)
-                        summary = wikipedia.summary(page.title, sentences=sentences)
+                        page = wikipedia_page(best_option)
+                        summary = wikipedia_summary(page.title, sentences)
                         logging.info(f"Successfully fetched summary for disambiguated topic '{page.title}'")
                         fetched_topics_cache.add(page.title.lower())
                         return {"summary": summary, "confidence": "medium"}
@@ -141,7 +179,7 @@ def get_related_topics(topic: str, results: int = 10) -> List[str]:
     Get a list of topics related to the given topic.
     """
     try:
-        related = wikipedia.search(topic, results=results)
+        related = wikipedia_search(topic, results=results)
         # Shuffle to introduce variety
         random.shuffle(related)
         # Exclude already fetched topics
@@ -256,6 +294,71 @@ def extract_key_points(text: str, n: int = 5) -> List[str]:
     sentences = [sent.text.strip() for sent in doc.sents]
     return sentences[:n]
 
+def get_research_bundle(topic: str, sentences: int = 2, lang: str = 'en') -> Dict[str, any]:
+    """
+    Return the research bundle for a topic, computing it at most once per TTL.
+    Bundles where nothing was found (which is also what a failed lookup looks like)
+    are only kept for RESEARCH_CACHE_FAILURE_TTL. The bundle is the result of fetch_robust_wikipedia_info and is shared by every
+    caller asking for the same (topic, lang, sentences) key. Concurrent callers for
+    a key that is still being computed wait for the first one instead of repeating
+    the lookups.
+    """
+    key = (topic, lang, sentences)
+    while True:
+        with research_cache_lock:
+            cached = research_cache.get(key)
+            if cached is not None:
+                expires_at, bundle = cached
+                if time.monotonic() < expires_at:
+                    research_cache.move_to_end(key)
+                    return bundle
+                del research_cache[key]
+            pending = research_in_flight.get(key)
+            if pending is None:
+                pending = research_in_flight[key] = threading.Event()
+                break
+        pending.wait()
+
+    try:
+        with wikipedia_lock:
+            bundle = fetch_robust_wikipedia_info(topic, sentences, lang)
+        found = bundle.get('confidence') != 'none'
+        ttl = RESEARCH_CACHE_TTL if found else RESEARCH_CACHE_FAILURE_TTL
+        with research_cache_lock:
+            research_cache[key] = (time.monotonic() + ttl, bundle)
+            research_cache.move_to_end(key)
+            while len(research_cache) > RESEARCH_CACHE_MAX_ENTRIES:
+                evicted, _ = research_cache.popitem(last=False)
+                logging.info(f"Evicted research bundle for '{evicted[0]}'")
+        return bundle
+    finally:
+        with research_cache_lock:
+            del research_in_flight[key]
+        pending.set()
+
+def clear_research_cache(topic: Optional[str] = None) -> None:
+    """
+    Drop cached research bundles, either for a single topic or all of them.
+    """
+    with research_cache_lock:
+        for key in list(research_cache):
+            if topic is None or key[0] == topic:
+                del research_cache[key]
+
+def prefetch_research(topic: str, sentences: int = 2, lang: str = 'en') -> Future:
+    """
+    Start computing the research bundle for a topic on a background worker.
+    A later get_research_bundle call for the same key picks up the result, or
+    waits for the in-flight computation instead of starting its own.
+    """
+    return research_executor.submit(get_research_bundle, topic, sentences, lang)
+
+def warm_research_cache(topics: List[str], sentences: int = 2, lang: str = 'en') -> List[Future]:
+    """
+    Queue research prefetches for every topic, in order.
+    """
+    return [prefetch_research(topic, sentences, lang) for topic in dict.fromkeys(topics)]
+
 if __name__ == "__main__":
     # Example usage
     topic = "What the craziest real experiments and what are your opinions?"  # Original debate topic
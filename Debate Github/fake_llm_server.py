@@ -0,0 +1,290 @@
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import threading
+import itertools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+# Words the stand-in replies are built from; random picks keep replies from
+# looking like repeats to the debate's repetition check
+FILLER_WORDS = (
+    "evidence suggests policy outcomes depend on incentives markets institutions people data history "
+    "research shows tradeoffs between growth fairness risk innovation regulation privacy education "
+    "labor automation creativity ethics community trust technology science climate health culture "
+    "however therefore meanwhile consider imagine although because despite unless whereas indeed"
+).split()
+
+GEMINI_CACHE_MIN_TOKENS = 32768  # gemini-1.5-pro's smallest context cache
+
+
+class LatencyModel:
+    """
+    Time a request waits before its first token, drawn from a fixed value,
+    a lognormal distribution or a heavy-tailed Pareto distribution, each
+    parameterized by its median in milliseconds.
+    """
+
+    def __init__(self, kind: str = "fixed", median_ms: float = 200.0, sigma: float = 0.5, alpha: float = 1.5,
+                 rng: random.Random = None):
+        if kind not in ("fixed", "lognormal", "pareto"):
+            raise ValueError(f"Unknown latency distribution '{kind}'")
+        self.kind = kind
+        self.median = median_ms / 1000.0
+        self.sigma = sigma
+        self.alpha = alpha
+        self.rng = rng or random.Random()
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self.lock:
+            if self.kind == "fixed":
+                return self.median
+            if self.kind == "lognormal":
+                return self.median * math.exp(self.sigma * self.rng.gauss(0, 1))
+            # Pareto scale chosen so the median matches; the tail is set by alpha
+            scale = self.median / (2 ** (1 / self.alpha))
+            return scale * self.rng.paretovariate(self.alpha)
+
+
+class FakeLLMConfig:
+    def __init__(self, latency: LatencyModel = None, error_rate: float = 0.0, error_status: int = 503,
+                 tokens_per_second: float = 50.0, reply_words: int = 60, chunk_words: int = 4, seed: int = None,
+                 cache_min_tokens: int = GEMINI_CACHE_MIN_TOKENS):
+        self.rng = random.Random(seed)
+        self.latency = latency or LatencyModel(rng=self.rng)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.tokens_per_second = tokens_per_second
+        self.reply_words = reply_words
+        self.chunk_words = chunk_words
+        self.cache_min_tokens = cache_min_tokens
+        self.caches = {}  # Gemini cachedContents name -> cached prompt text
+        self.counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+    def create_cache(self, text: str) -> str:
+        with self.lock:
+            name = f"cachedContents/fake-{len(self.caches) + 1}"
+            self.caches[name] = text
+        return name
+
+    def reply(self):
+        """
+        Return the reply as a list of word chunks, one per streamed event.
+        """
+        with self.lock:
+            number = next(self.counter)
+            words = [self.rng.choice(FILLER_WORDS) for _ in range(self.reply_words)]
+        words[0] = f"Reply {number}:"
+        words[-1] += "."
+        return [" ".join(words[i:i + self.chunk_words]) + " " for i in range(0, len(words), self.chunk_words)]
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def gemini_prompt(payload) -> str:
+    instruction = payload.get("systemInstruction", {}).get("parts", [])
+    contents = [part for content in payload.get("contents", []) for part in content.get("parts", [])]
+    return "\n".join(part.get("text", "") for part in instruction + contents)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """
+    Serves the parts of the OpenAI chat-completions and Gemini
+    generateContent/streamGenerateContent/cachedContents APIs that
+    providers.py uses.
+    """
+
+    protocol_version = "HTTP/1.1"
+    config = None  # set by make_server
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self.send_json(400, {"error": {"message": "Invalid JSON body"}})
+
+        time.sleep(self.config.latency.sample())
+        if self.config.should_fail():
+            return self.send_json(self.config.error_status, {"error": {"message": "Injected failure",
+                                                                       "code": self.config.error_status}})
+
+        if path == "/v1/chat/completions":
+            prompt = "\n".join(str(message.get("content", "")) for message in payload.get("messages", []))
+            chunks = self.config.reply()
+            if payload.get("stream"):
+                return self.stream_openai(payload, chunks)
+            return self.send_json(200, self.openai_body(payload, prompt, "".join(chunks)))
+        if path == "/v1beta/cachedContents":
+            prompt = gemini_prompt(payload)
+            if estimate_tokens(prompt) < self.config.cache_min_tokens:
+                return self.send_json(400, {"error": {"message": "Cached content is too small", "code": 400}})
+            return self.send_json(200, {"name": self.config.create_cache(prompt), "model": payload.get("model")})
+        if path.startswith("/v1beta/models/") and ":" in path:
+            method = path.rsplit(":", 1)[1]
+            prompt = gemini_prompt(payload)
+            cached_tokens = 0
+            if payload.get("cachedContent"):
+                cached = self.config.caches.get(payload["cachedContent"])
+                if cached is None:
+                    return self.send_json(404, {"error": {"message": "Cached content not found", "code": 404}})
+                prompt = cached + "\n" + prompt
+                cached_tokens = estimate_tokens(cached)
+            chunks = self.config.reply()
+            if method == "streamGenerateContent":
+                return self.stream_gemini(prompt, chunks, cached_tokens)
+            if method == "generateContent":
+                return self.send_json(200, self.gemini_body(prompt, "".join(chunks), cached_tokens=cached_tokens))
+        self.send_json(404, {"error": {"message": f"Unknown endpoint {path}"}})
+
+    def generation_delay(self, text: str) -> float:
+        return estimate_tokens(text) / self.config.tokens_per_second if self.config.tokens_per_second else 0.0
+
+    def openai_body(self, payload, prompt, text):
+        time.sleep(self.generation_delay(text))
+        return {
+            "id": f"chatcmpl-fake-{time.monotonic_ns()}",
+            "object": "chat.completion",
+            "model": payload.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text),
+                      "total_tokens": estimate_tokens(prompt) + estimate_tokens(text)}
+        }
+
+    def gemini_body(self, prompt, text, final=True, cached_tokens=0, output_tokens=None):
+        body = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}]}
+        if final:
+            time.sleep(self.generation_delay(text))
+            body["candidates"][0]["finishReason"] = "STOP"
+        # Like Gemini, streamed chunks carry the usage so far
+        body["usageMetadata"] = {"promptTokenCount": estimate_tokens(prompt),
+                                 "candidatesTokenCount": output_tokens or estimate_tokens(text)}
+        if cached_tokens:
+            body["usageMetadata"]["cachedContentTokenCount"] = cached_tokens
+        return body
+
+    def stream_openai(self, payload, chunks):
+        self.start_sse()
+        for chunk in chunks:
+            time.sleep(self.generation_delay(chunk))
+            event = {"object": "chat.completion.chunk", "model": payload.get("model", "fake"),
+                     "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+            if not self.send_event(json.dumps(event)):
+                return
+        self.send_event("[DONE]")
+        self.end_sse()
+
+    def stream_gemini(self, prompt, chunks, cached_tokens=0):
+        self.start_sse()
+        sent = ""
+        for chunk in chunks:
+            time.sleep(self.generation_delay(chunk))
+            sent += chunk
+            body = self.gemini_body(prompt, chunk, final=False, cached_tokens=cached_tokens,
+                                    output_tokens=estimate_tokens(sent))
+            if not self.send_event(json.dumps(body)):
+                return
+        self.end_sse()
+
+    def start_sse(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def send_event(self, data: str) -> bool:
+        try:
+            self.write_chunk(f"data: {data}\n\n".encode())
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False  # client cancelled the stream
+
+    def end_sse(self):
+        try:
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+
+def make_server(config: FakeLLMConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    handler = type("ConfiguredFakeLLMHandler", (FakeLLMHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server(config: FakeLLMConfig = None, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Start a fake provider server on a background thread (port 0 picks a free
+    port; see server.server_port) and return it. Call shutdown() to stop it.
+    """
+    server = make_server(config or FakeLLMConfig(), host, port)
+    threading.Thread(target=server.serve_forever, name="fake-llm-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Gemini/OpenAI server for offline load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=["fixed", "lognormal", "pareto"], default="lognormal",
+                        help="Distribution of the wait before the first token")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median latency in milliseconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Spread of the lognormal distribution")
+    parser.add_argument("--alpha", type=float, default=1.5, help="Pareto tail index (smaller is heavier)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Generation speed (0 for instant)")
+    parser.add_argument("--reply-words", type=int, default=60, help="Words per reply")
+    parser.add_argument("--seed", type=int, help="Seed for latencies, failures and reply text")
+    parser.add_argument("--cache-min-tokens", type=int, default=GEMINI_CACHE_MIN_TOKENS,
+                        help="Reject Gemini context caches smaller than this, like the real minimum (0 for none)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    rng = random.Random(args.seed)
+    config = FakeLLMConfig(LatencyModel(args.latency, args.latency_ms, args.sigma, args.alpha, rng),
+                           args.error_rate, args.error_status, args.tokens_per_second, args.reply_words, seed=args.seed,
+                           cache_min_tokens=args.cache_min_tokens)
+    server = make_server(config, args.host, args.port)
+    base_url = f"http://{args.host}:{server.server_port}"
+    logging.info(f"Fake LLM server listening on {base_url}")
+    logging.info(f"Point the debate at it with GEMINI_BASE_URL={base_url} OPENAI_BASE_URL={base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import json
+import codecs
+import struct
+from typing import Dict, List
+
+try:
+    import msgpack
+except ImportError:  # binary payloads are optional; JSON always works
+    msgpack = None
+
+# Each frame is a 4-byte big-endian payload length, a 1-byte payload format and the payload
+HEADER = struct.Struct(">IB")
+FORMATS = {"json": 0, "msgpack": 1}
+FORMAT_NAMES = {code: name for name, code in FORMATS.items()}
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+class FramingError(ValueError):
+    pass
+
+
+def available_formats() -> List[str]:
+    return ["json", "msgpack"] if msgpack is not None else ["json"]
+
+
+def encode_frame(message: Dict, fmt: str = "json") -> bytes:
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise FramingError("msgpack is not installed")
+        payload = msgpack.packb(message, use_bin_type=True)
+    else:
+        payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return HEADER.pack(len(payload), FORMATS[fmt]) + payload
+
+
+def decode_payload(payload: bytes, code: int) -> Dict:
+    fmt = FORMAT_NAMES.get(code)
+    if fmt == "json":
+        return json.loads(payload.decode("utf-8"))
+    if fmt == "msgpack" and msgpack is not None:
+        return msgpack.unpackb(payload, raw=False)
+    raise FramingError(f"Can't decode payload format {code}")
+
+
+class FrameDecoder:
+    """
+    Turns the bytes of a framed stream, however recv() splits them, back into
+    messages. feed() keeps any incomplete frame for the next call.
+    """
+
+    def __init__(self, max_frame_bytes: int = MAX_FRAME_BYTES):
+        self.max_frame_bytes = max_frame_bytes
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Dict]:
+        self.buffer += data
+        messages = []
+        offset = 0
+        while len(self.buffer) - offset >= HEADER.size:
+            length, code = HEADER.unpack_from(self.buffer, offset)
+            if length > self.max_frame_bytes:
+                raise FramingError(f"Frame of {length} bytes is over the {self.max_frame_bytes} byte limit")
+            end = offset + HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            messages.append(decode_payload(bytes(self.buffer[offset + HEADER.size:end]), code))
+            offset = end
+        del self.buffer[:offset]  # once per feed, not per frame
+        return messages
+
+
+def decoder_for(data: bytes):
+    """
+    Pick the decoder for a stream from its first bytes. A frame starts with the
+    top byte of its length, which is 0 for any frame under MAX_FRAME_BYTES; a
+    JSON line starts with "{".
+    """
+    return LineDecoder() if data.lstrip()[:1] == b"{" else FrameDecoder()
+
+
+class LineDecoder:
+    """
+    The same for newline-delimited JSON, as older debate apps send it. UTF-8
+    is decoded incrementally, so a character split across reads survives.
+    """
+
+    def __init__(self, max_line_chars: int = MAX_FRAME_BYTES):
+        self.max_line_chars = max_line_chars
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.partial = ""
+
+    def feed(self, data: bytes) -> List[Dict]:
+        text = self.partial + self.decoder.decode(data)
+        *lines, self.partial = text.split("\n")
+        if len(self.partial) > self.max_line_chars:
+            raise FramingError(f"Line of over {self.max_line_chars} characters")
+        return [json.loads(line) for line in lines if line.strip()]
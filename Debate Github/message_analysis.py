@@ -0,0 +1,42 @@
+from typing import Dict, List, Tuple
+
+from textblob import TextBlob
+
+from external_sources import nlp
+
+
+def emotion_label(polarity: float) -> str:
+    """
+    Map a TextBlob polarity (-1 very negative to 1 very positive) to the emotion label shown in the chat.
+    """
+    if polarity > 0.75:
+        return "very positive"
+    elif polarity > 0.25:
+        return "positive"
+    elif polarity < -0.75:
+        return "very negative"
+    elif polarity < -0.25:
+        return "negative"
+    else:
+        return "neutral"
+
+
+def extract_entities(text: str) -> List[Tuple[str, str]]:
+    """
+    Named entities in the text as (text, label) pairs.
+    """
+    return [(ent.text, ent.label_) for ent in nlp(text).ents]
+
+
+def analyze_message(text: str) -> Dict:
+    """
+    Score a message once. The result is stored on the conversation entry and
+    sent to the visualizer, so nothing downstream needs to run TextBlob or
+    spaCy on the same text again.
+    """
+    polarity = TextBlob(text).sentiment.polarity
+    return {
+        "sentiment": polarity,
+        "emotion": emotion_label(polarity),
+        "entities": extract_entities(text)
+    }
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import logging
+import threading
+from logging.handlers import RotatingFileHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional
+
+import providers
+from conversation_context import estimate_tokens
+
+# Per-turn metrics go to a rotating JSON-lines file. Set DEBATE_METRICS_FILE to
+# change its path ("" turns the file off) and DEBATE_METRICS_PORT to serve
+# running totals in the Prometheus text format on localhost.
+METRICS_FILE_ENV = "DEBATE_METRICS_FILE"
+METRICS_PORT_ENV = "DEBATE_METRICS_PORT"
+METRICS_FILE = "debate_metrics.jsonl"
+METRICS_MAX_BYTES = 10 * 1024 * 1024
+METRICS_BACKUP_COUNT = 5
+
+# USD per million tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gemini-1.5-pro": (1.25, 0.3125, 5.00),
+    "gemini-1.5-flash": (0.075, 0.01875, 0.30),
+    "gemini-2.5-flash": (0.30, 0.075, 2.50),
+    "o1-mini": (1.10, 0.55, 4.40),
+}
+
+SECTIONS = ("persona", "context", "external_info", "scrape_summary", "instructions")
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, output_tokens: int) -> Optional[float]:
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    return ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+            + output_tokens * output_price) / 1_000_000
+
+
+class TurnMetrics:
+    """
+    Measurements for one get_ai_response call. The provider calls made while
+    it is tracked (providers.track_calls(turn.stats)) fill in latency, retries
+    and the token usage the provider reported.
+    """
+
+    def __init__(self, speaker: str, mode: str, model: str = providers.GEMINI_MODEL):
+        self.speaker = speaker
+        self.mode = mode
+        self.model = model
+        self.stats = providers.CallStats()
+        self.started = time.monotonic()
+        self.first_chunk = None
+        self.prompt_chars = 0
+        self.sections = {}
+
+    def set_prompt(self, total_chars: int, **sections):
+        """
+        Record what the prompt was made of. Whatever isn't in a named section
+        counts as instructions.
+        """
+        self.prompt_chars = total_chars
+        self.sections = {name: sections.get(name, 0) for name in SECTIONS}
+        self.sections["instructions"] = max(0, total_chars - sum(sections.values()))
+
+    def mark_first_chunk(self):
+        if self.first_chunk is None:
+            self.first_chunk = time.monotonic() - self.started
+
+    def finish(self, output: str, error: bool = False) -> Dict:
+        stats = self.stats
+        # Fall back to the usual four characters per token when the provider reported no usage
+        prompt_tokens = stats.prompt_tokens if stats.usage_reported else self.prompt_chars // 4
+        output_tokens = stats.output_tokens if stats.usage_reported else estimate_tokens(output or "")
+        cost = estimate_cost(self.model, prompt_tokens, stats.cached_tokens, output_tokens)
+        return {
+            "time": time.time(),
+            "speaker": self.speaker,
+            "mode": self.mode,
+            "model": self.model,
+            "sections": {name: {"chars": chars, "tokens": chars // 4} for name, chars in self.sections.items()},
+            "prompt_chars": self.prompt_chars,
+            "request_bytes": stats.request_bytes,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": stats.cached_tokens,
+            "output_tokens": output_tokens,
+            "usage_reported": stats.usage_reported,
+            "calls": stats.calls,
+            "retries": stats.retries,
+            "provider_latency": round(stats.latency, 4),
+            "rate_limit_wait": round(stats.rate_limit_wait, 4),
+            "first_chunk_latency": round(self.first_chunk, 4) if self.first_chunk is not None else None,
+            "turn_seconds": round(time.monotonic() - self.started, 4),
+            "cost_usd": round(cost, 6) if cost is not None else None,
+            "error": error
+        }
+
+
+class MetricsRecorder:
+    """
+    Writes each turn's metrics to a rotating JSON-lines file and keeps
+    running totals for the stats panel and the Prometheus endpoint.
+    """
+
+    def __init__(self, path: Optional[str] = METRICS_FILE, max_bytes: int = METRICS_MAX_BYTES,
+                 backup_count: int = METRICS_BACKUP_COUNT):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.totals = {}  # speaker -> running totals
+        self.section_chars = {name: 0 for name in SECTIONS}
+        self.logger = None
+        if path:
+            self.logger = logging.getLogger(f"debate_metrics.{path}")
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+            if not self.logger.handlers:
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.logger.addHandler(handler)
+
+    def record(self, turn: Dict):
+        with self.lock:
+            totals = self.totals.setdefault(turn["speaker"], {
+                "turns": 0, "errors": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+                "request_bytes": 0, "retries": 0, "provider_latency": 0.0, "cost_usd": 0.0
+            })
+            totals["turns"] += 1
+            totals["errors"] += 1 if turn["error"] else 0
+            for key in ("prompt_tokens", "cached_tokens", "output_tokens", "request_bytes", "retries",
+                        "provider_latency"):
+                totals[key] += turn[key]
+            totals["cost_usd"] += turn["cost_usd"] or 0.0
+            for name, section in turn["sections"].items():
+                self.section_chars[name] += section["chars"]
+        if self.logger is not None:
+            self.logger.info(json.dumps(turn, ensure_ascii=False))
+
+    def snapshot(self) -> Dict:
+        """
+        Totals over every debater, plus throughput since the recorder started.
+        """
+        with self.lock:
+            summary = {"turns": 0, "errors": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+                       "request_bytes": 0, "retries": 0, "provider_latency": 0.0, "cost_usd": 0.0}
+            for totals in self.totals.values():
+                for key in summary:
+                    summary[key] += totals[key]
+        minutes = max(time.time() - self.started, 1.0) / 60
+        summary["avg_latency"] = summary["provider_latency"] / summary["turns"] if summary["turns"] else 0.0
+        summary["turns_per_minute"] = summary["turns"] / minutes
+        summary["tokens_per_minute"] = (summary["prompt_tokens"] + summary["output_tokens"]) / minutes
+        return summary
+
+    def prometheus_text(self) -> str:
+        counters = [
+            ("debate_turns_total", "Debate turns generated", "turns"),
+            ("debate_turn_errors_total", "Debate turns that ended in an error", "errors"),
+            ("debate_prompt_tokens_total", "Prompt tokens sent", "prompt_tokens"),
+            ("debate_cached_tokens_total", "Prompt tokens served from a context cache", "cached_tokens"),
+            ("debate_output_tokens_total", "Output tokens generated", "output_tokens"),
+            ("debate_request_bytes_total", "Bytes of request payload sent", "request_bytes"),
+            ("debate_retries_total", "Provider call retries", "retries"),
+            ("debate_provider_latency_seconds_total", "Time spent waiting on providers", "provider_latency"),
+            ("debate_cost_usd_total", "Estimated spend in US dollars", "cost_usd"),
+        ]
+        lines = []
+        with self.lock:
+            for metric, description, key in counters:
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} counter")
+                for speaker, totals in sorted(self.totals.items()):
+                    lines.append(f'{metric}{{speaker="{speaker}"}} {totals[key]}')
+            lines.append("# HELP debate_prompt_chars_total Prompt characters sent, by prompt section")
+            lines.append("# TYPE debate_prompt_chars_total counter")
+            for name, chars in self.section_chars.items():
+                lines.append(f'debate_prompt_chars_total{{section="{name}"}} {chars}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    recorder = None  # set by start_metrics_server
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = self.recorder.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+
+def start_metrics_server(recorder: MetricsRecorder, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve the recorder's totals at http://host:port/metrics on a background thread.
+    """
+    handler = type("ConfiguredMetricsHandler", (MetricsHandler,), {"recorder": recorder})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logging.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> MetricsRecorder:
+    """
+    Return the process-wide recorder, creating it (and the metrics endpoint,
+    if DEBATE_METRICS_PORT is set) on first use.
+    """
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = MetricsRecorder(os.environ.get(METRICS_FILE_ENV, METRICS_FILE))
+            port = os.environ.get(METRICS_PORT_ENV)
+            if port:
+                try:
+                    start_metrics_server(_recorder, int(port))
+                except (OSError, ValueError) as e:
+                    logging.error(f"Error starting metrics endpoint on port {port}: {e}")
+        return _recorder
@@ -8,25 +8,18 @@ import os
 import uuid
 import logging
 
-import google.generativeai as genai
-import openai
 from textblob import TextBlob
 from gtts import gTTS
 from playsound import playsound
-import google.generativeai as genai
-import openai
+
+import providers
 
 from external_sources import fetch_wikipedia_summary
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
 
-# Configure API keys
-openai.api_key = 'your-openai-api-key'
-genai.configure(api_key='your-google-api-key')
-
-# Initialize the Gemini model
-gemini_model = genai.GenerativeModel('gemini-1.5-pro')
+# API keys and endpoints for Gemini and OpenAI are configured in providers.py
 
 class PreDebateChat:
     def __init__(self, master):
@@ -239,19 +232,14 @@ class PreDebateChat:
 
     def get_gemini_response(self, prompt):
         try:
-            response = gemini_model.generate_content(prompt)
-            return response.text.strip()
+            return providers.generate_gemini(prompt).strip()
         except Exception as e:
             logging.error(f"Error getting response from Gemini API: {e}")
             return f"Gemini Error: {str(e)}"
 
     def get_openai_response(self, messages, model="o1-mini"):
         try:
-            response = openai.chat.completions.create(
-                model=model,
-                messages=messages,
-            )
-            return response.choices[0].message.content
+            return providers.chat_openai(messages, model=model)
         except Exception as e:
             logging.error(f"Error getting response from OpenAI API: {e}")
             return f"o1-mini Error: {str(e)}"
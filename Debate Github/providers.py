@@ -0,0 +1,623 @@
+import os
+import json
+import queue
+import asyncio
+import random
+import logging
+import threading
+import contextlib
+import contextvars
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+import cassette
+from rate_limiter import RateLimiter, get_rate_limiter, estimate_request_tokens
+
+# ===========================
+# Configuration and Constants
+# ===========================
+# API keys (set the environment variables or replace the placeholders)
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "your-google-api-key")
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "your-openai-api-key")
+
+# Base URLs can be pointed at a local stand-in server for testing
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com")
+
+GEMINI_MODEL = "gemini-1.5-pro"
+# Debater sessions (debate_sessions.py) need a model whose cache minimum a debate actually reaches
+GEMINI_SESSION_MODEL = "gemini-2.5-flash"
+OPENAI_MODEL = "o1-mini"
+
+DEFAULT_DEADLINE = 90.0  # seconds for a whole call, retries included
+CONNECT_TIMEOUT = 10.0
+MAX_CONNECTIONS = 20
+MAX_CONCURRENT_CALLS = 20  # in-flight requests across every thread using the shared client
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_MAX = 8.0
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+GEMINI_CACHE_TTL = 900.0  # seconds a Gemini context cache lives unless it is replaced sooner
+# Smallest prefix (in tokens) each model will put in a context cache; smaller ones get an HTTP 400
+GEMINI_CACHE_MIN_TOKENS = {
+    "gemini-1.5-pro": 32768,
+    "gemini-1.5-flash": 32768,
+    "gemini-2.5-pro": 4096,
+    "gemini-2.5-flash": 1024
+}
+DEFAULT_GEMINI_CACHE_MIN_TOKENS = 32768
+
+
+class ProviderError(Exception):
+    """
+    Raised when a provider call fails for good (non-retryable error, retries
+    exhausted, or the call deadline passed).
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CallStats:
+    """
+    Totals over the provider calls made while tracking is on (see track_calls).
+    Token counts are what the provider reported; calls it made without
+    reporting usage only add to calls, latency and request_bytes.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.latency = 0.0
+        self.request_bytes = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.usage_reported = False
+        self.rate_limit_wait = 0.0
+
+    def add_usage(self, data: Dict):
+        usage = data.get("usageMetadata")
+        if usage:  # Gemini
+            self.prompt_tokens += usage.get("promptTokenCount", 0)
+            self.cached_tokens += usage.get("cachedContentTokenCount", 0)
+            self.output_tokens += usage.get("candidatesTokenCount", 0)
+            self.usage_reported = True
+            return
+        usage = data.get("usage")
+        if usage:  # OpenAI
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.cached_tokens += (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+            self.output_tokens += usage.get("completion_tokens", 0)
+            self.usage_reported = True
+
+
+def reported_tokens(data: Dict) -> Optional[int]:
+    """
+    Total tokens (prompt and output) a response says it used, if it says.
+    """
+    usage = data.get("usageMetadata")
+    if usage and "promptTokenCount" in usage:
+        return usage["promptTokenCount"] + usage.get("candidatesTokenCount", 0)
+    usage = data.get("usage")
+    if usage and "prompt_tokens" in usage:
+        return usage["prompt_tokens"] + usage.get("completion_tokens", 0)
+    return None
+
+
+# The CallStats collecting for the current thread's calls; the client loop
+# sees it because run_coroutine_threadsafe carries the caller's context over
+call_stats = contextvars.ContextVar("provider_call_stats", default=None)
+
+
+@contextlib.contextmanager
+def track_calls(stats: Optional[CallStats] = None):
+    """
+    Add the provider calls made in this block (on this thread) to stats.
+    """
+    stats = stats or CallStats()
+    token = call_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        call_stats.reset(token)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff for the given retry attempt (0-based).
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def gemini_text(data: Dict) -> str:
+    """
+    Extract the generated text from a Gemini generateContent response body.
+    """
+    candidates = data.get("candidates") or []
+    if not candidates:
+        reason = data.get("promptFeedback", {}).get("blockReason", "no candidates returned")
+        raise ProviderError(f"Gemini returned no text: {reason}")
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+
+def gemini_content(role: str, text: str) -> Dict:
+    """
+    One turn of a Gemini contents list; role is "user" or "model".
+    """
+    return {"role": role, "parts": [{"text": text}]}
+
+
+def gemini_payload(contents: List[Dict], system_instruction: Optional[str] = None,
+                   cached_content: Optional[str] = None) -> Dict:
+    payload = {"contents": contents}
+    if cached_content:
+        payload["cachedContent"] = cached_content
+    elif system_instruction:
+        payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+    return payload
+
+
+def openai_text(data: Dict) -> str:
+    """
+    Extract the generated text from an OpenAI chat completion response body.
+    """
+    choices = data.get("choices") or []
+    if not choices:
+        raise ProviderError("OpenAI returned no choices")
+    return choices[0].get("message", {}).get("content") or ""
+
+
+class ProviderClient:
+    """
+    Async client for the Gemini and OpenAI HTTP APIs.
+
+    The client runs its own event loop on a daemon thread and keeps a pooled
+    httpx.AsyncClient on it, so the Tk apps and worker threads can share one
+    set of keep-alive connections. Coroutines can be awaited on that loop, or
+    scheduled from any thread with submit(), which returns a future whose
+    cancel() cancels the in-flight request.
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, deadline: float = DEFAULT_DEADLINE,
+                 max_retries: int = MAX_RETRIES, max_concurrent_calls: int = MAX_CONCURRENT_CALLS,
+                 limiter: Optional[RateLimiter] = None):
+        self.deadline = deadline
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.max_concurrent_calls = max_concurrent_calls
+        self.call_slots = None
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.loop = asyncio.new_event_loop()
+        self.http = None
+        self.thread = threading.Thread(target=self.run_loop, name="provider-loop", daemon=True)
+        self.thread.start()
+
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def get_http(self) -> httpx.AsyncClient:
+        # Created lazily so it is bound to the client's own loop
+        if self.http is None:
+            timeout = httpx.Timeout(self.deadline, connect=CONNECT_TIMEOUT)
+            self.http = httpx.AsyncClient(limits=self.limits, timeout=timeout)
+        return self.http
+
+    def get_call_slots(self) -> asyncio.Semaphore:
+        # Caps in-flight requests no matter how many threads are submitting calls
+        if self.call_slots is None:
+            self.call_slots = asyncio.Semaphore(self.max_concurrent_calls)
+        return self.call_slots
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the client loop and return a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro):
+        """
+        Run a coroutine on the client loop and block until it finishes.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def post_json(self, url: str, payload: Dict, headers: Dict[str, str],
+                        deadline: Optional[float] = None, rate_key: Optional[str] = None) -> Dict:
+        """
+        POST a JSON payload and return the decoded response, going through the
+        record/replay cassette when one is active.
+        """
+        stats = call_stats.get()
+        started = asyncio.get_running_loop().time()
+        tape = cassette.get_cassette()
+        try:
+            if tape is None:
+                data = await self.send_json(url, payload, headers, deadline, rate_key)
+            else:
+                # Keyed on the endpoint path, so recordings replay against any base URL (headers hold keys; not recorded)
+                data = await tape.call_async(urlsplit(url).path, {"url": urlsplit(url).path, "payload": payload},
+                                             lambda: self.send_json(url, payload, headers, deadline, rate_key))
+        finally:
+            if stats is not None:
+                stats.calls += 1
+                stats.latency += asyncio.get_running_loop().time() - started
+                stats.request_bytes += len(json.dumps(payload))
+        if stats is not None:
+            stats.add_usage(data)
+        return data
+
+    async def send_json(self, url: str, payload: Dict, headers: Dict[str, str],
+                        deadline: Optional[float] = None, rate_key: Optional[str] = None) -> Dict:
+        """
+        POST a JSON payload, retrying retryable failures with jittered exponential
+        backoff until the call deadline passes. Each attempt waits its turn in
+        rate_key's rate limit first.
+        """
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + (deadline or self.deadline)
+        tokens = estimate_request_tokens(payload)
+        attempt = 0
+        while True:
+            await self.wait_for_rate_limit(rate_key, tokens, expires_at)
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                raise ProviderError(f"Deadline exceeded calling {url}")
+            try:
+                async with self.get_call_slots():
+                    response = await asyncio.wait_for(self.get_http().post(url, json=payload, headers=headers),
+                                                      remaining)
+                if response.status_code < 400:
+                    data = response.json()
+                    await self.settle_rate_limit(rate_key, tokens, data)
+                    return data
+                error = ProviderError(f"HTTP {response.status_code} from {url}: {response.text[:200]}",
+                                      status=response.status_code)
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise error
+            except (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError) as e:
+                error = ProviderError(f"{type(e).__name__} calling {url}: {e}")
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = min(backoff_delay(attempt), max(0.0, expires_at - loop.time()))
+            logging.warning(f"{error}; retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+            if call_stats.get() is not None:
+                call_stats.get().retries += 1
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def stream_sse(self, url: str, payload: Dict, headers: Dict[str, str], deadline: Optional[float] = None,
+                         rate_key: Optional[str] = None):
+        """
+        POST a JSON payload and yield the decoded JSON of each server-sent
+        event, going through the record/replay cassette when one is active.
+        """
+        stats = call_stats.get()
+        started = asyncio.get_running_loop().time()
+        tape = cassette.get_cassette()
+        if tape is None:
+            events = self.read_sse(url, payload, headers, deadline, rate_key)
+        else:
+            events = tape.stream_async(urlsplit(url).path, {"url": urlsplit(url).path, "payload": payload},
+                                       lambda: self.read_sse(url, payload, headers, deadline, rate_key))
+        usage = None
+        try:
+            async for event in events:
+                # Gemini repeats the running usage on every chunk; OpenAI sends it once at the end
+                if event.get("usageMetadata") or event.get("usage"):
+                    usage = event
+                yield event
+        finally:
+            if stats is not None:
+                stats.calls += 1
+                stats.latency += asyncio.get_running_loop().time() - started
+                stats.request_bytes += len(json.dumps(payload))
+                if usage is not None:
+                    stats.add_usage(usage)
+
+    async def read_sse(self, url: str, payload: Dict, headers: Dict[str, str], deadline: Optional[float] = None,
+                       rate_key: Optional[str] = None):
+        """
+        POST a JSON payload and yield the decoded JSON of each server-sent event.
+        Failures are retried like send_json until the first event arrives; after
+        that a dropped stream is an error, since the partial text was already used.
+        """
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + (deadline or self.deadline)
+        tokens = estimate_request_tokens(payload)
+        attempt = 0
+        while True:
+            await self.wait_for_rate_limit(rate_key, tokens, expires_at)
+            if expires_at - loop.time() <= 0:
+                raise ProviderError(f"Deadline exceeded calling {url}")
+            started = False
+            try:
+                async with self.get_call_slots():
+                    async with self.get_http().stream("POST", url, json=payload, headers=headers) as response:
+                        if response.status_code < 400:
+                            usage = None
+                            async for line in response.aiter_lines():
+                                if loop.time() > expires_at:
+                                    raise ProviderError(f"Deadline exceeded streaming from {url}")
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[len("data:"):].strip()
+                                if data == "[DONE]":
+                                    break
+                                try:
+                                    event = json.loads(data)
+                                except ValueError:
+                                    logging.warning(f"Skipping malformed event from {url}: {data[:200]}")
+                                    continue
+                                started = True
+                                if event.get("usageMetadata") or event.get("usage"):
+                                    usage = event
+                                yield event
+                            if usage is not None:
+                                await self.settle_rate_limit(rate_key, tokens, usage)
+                            return
+                        body = (await response.aread()).decode(errors="replace")
+                        error = ProviderError(f"HTTP {response.status_code} from {url}: {body[:200]}",
+                                              status=response.status_code)
+                        if response.status_code not in RETRYABLE_STATUS:
+                            raise error
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = ProviderError(f"{type(e).__name__} streaming from {url}: {e}")
+                if started:
+                    raise error
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = min(backoff_delay(attempt), max(0.0, expires_at - loop.time()))
+            logging.warning(f"{error}; retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+            if call_stats.get() is not None:
+                call_stats.get().retries += 1
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def wait_for_rate_limit(self, rate_key: Optional[str], tokens: int, expires_at: float):
+        """
+        Book a request against rate_key's budgets and sleep until it may be
+        sent. Requests queue in the order they were booked, across processes.
+        """
+        if rate_key is None or self.limiter is None:
+            return
+        loop = asyncio.get_running_loop()
+        # The state file is shared with other processes; don't hold up the loop on its lock
+        wait = await loop.run_in_executor(None, self.limiter.reserve, rate_key, tokens)
+        if wait <= 0:
+            return
+        if loop.time() + wait > expires_at:
+            await loop.run_in_executor(None, self.limiter.refund, rate_key, tokens)
+            raise ProviderError(f"Rate limit queue for {rate_key} is longer than the call deadline", status=429)
+        stats = call_stats.get()
+        if stats is not None:
+            stats.rate_limit_wait += wait
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # Not awaited, so the refund happens even though this task is being cancelled
+            loop.run_in_executor(None, self.limiter.refund, rate_key, tokens)
+            raise
+
+    async def settle_rate_limit(self, rate_key: Optional[str], tokens: int, data: Dict):
+        # Replace the token estimate booked for a request with what the provider reported
+        actual = reported_tokens(data)
+        if rate_key is None or self.limiter is None or actual is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.limiter.adjust, rate_key, actual - tokens)
+
+    def iter_stream(self, agen):
+        """
+        Consume an async generator on the client loop and yield its items to the
+        calling thread. Closing the returned generator cancels the stream.
+        """
+        items = queue.Queue()
+        finished = object()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put(item)
+            except Exception as e:
+                items.put(e)
+            finally:
+                items.put(finished)
+
+        future = self.submit(pump())
+        try:
+            while True:
+                item = items.get()
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    async def gemini_generate(self, prompt: str, model: str = GEMINI_MODEL, deadline: Optional[float] = None) -> str:
+        return await self.gemini_generate_contents([gemini_content("user", prompt)], model=model, deadline=deadline)
+
+    async def gemini_generate_contents(self, contents: List[Dict], system_instruction: Optional[str] = None,
+                                       cached_content: Optional[str] = None, model: str = GEMINI_MODEL,
+                                       deadline: Optional[float] = None) -> str:
+        """
+        generateContent over a multi-turn contents list, optionally on top of a
+        cached prefix created with gemini_create_cache.
+        """
+        url = f"{GEMINI_BASE_URL}/v1beta/models/{model}:generateContent"
+        payload = gemini_payload(contents, system_instruction, cached_content)
+        headers = {"x-goog-api-key": GEMINI_API_KEY}
+        return gemini_text(await self.post_json(url, payload, headers, deadline, rate_key=f"gemini:{model}"))
+
+    async def gemini_create_cache(self, contents: List[Dict], system_instruction: Optional[str] = None,
+                                  ttl: float = GEMINI_CACHE_TTL, model: str = GEMINI_MODEL,
+                                  deadline: Optional[float] = None) -> str:
+        """
+        Store a prompt prefix with Gemini's context caching and return the cache
+        name to pass as cached_content. Gemini rejects prefixes below the model's
+        minimum cache size with an HTTP 400.
+        """
+        url = f"{GEMINI_BASE_URL}/v1beta/cachedContents"
+        payload = {"model": f"models/{model}", "contents": contents, "ttl": f"{int(ttl)}s"}
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+        headers = {"x-goog-api-key": GEMINI_API_KEY}
+        data = await self.post_json(url, payload, headers, deadline, rate_key=f"gemini:{model}")
+        if not data.get("name"):
+            raise ProviderError("Gemini returned no cache name")
+        return data["name"]
+
+    async def openai_chat(self, messages: List[Dict[str, str]], model: str = OPENAI_MODEL,
+                          deadline: Optional[float] = None) -> str:
+        url = f"{OPENAI_BASE_URL}/v1/chat/completions"
+        payload = {"model": model, "messages": messages}
+        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
+        return openai_text(await self.post_json(url, payload, headers, deadline, rate_key=f"openai:{model}"))
+
+    async def gemini_stream(self, prompt: str, model: str = GEMINI_MODEL, deadline: Optional[float] = None):
+        async for text in self.gemini_stream_contents([gemini_content("user", prompt)], model=model,
+                                                      deadline=deadline):
+            yield text
+
+    async def gemini_stream_contents(self, contents: List[Dict], system_instruction: Optional[str] = None,
+                                     cached_content: Optional[str] = None, model: str = GEMINI_MODEL,
+                                     deadline: Optional[float] = None):
+        url = f"{GEMINI_BASE_URL}/v1beta/models/{model}:streamGenerateContent?alt=sse"
+        payload = gemini_payload(contents, system_instruction, cached_content)
+        headers = {"x-goog-api-key": GEMINI_API_KEY}
+        async for event in self.stream_sse(url, payload, headers, deadline, rate_key=f"gemini:{model}"):
+            text = gemini_text(event) if event.get("candidates") else ""
+            if text:
+                yield text
+
+    async def openai_stream(self, messages: List[Dict[str, str]], model: str = OPENAI_MODEL,
+                            deadline: Optional[float] = None):
+        url = f"{OPENAI_BASE_URL}/v1/chat/completions"
+        payload = {"model": model, "messages": messages, "stream": True}
+        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
+        async for event in self.stream_sse(url, payload, headers, deadline, rate_key=f"openai:{model}"):
+            for choice in event.get("choices") or []:
+                text = choice.get("delta", {}).get("content")
+                if text:
+                    yield text
+
+    def close(self):
+        if self.http is not None:
+            self.run(self.http.aclose())
+            self.http = None
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+# ===========================
+# Shared client
+# ===========================
+_client = None
+_client_lock = threading.Lock()
+
+
+_max_concurrent_calls = MAX_CONCURRENT_CALLS
+
+
+def get_client() -> ProviderClient:
+    """
+    Return the process-wide provider client, creating it on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ProviderClient(max_concurrent_calls=_max_concurrent_calls, limiter=get_rate_limiter())
+        return _client
+
+
+def set_max_concurrent_calls(limit: int) -> None:
+    """
+    Cap the number of in-flight provider requests for this process. Must be
+    called before the shared client is first used.
+    """
+    global _max_concurrent_calls
+    with _client_lock:
+        if _client is not None:
+            raise RuntimeError("Provider client already started; set the limit before the first call")
+        _max_concurrent_calls = limit
+
+
+def generate_gemini(prompt: str, model: str = GEMINI_MODEL, deadline: Optional[float] = None) -> str:
+    """
+    Blocking Gemini generateContent call for code running outside the client loop.
+    """
+    client = get_client()
+    return client.run(client.gemini_generate(prompt, model, deadline))
+
+
+def chat_openai(messages: List[Dict[str, str]], model: str = OPENAI_MODEL, deadline: Optional[float] = None) -> str:
+    """
+    Blocking OpenAI chat completion call for code running outside the client loop.
+    """
+    client = get_client()
+    return client.run(client.openai_chat(messages, model, deadline))
+
+
+def stream_gemini(prompt: str, model: str = GEMINI_MODEL, deadline: Optional[float] = None):
+    """
+    Blocking generator over the text chunks of a streamed Gemini response.
+    """
+    client = get_client()
+    return client.iter_stream(client.gemini_stream(prompt, model, deadline))
+
+
+def stream_openai(messages: List[Dict[str, str]], model: str = OPENAI_MODEL, deadline: Optional[float] = None):
+    """
+    Blocking generator over the text chunks of a streamed OpenAI chat completion.
+    """
+    client = get_client()
+    return client.iter_stream(client.openai_stream(messages, model, deadline))
+
+
+def generate_gemini_contents(contents: List[Dict], system_instruction: Optional[str] = None,
+                             cached_content: Optional[str] = None, model: str = GEMINI_MODEL,
+                             deadline: Optional[float] = None) -> str:
+    """
+    Blocking multi-turn Gemini generateContent call.
+    """
+    client = get_client()
+    return client.run(client.gemini_generate_contents(contents, system_instruction, cached_content, model, deadline))
+
+
+def stream_gemini_contents(contents: List[Dict], system_instruction: Optional[str] = None,
+                           cached_content: Optional[str] = None, model: str = GEMINI_MODEL,
+                           deadline: Optional[float] = None):
+    """
+    Blocking generator over the text chunks of a streamed multi-turn Gemini response.
+    """
+    client = get_client()
+    return client.iter_stream(client.gemini_stream_contents(contents, system_instruction, cached_content, model,
+                                                            deadline))
+
+
+def gemini_cache_min_tokens(model: str = GEMINI_MODEL) -> int:
+    for name, min_tokens in GEMINI_CACHE_MIN_TOKENS.items():
+        if model == name or model.startswith(f"{name}-"):  # e.g. gemini-1.5-pro-002
+            return min_tokens
+    return DEFAULT_GEMINI_CACHE_MIN_TOKENS
+
+
+def create_gemini_cache(contents: List[Dict], system_instruction: Optional[str] = None,
+                        ttl: float = GEMINI_CACHE_TTL, model: str = GEMINI_MODEL,
+                        deadline: Optional[float] = None) -> str:
+    """
+    Blocking Gemini context cache creation; returns the cache name.
+    """
+    client = get_client()
+    return client.run(client.gemini_create_cache(contents, system_instruction, ttl, model, deadline))
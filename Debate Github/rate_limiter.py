@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Requests and tokens per minute for each provider and model. Keys are
+# "<provider>:<model>"; models without an entry aren't limited. Override with
+# DEBATE_RATE_LIMITS, a JSON object in the same shape.
+DEFAULT_LIMITS = {
+    "gemini:gemini-1.5-pro": {"rpm": 1000, "tpm": 4_000_000},
+    "gemini:gemini-1.5-flash": {"rpm": 2000, "tpm": 4_000_000},
+    "openai:o1-mini": {"rpm": 500, "tpm": 200_000},
+}
+RATE_LIMITS_ENV = "DEBATE_RATE_LIMITS"
+
+# Every process on the machine shares the budgets through this file. Set
+# DEBATE_RATE_LIMIT_FILE to another path, or to "" to limit each process on its own.
+RATE_LIMIT_FILE_ENV = "DEBATE_RATE_LIMIT_FILE"
+RATE_LIMIT_FILE = os.path.join(tempfile.gettempdir(), "debate_rate_limits.json")
+
+EXPECTED_OUTPUT_TOKENS = 500  # charged up front for a reply; corrected once the provider reports usage
+LOG_WAIT_OVER = 1.0  # seconds; longer waits are logged
+
+
+class FileLock:
+    """
+    Exclusive lock on a file, held across processes (fcntl.flock, or
+    msvcrt.locking on Windows) and across threads of this process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.thread_lock = threading.Lock()
+        self.file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            self.file = open(self.path, "a+b")
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self.file.seek(0)
+                        msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue  # LK_LOCK gives up after about ten seconds; keep waiting
+        except BaseException:
+            self.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def release(self):
+        if self.file is not None:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+            self.file.close()
+            self.file = None
+        self.thread_lock.release()
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets per provider and model,
+    shared by every thread and, through a small JSON state file, every
+    process using the same file.
+
+    Each budget is a generic cell rate algorithm (GCRA) token bucket that
+    holds up to a minute's worth of capacity. reserve() books a call's cost
+    and returns how long to wait before sending it, so callers queue in the
+    order they asked instead of being refused. The state file only holds one
+    timestamp per budget, so a crashed process leaves nothing to clean up.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, float]], path: Optional[str] = RATE_LIMIT_FILE):
+        self.limits = limits
+        self.path = path
+        self.lock = FileLock(f"{path}.lock") if path else None
+        self.local_lock = threading.Lock()
+        self.local_state = {}
+
+    def read_state(self) -> Dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.error(f"Error reading rate limit state, starting over: {e}")
+            return {}
+
+    def write_state(self, state: Dict):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error(f"Error saving rate limit state: {e}")
+
+    def update(self, func):
+        # Run func(state) with the state locked, then save it
+        if self.lock is None:
+            with self.local_lock:
+                return func(self.local_state)
+        with self.lock:
+            state = self.read_state()
+            result = func(state)
+            self.write_state(state)
+            return result
+
+    def reserve(self, key: str, tokens: int) -> float:
+        """
+        Book one request of about this many tokens against key's budgets.
+        Returns the seconds to wait before sending it.
+        """
+        limit = self.limits.get(key)
+        if not limit:
+            return 0.0
+
+        def book(state):
+            now = time.time()
+            entry = state.setdefault(key, {})
+            wait = 0.0
+            for budget, cost in (("rpm", 1), ("tpm", tokens)):
+                per_minute = limit.get(budget)
+                if not per_minute:
+                    continue
+                interval = 60.0 / per_minute  # seconds of budget one unit uses up
+                # Theoretical arrival time: when the bucket would be empty again at the booked rate
+                tat = max(entry.get(budget, 0.0), now) + min(cost, per_minute) * interval
+                entry[budget] = tat
+                wait = max(wait, tat - 60.0 - now)
+            return wait
+
+        wait = self.update(book)
+        if wait > LOG_WAIT_OVER:
+            logging.info(f"Rate limit for {key}: waiting {wait:.1f}s")
+        return wait
+
+    def adjust(self, key: str, tokens: int):
+        """
+        Correct a booking once the real token count is known (negative to refund).
+        """
+        limit = self.limits.get(key)
+        if not limit or not limit.get("tpm") or not tokens:
+            return
+
+        def correct(state):
+            entry = state.setdefault(key, {})
+            now = time.time()
+            entry["tpm"] = max(entry.get("tpm", now) + tokens * 60.0 / limit["tpm"], now)
+
+        self.update(correct)
+
+    def refund(self, key: str, tokens: int):
+        """
+        Give back a booking for a request that was never sent.
+        """
+        limit = self.limits.get(key)
+        if not limit:
+            return
+
+        def give_back(state):
+            entry = state.setdefault(key, {})
+            now = time.time()
+            for budget, cost in (("rpm", 1), ("tpm", tokens)):
+                if limit.get(budget) and budget in entry:
+                    entry[budget] = max(entry[budget] - min(cost, limit[budget]) * 60.0 / limit[budget], now)
+
+        self.update(give_back)
+
+
+def estimate_request_tokens(payload: Dict) -> int:
+    return len(json.dumps(payload)) // 4 + EXPECTED_OUTPUT_TOKENS
+
+
+def load_limits() -> Dict[str, Dict[str, float]]:
+    limits = dict(DEFAULT_LIMITS)
+    overrides = os.environ.get(RATE_LIMITS_ENV)
+    if overrides:
+        try:
+            limits.update(json.loads(overrides))
+        except ValueError as e:
+            logging.error(f"Ignoring invalid {RATE_LIMITS_ENV}: {e}")
+    return limits
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the process-wide rate limiter, configured from the environment on first use.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(load_limits(), os.environ.get(RATE_LIMIT_FILE_ENV, RATE_LIMIT_FILE))
+        return _limiter
@@ -0,0 +1,157 @@
+import re
+import random
+import hashlib
+import threading
+from collections import deque
+from typing import List, Optional, Set
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Words that carry no argument; dropping them lets rewordings share their shingles
+STOP_WORDS = frozenset("""
+a about after again all also an and any are as at be because been being both but by can could did do does
+doing down during each few for from further had has have having he her here hers him his how i if in into is
+it its itself just me more most my no nor not now of off on once only or other our ours out over own same she
+should so some such than that the their theirs them then there these they this those through to too under
+until up us very was we were what when where which while who whom why will with would you your yours
+""".split())
+
+# Longest first, so "ations" is stripped before "s"
+SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ing", "edly", "ers", "ies", "ed", "er", "es", "ly", "s")
+
+
+def stem(word: str) -> str:
+    """
+    Strip a common English suffix, keeping at least three letters of the word.
+    """
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize(text: str) -> List[str]:
+    """
+    Lowercase, drop stop words and stem the words of a text.
+    """
+    return [stem(word) for word in re.findall(r"[a-z0-9']+", text.lower()) if word not in STOP_WORDS]
+
+
+def shingles(text: str, size: int = 2) -> Set[int]:
+    """
+    Hash the normalized words of a text and their n-grams up to size words.
+    Short single words and bigrams survive rewording that longer phrases don't.
+    Texts with no words left after normalization are hashed as a single empty shingle.
+    """
+    words = normalize(text)
+    grams = {" ".join(words[i:i + n]) for n in range(1, size + 1) for i in range(len(words) - n + 1)} or {""}
+    return {int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big") for gram in grams}
+
+
+class NearDuplicateIndex:
+    """
+    Near-duplicate detector for one debater's past turns.
+
+    Each turn is reduced to a MinHash signature of its normalized word and
+    bigram shingles, and the signatures are bucketed by locality-sensitive
+    hashing bands, so a lookup only compares against turns sharing a band
+    instead of the whole history. Similarity is the MinHash estimate of the
+    shingle Jaccard similarity. A reworded repeat of an argument scores around
+    0.35-0.45 and a different argument on the same topic around 0.1-0.2.
+    With 64 bands of 2 rows, turns become candidates from a similarity of
+    about (1/64)^(1/2) = 0.125, well below the threshold, so repeats are not
+    missed for lack of a shared band. The index keeps the last `capacity`
+    turns and evicts older ones. It is safe to share between threads.
+    """
+
+    def __init__(self, threshold: float = 0.3, num_perm: int = 128, bands: int = 64,
+                 shingle_size: int = 2, capacity: int = 500):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.capacity = capacity
+        # Fixed seed so signatures are comparable across runs
+        rng = random.Random(1)
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+        self.entries = deque()  # entry ids, oldest first
+        self.buckets = {}  # (band, band values) -> set of entry ids
+        self.signatures = {}
+        self.next_id = 0
+        self.lock = threading.Lock()
+
+    def signature(self, text: str) -> List[int]:
+        hashes = shingles(text, self.shingle_size)
+        return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self.permutations]
+
+    def band_keys(self, signature: List[int]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield (band, tuple(signature[start:start + self.rows]))
+
+    def similarity(self, text: str) -> float:
+        """
+        Highest estimated similarity between text and any indexed turn (0 if none share a band).
+        """
+        return self.best_match(self.signature(text))
+
+    def best_match(self, signature: List[int]) -> float:
+        with self.lock:
+            return self.match(signature)
+
+    def match(self, signature: List[int]) -> float:
+        # Callers hold self.lock
+        candidates = set()
+        for key in self.band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        best = 0.0
+        for entry_id in candidates:
+            other = self.signatures[entry_id]
+            matches = sum(1 for mine, theirs in zip(signature, other) if mine == theirs)
+            best = max(best, matches / self.num_perm)
+        return best
+
+    def add(self, text: str):
+        self.add_signature(self.signature(text))
+
+    def add_signature(self, signature: List[int]):
+        with self.lock:
+            self.insert(signature)
+
+    def insert(self, signature: List[int]):
+        # Callers hold self.lock
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries.append(entry_id)
+        self.signatures[entry_id] = signature
+        for key in self.band_keys(signature):
+            self.buckets.setdefault(key, set()).add(entry_id)
+        while len(self.entries) > self.capacity:
+            self.evict(self.entries.popleft())
+
+    def evict(self, entry_id: int):
+        signature = self.signatures.pop(entry_id)
+        for key in self.band_keys(signature):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def check_and_add(self, text: str, threshold: Optional[float] = None) -> bool:
+        """
+        Return True if text is a near-duplicate of an indexed turn; otherwise index it and return False.
+        threshold overrides the index's own for this check.
+        """
+        signature = self.signature(text)
+        if threshold is None:
+            threshold = self.threshold
+        with self.lock:
+            if self.match(signature) >= threshold:
+                return True
+            self.insert(signature)
+        return False
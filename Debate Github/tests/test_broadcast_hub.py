@@ -0,0 +1,167 @@
+import json
+import socket
+import time
+
+import pytest
+
+from broadcast_hub import BroadcastHub, choose_encoding
+from framing import FrameDecoder, LineDecoder
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_hub():
+    hubs = []
+
+    def make(**kwargs):
+        hub = BroadcastHub(port=0, **kwargs)
+        assert hub.start()
+        hub.port = hub.server.getsockname()[1]
+        hubs.append(hub)
+        return hub
+
+    yield make
+    for hub in hubs:
+        hub.close()
+
+
+def connect(hub, hello=None):
+    sock = socket.create_connection((hub.host, hub.port))
+    sock.settimeout(5.0)
+    if hello is not None:
+        sock.sendall((json.dumps(hello) + "\n").encode())
+    return sock
+
+
+def receive(sock, decoder, count):
+    messages = []
+    while len(messages) < count:
+        data = sock.recv(65536)
+        if not data:
+            break
+        messages.extend(decoder.feed(data))
+    return messages
+
+
+def receive_frames(sock, hub, count, fmt="json"):
+    # Framed subscribers hear the hub's hello before any update
+    messages = receive(sock, FrameDecoder(), count + 1)
+    assert messages[0] == {"hub_id": hub.hub_id, "format": fmt}
+    return messages[1:]
+
+
+def test_publish_reaches_every_subscriber(make_hub):
+    hub = make_hub()
+    socks = [connect(hub, {"format": "json"}) for _ in range(3)]
+    wait_for(lambda: hub.subscriber_count() == 3)
+    assert hub.publish({"message": "hello"}) == 1
+    for sock in socks:
+        assert receive_frames(sock, hub, 1) == [{"message": "hello", "seq": 1}]
+        sock.close()
+
+
+def test_encoding_is_the_first_available_accepted_format():
+    assert choose_encoding({}) == "lines"
+    assert choose_encoding({"since": 4}) == "lines"
+    assert choose_encoding({"format": "json"}) == "json"
+    assert choose_encoding({"formats": ["cbor", "json"]}) == "json"
+    # Asking for frames in a format the hub lacks still gets frames
+    assert choose_encoding({"format": "cbor"}) == "json"
+    assert choose_encoding({"formats": []}) == "json"
+    assert choose_encoding({"formats": 3}) == "json"
+
+
+def test_unknown_format_gets_json_frames(make_hub):
+    hub = make_hub()
+    hub.publish({"message": "hello"})
+    sock = connect(hub, {"formats": ["cbor"]})
+    assert receive_frames(sock, hub, 1) == [{"message": "hello", "seq": 1}]
+    sock.close()
+
+
+def test_silent_subscriber_gets_the_backlog_as_lines(make_hub):
+    hub = make_hub()
+    for i in range(3):
+        hub.publish({"message": i})
+    sock = connect(hub)
+    assert [m["seq"] for m in receive(sock, LineDecoder(), 3)] == [1, 2, 3]
+    sock.close()
+
+
+def test_reconnect_replays_only_what_was_missed(make_hub):
+    hub = make_hub()
+    for i in range(5):
+        hub.publish({"message": i})
+    sock = connect(hub, {"since": 3, "hub_id": hub.hub_id, "format": "json"})
+    wait_for(lambda: hub.subscriber_count() == 1)
+    hub.publish({"message": 5})
+    assert [m["seq"] for m in receive_frames(sock, hub, 3)] == [4, 5, 6]
+    sock.close()
+
+
+def test_since_from_another_hub_run_replays_everything(make_hub):
+    hub = make_hub()
+    for i in range(3):
+        hub.publish({"message": i})
+    sock = connect(hub, {"since": 2, "hub_id": "an earlier run", "format": "json"})
+    assert [m["seq"] for m in receive_frames(sock, hub, 3)] == [1, 2, 3]
+    sock.close()
+    assert make_hub().hub_id != hub.hub_id
+
+
+def test_backlog_is_bounded(make_hub):
+    hub = make_hub(backlog_size=3)
+    for i in range(10):
+        hub.publish({"message": i})
+    sock = connect(hub, {"since": 0, "format": "json"})
+    assert [m["seq"] for m in receive_frames(sock, hub, 3)] == [8, 9, 10]
+    sock.close()
+
+
+def stalled_subscriber(hub):
+    # A subscriber with tiny socket buffers that never reads
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
+    sock.connect((hub.host, hub.port))
+    sock.sendall(b'{"format": "json"}\n')
+    wait_for(lambda: hub.subscriber_count() == 1)
+    subscriber = next(iter(hub.subscribers))
+    subscriber.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024)
+    return sock, subscriber
+
+
+def test_slow_subscriber_is_disconnected(make_hub):
+    hub = make_hub(queue_size=10)
+    sock, subscriber = stalled_subscriber(hub)
+    payload = "x" * 10000
+    for i in range(200):
+        hub.publish({"message": payload})
+        if hub.subscriber_count() == 0:
+            break
+    assert hub.subscriber_count() == 0
+    assert subscriber.closed
+    sock.close()
+
+
+def test_slow_subscriber_can_drop_oldest_instead(make_hub):
+    hub = make_hub(queue_size=10, policy="drop_oldest")
+    sock, subscriber = stalled_subscriber(hub)
+    payload = "x" * 10000
+    for i in range(200):
+        hub.publish({"message": payload})
+    assert hub.subscriber_count() == 1
+    assert subscriber.dropped > 0
+    assert len(subscriber.queue) <= 10
+    sock.close()
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BroadcastHub(policy="block")
@@ -0,0 +1,102 @@
+import asyncio
+import random
+import shutil
+
+import pytest
+
+from cassette import Cassette, CassetteMiss
+
+
+def fail():
+    raise KeyError("no such page")
+
+
+def record_calls(path):
+    tape = Cassette(str(path), "record")
+    seed = tape.seed
+    assert tape.call("search", {"query": "ai"}, lambda: ["AI", "AI art"]) == ["AI", "AI art"]
+    with pytest.raises(KeyError):
+        tape.call("page", {"title": "Nope"}, fail)
+    assert tape.call("page", {"title": "AI"}, lambda: {"title": "AI"}, encode=lambda page: page["title"],
+                     decode=lambda title: {"title": title}) == {"title": "AI"}
+    return tape, seed
+
+
+def test_calls_replay_in_order_with_their_errors(tmp_path):
+    path = tmp_path / "calls.jsonl.gz"
+    tape, seed = record_calls(path)
+    tape.close()
+
+    replay = Cassette(str(path), "replay")
+    assert replay.seed == seed
+    assert replay.call("search", {"query": "ai"}, pytest.fail) == ["AI", "AI art"]
+    with pytest.raises(KeyError, match="no such page"):
+        replay.call("page", {"title": "Nope"}, pytest.fail)
+    assert replay.call("page", {"title": "AI"}, pytest.fail, decode=lambda title: {"title": title}) == {"title": "AI"}
+    with pytest.raises(CassetteMiss):
+        replay.call("search", {"query": "ai"}, pytest.fail)
+
+
+def test_replay_restores_the_random_seed(tmp_path):
+    path = tmp_path / "seed.jsonl.gz"
+    Cassette(str(path), "record").close()
+    recorded = random.random()
+    Cassette(str(path), "replay")
+    assert random.random() == recorded
+
+
+def test_unmatched_request_falls_back_to_the_next_of_its_kind(tmp_path):
+    path = tmp_path / "fallback.jsonl.gz"
+    tape = Cassette(str(path), "record")
+    tape.call("generate", {"prompt": "personality A"}, lambda: "first")
+    tape.call("generate", {"prompt": "personality B"}, lambda: "second")
+    tape.close()
+
+    replay = Cassette(str(path), "replay")
+    assert replay.call("generate", {"prompt": "personality B"}, pytest.fail) == "second"
+    assert replay.call("generate", {"prompt": "personality C"}, pytest.fail) == "first"
+
+
+def test_async_calls_and_streams_round_trip(tmp_path):
+    path = tmp_path / "async.jsonl.gz"
+
+    async def reply():
+        return {"text": "hello"}
+
+    async def chunks():
+        for chunk in ["Hel", "lo"]:
+            yield chunk
+
+    async def broken():
+        yield "Hel"
+        raise ConnectionError("reset")
+
+    async def collect(stream):
+        return [chunk async for chunk in stream]
+
+    async def run(tape, factories):
+        result = await tape.call_async("gemini", {"prompt": "hi"}, factories[0])
+        streamed = await collect(tape.stream_async("gemini.stream", {"prompt": "hi"}, factories[1]))
+        items = []
+        with pytest.raises(ConnectionError):
+            async for chunk in tape.stream_async("gemini.stream", {"prompt": "again"}, factories[2]):
+                items.append(chunk)
+        return result, streamed, items
+
+    tape = Cassette(str(path), "record")
+    recorded = asyncio.run(run(tape, [reply, chunks, broken]))
+    tape.close()
+    replay = Cassette(str(path), "replay", latency_scale=1.0)
+    assert asyncio.run(run(replay, [pytest.fail] * 3)) == recorded == ({"text": "hello"}, ["Hel", "lo"], ["Hel"])
+
+
+def test_recording_cut_short_replays_up_to_the_last_call(tmp_path):
+    path = tmp_path / "crash.jsonl.gz"
+    tape, _ = record_calls(path)
+    # Copy the file as a crash would leave it: flushed but never closed
+    shutil.copy(path, tmp_path / "copy.jsonl.gz")
+    tape.close()
+
+    replay = Cassette(str(tmp_path / "copy.jsonl.gz"), "replay")
+    assert len(replay.records) == 3
+    assert replay.call("search", {"query": "ai"}, pytest.fail) == ["AI", "AI art"]
@@ -0,0 +1,102 @@
+from conversation_context import RollingContext, estimate_tokens, render_line
+
+
+def entry(speaker, words):
+    return {"speaker": speaker, "message": " ".join(["word"] * words)}
+
+
+def test_short_conversation_is_rendered_verbatim():
+    context = RollingContext(token_budget=100)
+    context.append({"speaker": "Gemini", "message": "Hello"})
+    context.append({"speaker": "Bard", "message": "Hi there"})
+    assert context.render() == "Gemini: Hello\nBard: Hi there"
+
+
+def test_oldest_turns_are_trimmed_to_the_budget():
+    context = RollingContext(token_budget=100)
+    entries = [entry(f"AI{i}", 20) for i in range(10)]  # about 26 tokens each
+    for e in entries:
+        context.append(e)
+    rendered = context.render()
+    assert estimate_tokens(rendered) <= 100
+    assert rendered.endswith(render_line(entries[-1]))
+    assert render_line(entries[0]) not in rendered
+    assert len(context.overflow) == 7
+
+
+def test_latest_turn_is_kept_even_over_budget():
+    context = RollingContext(token_budget=10)
+    context.append(entry("Gemini", 5))
+    context.append(entry("Bard", 50))
+    assert context.render() == render_line(entry("Bard", 50))
+
+
+def test_pending_entries_do_not_change_the_context():
+    context = RollingContext(token_budget=100)
+    context.append({"speaker": "Gemini", "message": "Hello"})
+    rendered = context.render(pending=[{"speaker": "Bard", "message": "Hi"}])
+    assert rendered == "Gemini: Hello\nBard: Hi"
+    assert context.render() == "Gemini: Hello"
+
+
+def test_compaction_folds_dropped_turns_into_the_summary():
+    calls = []
+
+    def summarize(previous, lines):
+        calls.append((previous, lines))
+        return "They argued a lot."
+
+    context = RollingContext(summarize, token_budget=500)
+    entries = [entry(f"AI{i}", 100) for i in range(10)]  # about 126 tokens each
+    for e in entries:
+        context.append(e)
+    context.compact().result()
+
+    previous, lines = calls[0]
+    assert previous == ""
+    assert lines[0] == render_line(entries[0])
+    rendered = context.render()
+    assert rendered.startswith("Summary of the earlier debate: They argued a lot.\n")
+    assert render_line(entries[0]) not in rendered
+    assert rendered.endswith(render_line(entries[-1]))
+    assert not context.overflow
+    context.close()
+
+
+def test_compaction_skips_small_backlogs_and_failures():
+    context = RollingContext(lambda previous, lines: "unused", token_budget=1000)
+    context.append({"speaker": "Gemini", "message": "Hello"})
+    assert context.compact() is None
+
+    def fail(previous, lines):
+        raise RuntimeError("provider down")
+
+    context = RollingContext(fail, token_budget=500)
+    for i in range(10):
+        context.append(entry(f"AI{i}", 100))
+    before = context.render()
+    context.compact().result()
+    assert context.render() == before
+    assert context.summary == ""
+    context.close()
+
+
+def test_long_summaries_are_capped():
+    context = RollingContext(lambda previous, lines: "point " * 1000, token_budget=500, summary_budget=50)
+    for i in range(10):
+        context.append(entry(f"AI{i}", 100))
+    context.compact().result()
+    assert len(context.summary) <= 50 * 4 + 3
+    assert context.summary.endswith("...")
+    context.close()
+
+
+def test_reset_discards_summaries_still_being_written():
+    context = RollingContext(lambda previous, lines: "stale", token_budget=500)
+    for i in range(10):
+        context.append(entry(f"AI{i}", 100))
+    job = (context.generation, context.summary, 0)
+    context.reset([{"speaker": "Gemini", "message": "Fresh start"}])
+    context.run_compaction(job, ["line"])
+    assert context.render() == "Gemini: Fresh start"
+    context.close()
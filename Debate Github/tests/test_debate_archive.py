@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+from debate_archive import DebateArchive
+from debate_journal import DebateJournal
+
+PERSONALITIES = {"Gemini": {"tone": "calm"}, "o1-mini": {"tone": "sharp"}}
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def debates(tmp_path):
+    """
+    A directory holding one debate file of each kind the app writes, plus files that aren't debates.
+    """
+    directory = tmp_path / "debates"
+    directory.mkdir()
+    journal = DebateJournal(str(directory / "journal.jsonl.gz"))
+    journal.append("start", topic="AI in art", personalities=PERSONALITIES)
+    journal.append("entry", entry={"speaker": "System", "message": "--- Opening Statements ---"})
+    journal.append("entry", entry={"speaker": "Gemini", "message": "Painters have always borrowed from machines.",
+                                   "emotion": "calm", "sentiment": 0.2})
+    journal.append("entry", entry={"speaker": "System", "message": "--- Rebuttals ---"})
+    journal.append("entry", entry={"speaker": "o1-mini", "message": "Borrowing is not the same as replacing artists."})
+    journal.close()
+    write_json(directory / "saved.json", [
+        {"speaker": "System", "message": "Debate started on: AI and jobs"},
+        {"speaker": "Gemini", "message": "The job market will adapt, as it always has."},
+    ])
+    write_json(directory / "transcript.json", {
+        "topic": "AI and privacy", "started_at": 1000.0, "personalities": PERSONALITIES,
+        "conversation": [{"speaker": "o1-mini", "message": "Surveillance grows quietly with every new sensor."}],
+    })
+    (directory / "debate_metrics.jsonl").write_text('{"speaker": "Gemini", "prompt_tokens": 10}\n', encoding="utf-8")
+    (directory / "broken.json").write_text('{"conversation": [', encoding="utf-8")
+    return directory
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = DebateArchive(str(tmp_path / "archive.db"))
+    yield archive
+    archive.close()
+
+
+def test_every_kind_of_debate_file_is_imported(archive, debates):
+    counts = archive.import_files([str(debates)])
+    assert counts == {"imported": 3, "unchanged": 0, "skipped": 1, "failed": 1, "turns": 7}
+    stats = archive.stats()
+    assert (stats["debates"], stats["turns"]) == (3, 7)
+
+    # Nothing changed, so a second import skips every debate
+    counts = archive.import_files([str(debates)])
+    assert (counts["imported"], counts["unchanged"]) == (0, 3)
+    assert archive.stats()["turns"] == 7
+
+
+def test_search_stems_words_and_applies_filters(archive, debates):
+    archive.import_files([str(debates)])
+    rows = archive.search("artist")
+    assert [row["speaker"] for row in rows] == ["o1-mini"]
+    assert "[artists]" in rows[0]["snippet"]
+    assert rows[0]["topic"] == "AI in art" and rows[0]["phase"] == "Rebuttals"
+
+    assert [row["topic"] for row in archive.search('"job market"')] == ["AI and jobs"]
+    assert len(archive.search("borrow")) == 2
+    assert len(archive.search("borrow", speaker="Gemini")) == 1
+    assert len(archive.search("borrow", phase="Opening Statements")) == 1
+    assert archive.search("borrow", topic="AI and jobs") == []
+    assert [row["topic"] for row in archive.search(until=2000.0)] == ["AI and privacy"]
+
+
+def test_turns_keep_the_speakers_personality(archive, debates):
+    archive.import_files([str(debates)])
+    turn = archive.get_turn(archive.search("surveillance")[0]["id"])
+    assert turn["personality"] == {"tone": "sharp"}
+    assert turn["source"] == os.path.abspath(debates / "transcript.json")
+    assert archive.get_turn(10_000) is None
+
+
+def test_changed_file_replaces_its_earlier_import(archive, debates):
+    archive.import_files([str(debates)])
+    path = write_json(debates / "saved.json", [
+        {"speaker": "System", "message": "Debate started on: AI and jobs"},
+        {"speaker": "Gemini", "message": "Retraining programs deserve the funding."},
+    ])
+    os.utime(path, (0, 0))
+
+    counts = archive.import_files([str(path)])
+    assert (counts["imported"], counts["turns"]) == (1, 2)
+    assert archive.stats()["turns"] == 7
+    assert archive.search('"job market"') == []
+    assert len(archive.search("retraining")) == 1
@@ -0,0 +1,90 @@
+import os
+import time
+import shutil
+
+import pytest
+
+from debate_journal import DebateJournal, journal_path, load_journal, read_records
+
+PERSONALITIES = {"Gemini": {"tone": "calm"}, "o1-mini": {"tone": "sharp"}}
+
+
+def entry(speaker, message):
+    return {"speaker": speaker, "message": message, "sentiment": 0.0}
+
+
+def write_debate(path, compress=False):
+    journal = DebateJournal(str(path), compress=compress)
+    journal.append("start", topic="AI in art", personalities=PERSONALITIES, settings={"length": "short"})
+    journal.append("phase", index=0, name="Opening Statements", personalities=PERSONALITIES)
+    journal.append("entry", entry=entry("Gemini", "Opening"))
+    journal.append("entry", entry=entry("o1-mini", "Reply"))
+    journal.append("phase", index=1, name="Arguments", personalities={"Gemini": {"tone": "fiery"}})
+    return journal
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_journal_rebuilds_the_debate(tmp_path, compress):
+    path = tmp_path / ("debate.jsonl.gz" if compress else "debate.jsonl")
+    journal = write_debate(path, compress)
+    journal.append("state", topic="AI in music", personalities=PERSONALITIES)
+    journal.close()
+
+    state = load_journal(str(path))
+    assert state["topic"] == "AI in music"
+    assert state["settings"] == {"length": "short"}
+    assert [item["message"] for item in state["history"]] == ["Opening", "Reply"]
+    assert state["phase_index"] == 1
+    assert state["personalities"] == PERSONALITIES
+
+
+def test_half_written_record_is_cut_off_before_appending(tmp_path):
+    path = tmp_path / "debate.jsonl"
+    write_debate(path).close()
+    with open(path, "ab") as f:
+        f.write(b'{"type": "entry", "ent')  # the process died mid-write
+
+    assert len(load_journal(str(path))["history"]) == 2
+    journal = DebateJournal(str(path))
+    journal.append("resume")
+    journal.append("entry", entry=entry("Gemini", "After the crash"))
+    journal.close()
+    state = load_journal(str(path))
+    assert [item["message"] for item in state["history"]] == ["Opening", "Reply", "After the crash"]
+    assert [record["type"] for record in read_records(str(path))][-2:] == ["resume", "entry"]
+
+
+def test_compressed_journal_cut_off_by_a_crash_is_repaired(tmp_path):
+    path = tmp_path / "debate.jsonl.gz"
+    journal = DebateJournal(str(path), fsync_interval=0.01)
+    journal.append("start", topic="AI in art", personalities=PERSONALITIES)
+    journal.append("entry", entry=entry("Gemini", "Synced"))
+    time.sleep(0.2)
+    # Copy the file as a crash would leave it: synced blocks, no gzip trailer, and half a block more
+    crashed = tmp_path / "crashed.jsonl.gz"
+    shutil.copy(path, crashed)
+    journal.close()
+    with open(crashed, "ab") as f:
+        f.write(b"\x04\x00half a block")
+
+    assert [item["message"] for item in load_journal(str(crashed))["history"]] == ["Synced"]
+    resumed = DebateJournal(str(crashed))
+    resumed.append("entry", entry=entry("o1-mini", "Resumed"))
+    resumed.close()
+    assert [item["message"] for item in load_journal(str(crashed))["history"]] == ["Synced", "Resumed"]
+
+
+def test_file_without_a_start_record_is_rejected(tmp_path):
+    path = tmp_path / "notes.jsonl"
+    journal = DebateJournal(str(path))
+    journal.append("entry", entry=entry("Gemini", "Orphan"))
+    journal.close()
+    with pytest.raises(ValueError):
+        load_journal(str(path))
+
+
+def test_journal_paths_are_named_after_the_topic(tmp_path):
+    path = journal_path(str(tmp_path), "AI in Art: Friend or Foe?", compress=True)
+    assert os.path.dirname(path) == str(tmp_path)
+    assert path.endswith("_ai-in-art-friend-or-foe.jsonl.gz")
+    assert journal_path("journals", "???").endswith("_debate.jsonl")
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+debate_service = pytest.importorskip("debate_service")
+
+
+async def request(websocket, **fields):
+    await websocket.send(json.dumps(fields))
+    return json.loads(await websocket.recv())
+
+
+def run_service(scenario):
+    """
+    Run scenario(service, url) against a service listening on a free port.
+    """
+    async def main():
+        service = debate_service.DebateService(max_sessions=4)
+        async with websockets.serve(service.handle, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return await scenario(service, f"ws://127.0.0.1:{port}")
+            finally:
+                for session in list(service.sessions.values()):
+                    session.close()
+                service.threads.shutdown(wait=True)
+
+    return asyncio.run(main())
+
+
+def create(websocket, topic):
+    return request(websocket, type="create", topic=topic, settings={"journal_dir": "/etc", "delay": 0})
+
+
+def test_only_the_creator_is_sent_the_token():
+    async def scenario(service, url):
+        async with websockets.connect(url) as owner, websockets.connect(url) as guest:
+            joined = await create(owner, "AI in art")
+            session_id = joined["session"]
+            assert joined["type"] == "joined" and joined["token"]
+            # The host's journal directory can't be changed by a client
+            assert service.sessions[session_id].engine.settings["journal_dir"] != "/etc"
+
+            rejoined = await request(guest, type="join", session=session_id, token=joined["token"])
+            assert rejoined["type"] == "joined" and "token" not in rejoined
+            again = await request(owner, type="join", session=session_id)
+            assert "token" not in again
+
+    run_service(scenario)
+
+
+def test_sessions_are_private_without_the_token():
+    async def scenario(service, url):
+        async with websockets.connect(url) as owner, websockets.connect(url) as stranger:
+            joined = await create(owner, "AI in art")
+            session_id = joined["session"]
+
+            assert await request(stranger, type="list") == {"type": "sessions", "sessions": []}
+            missing = await request(stranger, type="join", session="000000000000")
+            for attempt in ({"type": "join", "session": session_id},
+                            {"type": "join", "session": session_id, "token": "guess"},
+                            {"type": "close", "session": session_id, "token": None}):
+                reply = await request(stranger, **attempt)
+                # Indistinguishable from a session that doesn't exist
+                assert reply["type"] == "error"
+                assert reply["message"] == missing["message"].replace("000000000000", session_id)
+            assert session_id in service.sessions
+
+            await request(stranger, type="join", session=session_id, token=joined["token"])
+            listed = await request(stranger, type="list")
+            assert [session["session"] for session in listed["sessions"]] == [session_id]
+
+    run_service(scenario)
+
+
+def test_events_reach_only_their_sessions_subscribers():
+    async def scenario(service, url):
+        async with websockets.connect(url) as first, websockets.connect(url) as second:
+            one = (await create(first, "AI in art"))["session"]
+            two = (await create(second, "AI and jobs"))["session"]
+            assert [session["session"] for session in (await request(second, type="list"))["sessions"]] == [two]
+
+            await first.send(json.dumps({"type": "pause", "session": one}))
+            event = json.loads(await asyncio.wait_for(first.recv(), 5))
+            assert event["type"] == "message" and event["session"] == one
+            assert event["entry"]["message"] == "Debate paused."
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(second.recv(), 0.3)
+
+    run_service(scenario)
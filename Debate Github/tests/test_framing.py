@@ -0,0 +1,88 @@
+import struct
+
+import pytest
+
+import framing
+from framing import (FrameDecoder, FramingError, LineDecoder, available_formats, decode_payload, decoder_for,
+                     encode_frame)
+
+MESSAGES = [{"speaker": "Gemini", "message": "Hello"}, {"speaker": "Bard", "message": "Ünïcödé — 你好 🎉"}, {}]
+
+
+def feed_in_pieces(decoder, data, size):
+    messages = []
+    for start in range(0, len(data), size):
+        messages.extend(decoder.feed(data[start:start + size]))
+    return messages
+
+
+def test_frame_round_trip():
+    frame = encode_frame(MESSAGES[1])
+    length, code = framing.HEADER.unpack_from(frame)
+    assert length == len(frame) - framing.HEADER.size
+    assert decode_payload(frame[framing.HEADER.size:], code) == MESSAGES[1]
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 7, 1000])
+def test_frames_split_across_reads(size):
+    data = b"".join(encode_frame(message) for message in MESSAGES)
+    assert feed_in_pieces(FrameDecoder(), data, size) == MESSAGES
+
+
+def test_incomplete_frame_is_kept_for_the_next_read():
+    data = encode_frame(MESSAGES[0])
+    decoder = FrameDecoder()
+    assert decoder.feed(data[:-1]) == []
+    assert decoder.feed(data[-1:] + data[:3]) == [MESSAGES[0]]
+    assert decoder.feed(data[3:]) == [MESSAGES[0]]
+
+
+def test_oversized_frame_is_rejected():
+    with pytest.raises(FramingError):
+        FrameDecoder(max_frame_bytes=10).feed(encode_frame({"message": "x" * 100}))
+
+
+def test_unknown_payload_format_is_rejected():
+    with pytest.raises(FramingError):
+        FrameDecoder().feed(struct.pack(">IB", 2, 9) + b"{}")
+
+
+@pytest.mark.skipif("msgpack" not in available_formats(), reason="msgpack is not installed")
+def test_msgpack_frames():
+    data = b"".join(encode_frame(message, "msgpack") for message in MESSAGES)
+    assert feed_in_pieces(FrameDecoder(), data, 3) == MESSAGES
+
+
+def test_msgpack_unavailable(monkeypatch):
+    monkeypatch.setattr(framing, "msgpack", None)
+    assert available_formats() == ["json"]
+    with pytest.raises(FramingError):
+        encode_frame(MESSAGES[0], "msgpack")
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 1000])
+def test_lines_split_across_reads(size):
+    data = "".join(f'{{"message": "{text}"}}\n' for text in ["a", "Ünïcödé", "你好 🎉"]).encode("utf-8")
+    assert [m["message"] for m in feed_in_pieces(LineDecoder(), data, size)] == ["a", "Ünïcödé", "你好 🎉"]
+
+
+def test_partial_utf8_sequence_is_completed_by_the_next_read():
+    data = '{"message": "🎉"}\n'.encode("utf-8")
+    split = data.index("🎉".encode("utf-8")) + 2  # in the middle of the 4-byte emoji
+    decoder = LineDecoder()
+    assert decoder.feed(data[:split]) == []
+    assert decoder.feed(data[split:]) == [{"message": "🎉"}]
+
+
+def test_blank_lines_are_skipped():
+    assert LineDecoder().feed(b'\n\n{"a": 1}\n\n') == [{"a": 1}]
+
+
+def test_overlong_line_is_rejected():
+    with pytest.raises(FramingError):
+        LineDecoder(max_line_chars=10).feed(b'{"message": "' + b"x" * 100)
+
+
+def test_decoder_is_picked_from_the_first_bytes():
+    assert isinstance(decoder_for(encode_frame(MESSAGES[0])), FrameDecoder)
+    assert isinstance(decoder_for(b'{"speaker": "Gemini"}\n'), LineDecoder)
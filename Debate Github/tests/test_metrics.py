@@ -0,0 +1,71 @@
+import json
+import urllib.request
+
+import pytest
+
+from metrics import MetricsRecorder, TurnMetrics, estimate_cost, start_metrics_server
+
+
+def finished_turn(speaker="Gemini", usage=None, output="A reply of some length", error=False):
+    turn = TurnMetrics(speaker, "full", "gemini-1.5-pro")
+    turn.set_prompt(4000, persona=1000, context=2000)
+    turn.stats.calls = 1
+    if usage is not None:
+        turn.stats.add_usage({"usageMetadata": usage})
+    return turn.finish(output, error=error)
+
+
+def test_cost_counts_cached_tokens_at_the_cached_price():
+    assert estimate_cost("gemini-1.5-pro", 1_000_000, 0, 0) == pytest.approx(1.25)
+    assert estimate_cost("gemini-1.5-pro", 1_000_000, 1_000_000, 1_000_000) == pytest.approx(0.3125 + 5.00)
+    assert estimate_cost("unknown-model", 100, 0, 100) is None
+
+
+def test_reported_usage_is_preferred_over_estimates():
+    turn = finished_turn(usage={"promptTokenCount": 900, "cachedContentTokenCount": 400, "candidatesTokenCount": 50})
+    assert (turn["prompt_tokens"], turn["cached_tokens"], turn["output_tokens"]) == (900, 400, 50)
+    assert turn["usage_reported"]
+    assert turn["cost_usd"] == pytest.approx(round(estimate_cost("gemini-1.5-pro", 900, 400, 50), 6))
+
+
+def test_tokens_are_estimated_without_reported_usage():
+    turn = finished_turn(output="x" * 400)
+    assert not turn["usage_reported"]
+    assert (turn["prompt_tokens"], turn["output_tokens"]) == (1000, 100)
+
+
+def test_unnamed_prompt_characters_count_as_instructions():
+    sections = finished_turn()["sections"]
+    assert sections["persona"]["chars"] == 1000
+    assert sections["context"]["chars"] == 2000
+    assert sections["instructions"]["chars"] == 1000
+    assert sections["external_info"]["chars"] == 0
+
+
+def test_turns_are_written_and_totalled(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    recorder = MetricsRecorder(str(path))
+    recorder.record(finished_turn("Gemini", usage={"promptTokenCount": 100, "candidatesTokenCount": 10}))
+    recorder.record(finished_turn("o1-mini", usage={"promptTokenCount": 200, "candidatesTokenCount": 20}, error=True))
+    for handler in recorder.logger.handlers:
+        handler.flush()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["speaker"] for line in lines] == ["Gemini", "o1-mini"]
+    summary = recorder.snapshot()
+    assert (summary["turns"], summary["errors"]) == (2, 1)
+    assert (summary["prompt_tokens"], summary["output_tokens"]) == (300, 30)
+
+
+def test_prometheus_endpoint_serves_the_totals():
+    recorder = MetricsRecorder(None)
+    recorder.record(finished_turn("Gemini", usage={"promptTokenCount": 100, "candidatesTokenCount": 10}))
+    server = start_metrics_server(recorder, 0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics", timeout=5) as response:
+            text = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'debate_prompt_tokens_total{speaker="Gemini"} 100' in text
+    assert 'debate_prompt_chars_total{section="persona"} 1000' in text
@@ -0,0 +1,168 @@
+import time
+
+import pytest
+
+import providers
+from fake_llm_server import FakeLLMConfig, LatencyModel, start_server
+from providers import CallStats, ProviderClient, ProviderError, gemini_content, track_calls
+from rate_limiter import RateLimiter
+
+RATE_KEY = f"gemini:{providers.GEMINI_MODEL}"
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """
+    Start a fake provider server with the given config and point a fresh client at it.
+    """
+    servers = []
+    clients = []
+    monkeypatch.delenv("DEBATE_CASSETTE", raising=False)
+    monkeypatch.setattr(providers, "BACKOFF_BASE", 0.01)
+
+    def serve(limiter=None, **config):
+        config.setdefault("latency", LatencyModel(median_ms=0))
+        config.setdefault("tokens_per_second", 0)
+        server = start_server(FakeLLMConfig(seed=1, **config))
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        monkeypatch.setattr(providers, "GEMINI_BASE_URL", base_url)
+        monkeypatch.setattr(providers, "OPENAI_BASE_URL", base_url)
+        client = ProviderClient(limiter=limiter)
+        servers.append(server)
+        clients.append(client)
+        return client, server
+
+    yield serve
+    for client in clients:
+        client.close()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def reply_words(text):
+    # The fake server starts each reply with "Reply <n>:" in place of its first word
+    assert text.startswith("Reply ")
+    return text.split()[1:]
+
+
+def test_generate_returns_the_reply_and_its_usage(serve):
+    client, _ = serve(reply_words=20)
+    with track_calls() as stats:
+        text = client.run(client.gemini_generate("Make the opening statement"))
+    assert len(reply_words(text)) == 20
+    assert stats.calls == 1 and stats.retries == 0
+    assert stats.usage_reported and stats.prompt_tokens > 0 and stats.output_tokens > 0
+
+
+def test_retryable_failures_are_retried(serve):
+    client, _ = serve(error_rate=0.3)
+    with track_calls() as stats:
+        replies = [client.run(client.openai_chat([{"role": "user", "content": "Hi"}])) for _ in range(10)]
+    assert all(reply.startswith("Reply ") for reply in replies)
+    assert stats.calls == 10
+    assert stats.retries > 0
+
+
+def test_retries_give_up_after_max_retries(serve):
+    client, _ = serve(error_rate=1.0)
+    with track_calls() as stats, pytest.raises(ProviderError) as error:
+        client.run(client.gemini_generate("Hi"))
+    assert error.value.status == 503
+    assert stats.retries == client.max_retries
+
+
+def test_non_retryable_status_fails_at_once(serve):
+    client, _ = serve(error_rate=1.0, error_status=400)
+    with track_calls() as stats, pytest.raises(ProviderError) as error:
+        client.run(client.gemini_generate("Hi"))
+    assert error.value.status == 400
+    assert stats.retries == 0
+
+
+def test_deadline_bounds_a_slow_call(serve):
+    client, _ = serve(latency=LatencyModel(median_ms=2000))
+    started = time.monotonic()
+    with pytest.raises(ProviderError):
+        client.run(client.gemini_generate("Hi", deadline=0.3))
+    assert time.monotonic() - started < 1.5
+
+
+@pytest.mark.parametrize("provider", ["gemini", "openai"])
+def test_streams_arrive_in_chunks(serve, provider):
+    client, _ = serve(reply_words=24, tokens_per_second=2000)
+    if provider == "gemini":
+        stream = client.gemini_stream("Hi")
+    else:
+        stream = client.openai_stream([{"role": "user", "content": "Hi"}])
+    stats = CallStats()
+    with track_calls(stats):
+        chunks = list(client.iter_stream(stream))
+    assert len(chunks) == 6  # four words per event
+    assert len(reply_words("".join(chunks))) == 24
+    assert stats.calls == 1
+
+
+def test_closing_a_stream_early_cancels_it(serve):
+    # The whole reply would take about 3 seconds to stream
+    client, _ = serve(reply_words=400, tokens_per_second=200)
+    stream = client.iter_stream(client.gemini_stream("Hi"))
+    started = time.monotonic()
+    assert next(stream).startswith("Reply ")
+    stream.close()
+    assert time.monotonic() - started < 1.0
+
+
+def test_small_context_caches_are_rejected(serve):
+    client, _ = serve(cache_min_tokens=1024)
+    with pytest.raises(ProviderError) as error:
+        client.run(client.gemini_create_cache([gemini_content("user", "Too short to cache")]))
+    assert error.value.status == 400
+    name = client.run(client.gemini_create_cache([gemini_content("user", "word " * 1000)]))
+    assert client.run(client.gemini_generate_contents([gemini_content("user", "Go on")], cached_content=name))
+
+
+def booked_limiter(rpm):
+    # A limiter whose whole minute of requests is already booked
+    limiter = RateLimiter({RATE_KEY: {"rpm": rpm}}, None)
+    for _ in range(rpm):
+        limiter.reserve(RATE_KEY, 0)
+    return limiter
+
+
+def test_429_responses_are_retried(serve):
+    client, _ = serve(error_rate=0.3, error_status=429)
+    with track_calls() as stats:
+        replies = [client.run(client.gemini_generate("Hi")) for _ in range(10)]
+    assert all(reply.startswith("Reply ") for reply in replies)
+    assert stats.retries > 0
+
+
+def test_requests_wait_for_the_rate_limit(serve):
+    client, _ = serve(limiter=booked_limiter(120))
+    started = time.monotonic()
+    with track_calls() as stats:
+        client.run(client.gemini_generate("Hi"))
+    assert stats.rate_limit_wait == pytest.approx(0.5, abs=0.1)
+    assert time.monotonic() - started >= 0.4
+
+
+def test_rate_limit_queue_past_the_deadline_fails_with_429(serve):
+    limiter = booked_limiter(1)
+    client, _ = serve(limiter=limiter)
+    with pytest.raises(ProviderError) as error:
+        client.run(client.gemini_generate("Hi", deadline=1.0))
+    assert error.value.status == 429
+    # The booking was given back, so the queue is no longer than before
+    assert limiter.reserve(RATE_KEY, 0) == pytest.approx(60.0, abs=0.5)
+
+
+def test_cancelled_wait_gives_its_booking_back(serve):
+    limiter = booked_limiter(60)
+    client, _ = serve(limiter=limiter)
+    future = client.submit(client.gemini_generate("Hi"))
+    time.sleep(0.2)
+    future.cancel()
+    time.sleep(0.2)
+    # Without the refund the next request would queue behind the cancelled one (about 1.6s)
+    assert limiter.reserve(RATE_KEY, 0) < 0.9
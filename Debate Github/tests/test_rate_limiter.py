@@ -0,0 +1,86 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter, load_limits
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "file"])
+def limiter(request, tmp_path):
+    path = str(tmp_path / "limits.json") if request.param == "file" else None
+    return RateLimiter({"test:model": {"rpm": 60, "tpm": 6000}}, path)
+
+
+def test_requests_within_a_minute_of_budget_are_admitted(clock, limiter):
+    assert all(limiter.reserve("test:model", 10) == 0.0 for _ in range(60))
+
+
+def test_requests_over_budget_wait_their_turn(clock, limiter):
+    for _ in range(60):
+        limiter.reserve("test:model", 10)
+    assert limiter.reserve("test:model", 10) == pytest.approx(1.0)
+    assert limiter.reserve("test:model", 10) == pytest.approx(2.0)
+    clock[0] += 2.0
+    assert limiter.reserve("test:model", 10) == pytest.approx(1.0)
+
+
+def test_token_budget_is_enforced(clock, limiter):
+    assert limiter.reserve("test:model", 6000) == 0.0
+    # A minute's worth of tokens is booked, so the next 600 tokens wait 6 seconds
+    assert limiter.reserve("test:model", 600) == pytest.approx(6.0)
+
+
+def test_refund_gives_the_booking_back(clock, limiter):
+    for _ in range(60):
+        limiter.reserve("test:model", 10)
+    assert limiter.reserve("test:model", 10) > 0
+    limiter.refund("test:model", 10)
+    limiter.refund("test:model", 10)
+    assert limiter.reserve("test:model", 10) == 0.0
+
+
+def test_refund_never_moves_a_budget_into_the_past(clock, limiter):
+    limiter.reserve("test:model", 10)
+    for _ in range(5):
+        limiter.refund("test:model", 10)
+    assert all(limiter.reserve("test:model", 10) == 0.0 for _ in range(60))
+    assert limiter.reserve("test:model", 10) > 0
+
+
+def test_adjust_corrects_the_token_estimate(clock, limiter):
+    limiter.reserve("test:model", 6000)
+    limiter.adjust("test:model", -3000)
+    assert limiter.reserve("test:model", 600) == 0.0
+
+
+def test_unlimited_keys_never_wait(clock, limiter):
+    assert all(limiter.reserve("other:model", 10 ** 6) == 0.0 for _ in range(100))
+
+
+def test_processes_share_budgets_through_the_state_file(clock, tmp_path):
+    path = str(tmp_path / "limits.json")
+    first = RateLimiter({"test:model": {"rpm": 60}}, path)
+    second = RateLimiter({"test:model": {"rpm": 60}}, path)
+    for _ in range(30):
+        first.reserve("test:model", 1)
+        second.reserve("test:model", 1)
+    assert first.reserve("test:model", 1) == pytest.approx(1.0)
+
+
+def test_corrupt_state_file_starts_over(clock, tmp_path):
+    path = tmp_path / "limits.json"
+    path.write_text("{not json")
+    assert RateLimiter({"test:model": {"rpm": 60}}, str(path)).reserve("test:model", 1) == 0.0
+
+
+def test_limits_can_be_overridden_from_the_environment(monkeypatch):
+    monkeypatch.setenv(rate_limiter.RATE_LIMITS_ENV, '{"test:model": {"rpm": 5}}')
+    limits = load_limits()
+    assert limits["test:model"] == {"rpm": 5}
+    assert "openai:o1-mini" in limits
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from repetition import NearDuplicateIndex, normalize, shingles
+
+ARGUMENT = ("Universal basic income would give every citizen a stable floor, "
+            "letting people retrain for new careers without fear of losing their homes.")
+PARAPHRASE = ("Universal basic income would give every citizen a stable floor, "
+              "letting people retrain for new jobs without fear of losing their homes.")
+REWORDED = ("A basic income paid to all citizens gives people a stable floor, so they can "
+            "retrain for a new career without the fear of losing their home.")
+COUNTER_ARGUMENT = ("Universal basic income would be far too expensive, since taxes on every citizen "
+                    "would have to rise sharply to pay for it.")
+UNRELATED = ("Nuclear power plants produce reliable low carbon electricity, but the waste "
+             "has to be stored safely for thousands of years.")
+
+
+def test_texts_are_normalized_before_shingling():
+    assert normalize("The careers of the citizens") == normalize("career citizen") == ["care", "citizen"]
+    assert shingles("Hello, there!") == shingles("hello") == shingles("HELLO")
+    assert len(shingles("basic income floor")) == 5  # three words and two bigrams
+    assert shingles("the of and") == shingles("")
+
+
+def test_exact_and_paraphrased_repeats_are_near_duplicates():
+    index = NearDuplicateIndex()
+    assert not index.check_and_add(ARGUMENT)
+    assert index.check_and_add(ARGUMENT)
+    assert index.check_and_add(PARAPHRASE)
+    assert index.similarity(ARGUMENT) == 1.0
+
+
+def test_reworded_repeats_are_near_duplicates():
+    index = NearDuplicateIndex()
+    assert not index.check_and_add(ARGUMENT)
+    assert index.check_and_add(REWORDED)
+
+
+def test_different_arguments_are_not_near_duplicates():
+    index = NearDuplicateIndex()
+    assert not index.check_and_add(ARGUMENT)
+    assert not index.check_and_add(UNRELATED)
+    assert not index.check_and_add(COUNTER_ARGUMENT)
+    assert len(index.entries) == 3
+    assert NearDuplicateIndex().similarity(ARGUMENT) == 0.0
+
+
+def test_threshold_can_be_set_per_check():
+    index = NearDuplicateIndex()
+    index.add(ARGUMENT)
+    assert not index.check_and_add(REWORDED, threshold=0.9)
+    assert index.check_and_add(COUNTER_ARGUMENT, threshold=0.1)
+
+
+def test_rejected_duplicates_are_not_indexed():
+    index = NearDuplicateIndex()
+    index.check_and_add(ARGUMENT)
+    index.check_and_add(PARAPHRASE)
+    assert len(index.entries) == 1
+
+
+def test_oldest_turns_are_evicted_at_capacity():
+    index = NearDuplicateIndex(capacity=2)
+    index.add(ARGUMENT)
+    index.add(UNRELATED)
+    index.add("Space exploration inspires children to study science and engineering in school.")
+    assert len(index.entries) == len(index.signatures) == 2
+    assert index.similarity(ARGUMENT) < index.threshold
+    assert index.similarity(UNRELATED) == 1.0
+    # Evicted entries leave no ids behind in the buckets
+    assert all(entry_id in index.signatures for bucket in index.buckets.values() for entry_id in bucket)
+
+
+def test_invalid_band_count_is_rejected():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=64, bands=10)
+
+
+def test_concurrent_lookups_and_evictions():
+    index = NearDuplicateIndex(capacity=20)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(100):
+                index.check_and_add(f"argument number {offset} {i} about topic {i % 7} and more words")
+                index.similarity(ARGUMENT)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(index.entries) == len(index.signatures) <= 20
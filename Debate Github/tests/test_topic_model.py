@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+pytest.importorskip("gensim")
+
+from topic_model import HASH_BUCKETS, OnlineTopicModel, tokenize
+
+THEMES = [["climate", "carbon", "emissions", "warming", "energy"],
+          ["jobs", "workers", "automation", "wages", "labor"],
+          ["privacy", "surveillance", "data", "tracking", "consent"]]
+
+
+def themed_documents(count, seed=0):
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        theme = rng.choice(THEMES)
+        documents.append(tokenize(" ".join(rng.choice(theme) for _ in range(30)) + " and the debate"))
+    return documents
+
+
+@pytest.fixture
+def model():
+    topics = []
+    model = OnlineTopicModel(topics.append)
+    model.seen = topics
+    return model
+
+
+def test_top_words_come_from_the_documents_with_real_weight(model):
+    documents = themed_documents(200)
+    model.update(documents)
+    vocabulary = {token for tokens in documents for token in tokens}
+    topics = model.seen[-1]
+    used = [topic for topic in topics if topic]
+    assert used
+    for topic in used:
+        assert {word for word, _ in topic} <= vocabulary
+        # Far above the uniform 1 / HASH_BUCKETS a word gets from an untrained topic
+        assert topic[0][1] > 100 / HASH_BUCKETS
+    top_words = {topic[0][0] for topic in used}
+    assert top_words <= {word for theme in THEMES for word in theme}
+
+
+def test_forgotten_words_are_dropped_not_shown_as_buckets(model):
+    model.update(themed_documents(100))
+    model.bucket_words = {}
+    assert all(model.topic_words(i) == [] for i in range(model.num_topics))
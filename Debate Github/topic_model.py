@@ -0,0 +1,143 @@
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter, deque
+from typing import Callable, List, Optional, Tuple
+
+from gensim.corpora import Dictionary, HashDictionary
+from gensim.models import CoherenceModel, LdaModel
+from gensim.parsing.preprocessing import STOPWORDS
+from gensim.utils import simple_preprocess
+
+NUM_TOPICS = 5
+TOPIC_WORDS = 5
+HASH_BUCKETS = 2 ** 13       # fixed vocabulary size, so new words never mean a new model
+MIN_WORD_WEIGHT = 50 / HASH_BUCKETS  # fifty times the uniform share; below that a word isn't part of the topic
+MAX_TRACKED_WORDS = 20000    # word counts kept for naming hash buckets
+MAX_TEXTS = 2000             # most recent messages kept for coherence
+DEBOUNCE_SECONDS = 2.0       # wait for a burst of messages to end before updating
+MAX_PENDING_DOCUMENTS = 50   # ...unless this many are waiting
+UPDATE_PASSES = 10           # passes over each new batch (it's small, so this is cheap)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in simple_preprocess(text, min_len=3) if token not in STOPWORDS]
+
+
+def word_hash(token: bytes) -> int:
+    # gensim's default adler32 puts short words in few buckets; this spreads them evenly
+    return int.from_bytes(hashlib.blake2b(token, digest_size=8).digest(), "big")
+
+
+class OnlineTopicModel:
+    """
+    LDA topics of the debate, learned incrementally on a background thread.
+
+    Words are hashed into a fixed-size vocabulary, so each batch of new
+    messages is one online LdaModel.update() instead of a retrain over the
+    whole history. HASH_BUCKETS is sized for a debate's vocabulary (a few
+    thousand words): many more buckets spread the topic-word prior so thin
+    that no word stands out, and slow every update down. A bucket is shown
+    as the most frequent word hashed into it, so a rare collision never
+    merges two words on screen. Updates are
+    debounced: the worker waits until messages stop arriving for
+    DEBOUNCE_SECONDS (or MAX_PENDING_DOCUMENTS pile up).
+    on_topics(topics) is called from the worker only when the top words of
+    some topic have changed. Coherence is only computed when asked for.
+    """
+
+    def __init__(self, on_topics: Callable[[List[List[Tuple[str, float]]]], None], num_topics: int = NUM_TOPICS):
+        self.on_topics = on_topics
+        self.num_topics = num_topics
+        self.dictionary = HashDictionary(id_range=HASH_BUCKETS, myhash=word_hash, debug=False)
+        self.model = LdaModel(id2word=self.dictionary, num_topics=num_topics, random_state=1, eval_every=None)
+        self.word_counts = Counter()
+        self.bucket_words = {}  # bucket -> its most frequent word
+        self.texts = deque(maxlen=MAX_TEXTS)  # recent tokenized messages, for coherence
+        self.pending = []
+        self.last_added = 0.0
+        self.topics = None
+        self.model_lock = threading.Lock()
+        self.wakeup = threading.Condition()
+        threading.Thread(target=self.run, name="topic-model", daemon=True).start()
+
+    def add_documents(self, messages: List[str]):
+        documents = [tokens for tokens in (tokenize(message) for message in messages) if tokens]
+        if not documents:
+            return
+        with self.wakeup:
+            self.pending.extend(documents)
+            self.last_added = time.monotonic()
+            self.wakeup.notify()
+
+    def run(self):
+        while True:
+            with self.wakeup:
+                while not self.pending:
+                    self.wakeup.wait()
+                # Debounce: let a burst finish unless enough has piled up already
+                while len(self.pending) < MAX_PENDING_DOCUMENTS:
+                    remaining = self.last_added + DEBOUNCE_SECONDS - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.wakeup.wait(remaining)
+                documents, self.pending = self.pending, []
+            try:
+                self.update(documents)
+            except Exception as e:
+                logging.error(f"Topic model update failed: {e}")
+
+    def update(self, documents: List[List[str]]):
+        started = time.monotonic()
+        corpus = [self.dictionary.doc2bow(tokens) for tokens in documents]
+        with self.model_lock:
+            self.model.update(corpus, passes=UPDATE_PASSES)
+            self.texts.extend(documents)
+            self.count_words(documents)
+            topics = [self.topic_words(i) for i in range(self.num_topics)]
+            changed = self.topics is None or [{word for word, _ in topic} for topic in topics] != \
+                [{word for word, _ in topic} for topic in self.topics]
+            if changed:
+                self.topics = topics
+        logging.info(f"Topic model updated with {len(documents)} messages in {time.monotonic() - started:.2f}s")
+        if changed:
+            self.on_topics(topics)
+
+    def count_words(self, documents: List[List[str]]):
+        for tokens in documents:
+            for token in tokens:
+                self.word_counts[token] += 1
+                bucket = self.dictionary.restricted_hash(token)
+                current = self.bucket_words.get(bucket)
+                if current is None or self.word_counts[token] > self.word_counts[current]:
+                    self.bucket_words[bucket] = token
+        if len(self.word_counts) > MAX_TRACKED_WORDS:
+            # Forget the rarest half; they are very unlikely to be a topic's top words
+            self.word_counts = Counter(dict(self.word_counts.most_common(MAX_TRACKED_WORDS // 2)))
+            self.bucket_words = {bucket: word for bucket, word in self.bucket_words.items() if word in self.word_counts}
+
+    def topic_words(self, topic: int) -> List[Tuple[str, float]]:
+        # Buckets whose words were forgotten by count_words can't be named, so they are skipped;
+        # a topic the debate hasn't used yet has no words above MIN_WORD_WEIGHT
+        terms = self.model.get_topic_terms(topic, topn=TOPIC_WORDS * 4)
+        words = [(self.bucket_words[term], float(prob)) for term, prob in terms
+                 if term in self.bucket_words and prob >= MIN_WORD_WEIGHT]
+        return words[:TOPIC_WORDS]
+
+    def coherence(self) -> Optional[float]:
+        """
+        c_v coherence of the current topics over every message so far. Slow; run it off the UI thread.
+        """
+        with self.model_lock:
+            if not self.texts or self.topics is None:
+                return None
+            texts = list(self.texts)
+            topics = [[word for word, _ in topic] for topic in self.topics]
+        dictionary = Dictionary(texts)
+        # Topic words that only appeared in messages dropped from self.texts can't be scored
+        topics = [[word for word in topic if word in dictionary.token2id] for topic in topics]
+        topics = [topic for topic in topics if len(topic) > 1]
+        if not topics:
+            return None
+        return CoherenceModel(topics=topics, texts=texts, dictionary=dictionary, coherence='c_v').get_coherence()
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+TTS_CACHE_DIR = "tts_cache"
+TTS_CACHE_MAX_BYTES = 500 * 1024 * 1024
+INDEX_FILE = "index.sqlite3"
+INDEX_BUSY_TIMEOUT = 30.0  # seconds to wait for another process writing the index
+
+
+def cache_key(engine: str, voice: str, rate: float, text: str) -> str:
+    """
+    Content address of a synthesized segment.
+    """
+    payload = json.dumps([engine, voice, rate, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    On-disk cache of synthesized speech.
+
+    Each segment is stored as the encoded audio the engine returned, in a
+    file named after the hash of (engine, voice, rate, text). A SQLite index
+    records each file's size and when it was last used; every put or hit is
+    a single-row write, so processes sharing the directory (e.g. the export
+    workers) never overwrite each other's entries. When the cache grows past
+    max_bytes, the least recently used files are deleted.
+    """
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(self.index_path, timeout=INDEX_BUSY_TIMEOUT, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                            "last_used REAL NOT NULL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.sync_index()
+
+    def sync_index(self):
+        # Pick up audio files the index doesn't know about (e.g. from an older cache), and
+        # drop entries whose file has gone missing
+        found = {}
+        for name in os.listdir(self.directory):
+            if name.endswith(".audio"):
+                stat = os.stat(os.path.join(self.directory, name))
+                found[name[:-len(".audio")]] = (stat.st_size, stat.st_mtime)
+        with self.lock, self.db:
+            known = {key for key, in self.db.execute("SELECT key FROM entries")}
+            self.db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in known - found.keys()])
+            self.db.executemany("INSERT OR IGNORE INTO entries (key, size, last_used) VALUES (?, ?, ?)",
+                                [(key, size, mtime) for key, (size, mtime) in found.items() if key not in known])
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            try:
+                with open(self.path_for(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return None
+            except OSError as e:
+                logging.error(f"Error reading TTS cache entry: {e}")
+                return None
+            try:
+                with self.db:
+                    # Upsert, in case another process wrote the file but hasn't indexed it yet
+                    self.db.execute("INSERT INTO entries (key, size, last_used) VALUES (?, ?, ?) "
+                                    "ON CONFLICT(key) DO UPDATE SET last_used = excluded.last_used",
+                                    (key, len(data), time.time()))
+            except sqlite3.Error as e:
+                logging.error(f"Error updating TTS cache index: {e}")
+            return data
+
+    def put(self, key: str, data: bytes):
+        with self.lock:
+            path = self.path_for(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.error(f"Error writing TTS cache entry: {e}")
+                return
+            try:
+                with self.db:
+                    self.db.execute("INSERT OR REPLACE INTO entries (key, size, last_used) VALUES (?, ?, ?)",
+                                    (key, len(data), time.time()))
+                    self.evict()
+            except sqlite3.Error as e:
+                logging.error(f"Error updating TTS cache index: {e}")
+
+    def total_bytes(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        # Called inside put's transaction, so two processes never evict the same files
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        self.db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+        for key in evicted:
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class CachedSynthesizer:
+    """
+    Wraps a synthesizer from tts_engines so repeated text is read from the
+    cache instead of being synthesized again.
+    """
+
+    def __init__(self, synthesizer, cache: TTSCache):
+        self.synthesizer = synthesizer
+        self.cache = cache
+        self.name = synthesizer.name
+
+    def voice_for(self, speaker: str) -> str:
+        return self.synthesizer.voice_for(speaker)
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        key = cache_key(self.synthesizer.name, voice, self.synthesizer.rate, text)
+        data = self.cache.get(key)
+        if data is None:
+            data = self.synthesizer.synthesize(text, voice)
+            self.cache.put(key, data)
+        return data
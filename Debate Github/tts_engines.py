@@ -0,0 +1,242 @@
+import io
+import os
+import time
+import wave
+import logging
+import tempfile
+import threading
+from xml.sax.saxutils import escape
+
+# Each engine's SDK is imported when that engine is first used, so only the engines
+# actually chosen need to be installed
+
+# Azure Speech credentials (set the environment variables or replace the placeholders)
+AZURE_SPEECH_KEY = os.environ.get("AZURE_SPEECH_KEY", "AZURE_SUBSCRIPTION_KEY")
+AZURE_SPEECH_REGION = os.environ.get("AZURE_SPEECH_REGION", "your-azure-region")
+AZURE_SPEECH_ENDPOINT = "https://eastus.api.cognitive.microsoft.com/sts/v1.0"
+
+# Voice for each debater; anyone else gets DEFAULT_VOICE
+VOICE_MAP = {
+    "gemini": "en-US-BlueNeural",
+    "o1-mini": "en-US-FableTurboMultilingualNeural",
+    "bard": "en-US-SaraNeural"
+}
+DEFAULT_VOICE = "en-US-JennyNeural"
+
+# gTTS has no named voices; a different Google domain gives each debater a different accent
+GTTS_ACCENTS = {
+    "gemini": "com",
+    "o1-mini": "co.uk",
+    "bard": "com.au"
+}
+
+# pyttsx3 voices are whatever the OS provides, so debaters get them by position
+PYTTSX3_VOICE_INDEX = {
+    "gemini": 0,
+    "o1-mini": 1,
+    "bard": 2
+}
+
+ELEVENLABS_API_KEY = os.environ.get("ELEVENLABS_API_KEY", "your-elevenlabs-api-key")
+ELEVENLABS_MODEL = "eleven_multilingual_v2"
+ELEVENLABS_VOICES = {
+    "gemini": "pNInz6obpgDQGcFmaJgB",   # Adam
+    "o1-mini": "ErXwobaYiN019PkySvjV",  # Antoni
+    "bard": "21m00Tcm4TlvDq8ikWAM"      # Rachel
+}
+
+PLAYBACK_POLL_INTERVAL = 0.05  # seconds between checks for an interrupt while audio plays
+
+
+class TTSError(Exception):
+    """
+    Raised when a synthesizer fails to produce audio for a piece of text.
+    """
+
+
+class AzureSynthesizer:
+    """
+    Azure Speech synthesizer that returns the audio as WAV bytes instead of
+    playing it, so synthesis and playback can run on different threads.
+    """
+
+    name = "azure"
+
+    def __init__(self, voice_map=None, default_voice: str = DEFAULT_VOICE, rate: float = 1.0):
+        self.speechsdk = None
+        self.voice_map = voice_map or VOICE_MAP
+        self.default_voice = default_voice
+        self.rate = rate
+        self.speech_config = None
+
+    def voice_for(self, speaker: str) -> str:
+        return self.voice_map.get(speaker.lower(), self.default_voice)
+
+    def get_speech_config(self):
+        # Created on first use so the SDK isn't loaded and nothing talks to Azure until speech is needed
+        if self.speech_config is None:
+            import azure.cognitiveservices.speech as speechsdk
+            self.speechsdk = speechsdk
+            self.speech_config = speechsdk.SpeechConfig(subscription=AZURE_SPEECH_KEY, region=AZURE_SPEECH_REGION)
+            self.speech_config.endpoint = AZURE_SPEECH_ENDPOINT
+            self.speech_config.set_speech_synthesis_output_format(
+                speechsdk.SpeechSynthesisOutputFormat.Riff24Khz16BitMonoPcm)
+        return self.speech_config
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        speech_config = self.get_speech_config()
+        speechsdk = self.speechsdk
+        speech_config.speech_synthesis_voice_name = voice
+        # audio_config=None keeps the audio in the result instead of sending it to the speaker
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        if self.rate == 1.0:
+            result = synthesizer.speak_text_async(text).get()
+        else:
+            result = synthesizer.speak_ssml_async(ssml_with_rate(text, voice, self.rate)).get()
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            return result.audio_data
+        if result.reason == speechsdk.ResultReason.Canceled:
+            details = result.cancellation_details
+            raise TTSError(f"Azure synthesis canceled: {details.reason} {details.error_details or ''}".strip())
+        raise TTSError(f"Azure synthesis failed: {result.reason}")
+
+
+def ssml_with_rate(text: str, voice: str, rate: float) -> str:
+    return (f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">'
+            f'<voice name="{voice}"><prosody rate="{rate}">{escape(text)}</prosody></voice></speak>')
+
+
+class GTTSSynthesizer:
+    """
+    Google Translate text-to-speech. Returns MP3 bytes.
+    """
+
+    name = "gtts"
+
+    def __init__(self, lang: str = "en", rate: float = 1.0):
+        self.lang = lang
+        self.rate = rate  # gTTS only has normal and slow speech
+
+    def voice_for(self, speaker: str) -> str:
+        return GTTS_ACCENTS.get(speaker.lower(), "com")
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, tld=voice, slow=self.rate < 1.0).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Synthesizer:
+    """
+    Offline synthesis with the operating system's voices. Returns WAV bytes.
+    """
+
+    name = "pyttsx3"
+
+    def __init__(self, rate: float = 1.0):
+        self.rate = rate
+        self.engine = None
+        # pyttsx3 drives a single OS speech engine, which can't be used from two threads at once
+        self.lock = threading.Lock()
+
+    def get_engine(self):
+        if self.engine is None:
+            import pyttsx3
+            self.engine = pyttsx3.init()
+            self.base_rate = self.engine.getProperty("rate")
+        return self.engine
+
+    def voice_for(self, speaker: str) -> str:
+        with self.lock:
+            voices = self.get_engine().getProperty("voices")
+        if not voices:
+            return ""
+        return voices[PYTTSX3_VOICE_INDEX.get(speaker.lower(), 0) % len(voices)].id
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        with self.lock:
+            engine = self.get_engine()
+            if voice:
+                engine.setProperty("voice", voice)
+            engine.setProperty("rate", int(self.base_rate * self.rate))
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "speech.wav")
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+
+
+class ElevenLabsSynthesizer:
+    """
+    ElevenLabs text-to-speech. Returns MP3 bytes.
+    """
+
+    name = "elevenlabs"
+
+    def __init__(self, api_key: str = ELEVENLABS_API_KEY, model: str = ELEVENLABS_MODEL, rate: float = 1.0):
+        self.api_key = api_key
+        self.client = None
+        self.model = model
+        self.rate = rate
+
+    def get_client(self):
+        if self.client is None:
+            from elevenlabs import ElevenLabs
+            self.client = ElevenLabs(api_key=self.api_key)
+        return self.client
+
+    def voice_for(self, speaker: str) -> str:
+        return ELEVENLABS_VOICES.get(speaker.lower(), ELEVENLABS_VOICES["gemini"])
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        audio = self.get_client().text_to_speech.convert(voice_id=voice, text=text, model_id=self.model,
+                                                   output_format="mp3_44100_128")
+        return b"".join(audio)
+
+
+SYNTHESIZERS = {
+    "azure": AzureSynthesizer,
+    "gtts": GTTSSynthesizer,
+    "pyttsx3": Pyttsx3Synthesizer,
+    "elevenlabs": ElevenLabsSynthesizer
+}
+
+
+def get_synthesizer(name: str, **kwargs):
+    """
+    Create a synthesizer by engine name (azure, gtts, pyttsx3 or elevenlabs).
+    """
+    if name not in SYNTHESIZERS:
+        raise ValueError(f"Unknown TTS engine '{name}'; choose from {', '.join(SYNTHESIZERS)}")
+    return SYNTHESIZERS[name](**kwargs)
+
+
+def decode_audio(data: bytes):
+    """
+    Return (frames, channels, sample width, frame rate) for WAV bytes, or for
+    any other format pydub can read (e.g. the MP3 from gTTS and ElevenLabs).
+    """
+    if data[:4] == b"RIFF":
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            return wav.readframes(wav.getnframes()), wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+    from pydub import AudioSegment
+    segment = AudioSegment.from_file(io.BytesIO(data))
+    return segment.raw_data, segment.channels, segment.sample_width, segment.frame_rate
+
+
+def play_audio(data: bytes, should_stop=lambda: False) -> bool:
+    """
+    Play encoded audio and block until it finishes or should_stop() returns True.
+    Returns False if playback was stopped early.
+    """
+    import simpleaudio as sa
+    play_obj = sa.play_buffer(*decode_audio(data))
+    while play_obj.is_playing():
+        if should_stop():
+            play_obj.stop()
+            logging.info("Speech playback interrupted")
+            return False
+        time.sleep(PLAYBACK_POLL_INTERVAL)
+    return True
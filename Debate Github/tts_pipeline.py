@@ -0,0 +1,121 @@
+import re
+import queue
+import logging
+import threading
+from typing import List
+
+from tts_engines import play_audio
+
+MAX_PENDING_SENTENCES = 24  # sentences waiting for synthesis before speak() pushes back
+MAX_READY_SEGMENTS = 2      # synthesized sentences waiting for the speaker
+SPEAK_TIMEOUT = 120.0       # longest a blocking speak() waits for room before dropping the rest
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences so the first one can be spoken while the rest are synthesized.
+    """
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+
+
+class TTSPipeline:
+    """
+    Speaks debate turns without holding up the debate.
+
+    speak() splits a turn into sentences and queues them. One worker
+    synthesizes sentences and another plays them, so sentence N+1 is being
+    synthesized while sentence N plays. Both queues are bounded: when the
+    backlog is full, a blocking speak() waits for room, which slows the turn
+    scheduler down to the pace of the audio instead of letting it pile up.
+    interrupt() drops everything queued and stops the sentence playing now.
+    """
+
+    def __init__(self, synthesizer, player=play_audio, max_pending: int = MAX_PENDING_SENTENCES,
+                 max_ready: int = MAX_READY_SEGMENTS):
+        self.synthesizer = synthesizer
+        self.player = player
+        self.pending = queue.Queue(maxsize=max_pending)  # (generation, voice, sentence)
+        self.ready = queue.Queue(maxsize=max_ready)      # (generation, audio)
+        self.generation = 0  # bumped by interrupt() so queued work is skipped
+        self.closed = False
+        self.synth_thread = threading.Thread(target=self.synthesis_worker, name="tts-synthesis", daemon=True)
+        self.play_thread = threading.Thread(target=self.playback_worker, name="tts-playback", daemon=True)
+        self.synth_thread.start()
+        self.play_thread.start()
+
+    def speak(self, speaker: str, text: str, block: bool = True, timeout: float = SPEAK_TIMEOUT) -> bool:
+        """
+        Queue a turn for speech. With block=False (e.g. on the Tk thread) the
+        turn is dropped if the queue is full. Returns False if anything was dropped.
+        """
+        generation = self.generation
+        voice = self.synthesizer.voice_for(speaker)
+        for sentence in split_sentences(text):
+            if generation != self.generation:
+                return False  # interrupted while waiting for room
+            try:
+                self.pending.put((generation, voice, sentence), block=block, timeout=timeout if block else None)
+            except queue.Full:
+                logging.warning(f"Speech queue full; skipping the rest of {speaker}'s turn")
+                return False
+        return True
+
+    def interrupt(self):
+        """
+        Drop all queued speech and stop the sentence that is playing.
+        """
+        self.generation += 1
+        for q in (self.pending, self.ready):
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self.generation or self.closed
+
+    def synthesis_worker(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            generation, voice, sentence = item
+            if self.is_stale(generation):
+                continue
+            try:
+                audio = self.synthesizer.synthesize(sentence, voice)
+            except Exception as e:
+                logging.error(f"Error synthesizing speech: {e}")
+                continue
+            # Only MAX_READY_SEGMENTS run ahead of playback; keep checking for an interrupt while waiting
+            while not self.is_stale(generation):
+                try:
+                    self.ready.put((generation, audio), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def playback_worker(self):
+        while True:
+            item = self.ready.get()
+            if item is None:
+                break
+            generation, audio = item
+            if self.is_stale(generation):
+                continue
+            try:
+                self.player(audio, lambda: self.is_stale(generation))
+            except Exception as e:
+                logging.error(f"Error playing speech: {e}")
+
+    def close(self):
+        self.closed = True
+        self.interrupt()
+        for q in (self.pending, self.ready):
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                pass
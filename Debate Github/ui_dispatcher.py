@@ -0,0 +1,88 @@
+import logging
+import threading
+import tkinter as tk
+from collections import deque
+
+UI_TICK_MS = 30        # how often queued UI operations are applied
+MAX_OPS_PER_TICK = 200  # keeps one tick short when a backlog builds up
+
+
+class UIDispatcher:
+    """
+    Runs UI operations on the Tk main loop.
+
+    Worker threads must not touch Tk widgets, so they queue operations here
+    and return straight away. A periodic after() tick on the main loop applies
+    the queue in batches, merging consecutive text inserts into the same
+    widget into a single insert. Operations queued from the main thread run
+    immediately, after anything already waiting, so ordering is kept.
+    """
+
+    def __init__(self, master, interval_ms: int = UI_TICK_MS, max_ops: int = MAX_OPS_PER_TICK):
+        self.master = master
+        self.interval_ms = interval_ms
+        self.max_ops = max_ops
+        self.main_thread = threading.get_ident()
+        self.pending = deque()  # ["call", func, args] or ["insert", widget, [(text, tag), ...]]
+        self.lock = threading.Lock()
+        self.master.after(self.interval_ms, self.tick)
+
+    def on_main_thread(self) -> bool:
+        return threading.get_ident() == self.main_thread
+
+    def call(self, func, *args):
+        """
+        Run func(*args) on the Tk main loop.
+        """
+        if self.on_main_thread():
+            self.drain()
+            self.run(["call", func, args])
+            return
+        with self.lock:
+            self.pending.append(["call", func, args])
+
+    def insert(self, widget, text: str, tag=None):
+        """
+        Append text to the end of a Text widget (disabled widgets included) and scroll to it.
+        """
+        if self.on_main_thread():
+            self.drain()
+            self.run(["insert", widget, [(text, tag)]])
+            return
+        with self.lock:
+            last = self.pending[-1] if self.pending else None
+            if last is not None and last[0] == "insert" and last[1] is widget:
+                last[2].append((text, tag))
+            else:
+                self.pending.append(["insert", widget, [(text, tag)]])
+
+    def drain(self, limit=None):
+        with self.lock:
+            count = len(self.pending) if limit is None else min(limit, len(self.pending))
+            batch = [self.pending.popleft() for _ in range(count)]
+        for op in batch:
+            self.run(op)
+
+    def run(self, op):
+        try:
+            if op[0] == "insert":
+                self.apply_insert(op[1], op[2])
+            else:
+                op[1](*op[2])
+        except Exception as e:
+            logging.error(f"Error applying UI update: {e}")
+
+    def apply_insert(self, widget, chunks):
+        args = []
+        for text, tag in chunks:
+            args.extend([text, tag or ()])
+        state = widget.cget("state")
+        widget.configure(state=tk.NORMAL)
+        widget.insert(tk.END, *args)
+        widget.configure(state=state)
+        widget.see(tk.END)
+
+    def tick(self):
+        self.drain(self.max_ops)
+        # Come back sooner if a backlog is left, still letting Tk handle events in between
+        self.master.after(1 if self.pending else self.interval_ms, self.tick)